@@ -0,0 +1,52 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Benchmark: bulk_transform over a directory of saves
+
+Fills a save directory (sharded, as a large deployment would be), then
+times a migration that renames an item in every inventory: a dry run,
+the real run, and a second run that finds nothing left to change.
+
+Usage: python benchmarks/bench_bulk_transform.py [saves] [workers]
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+from bench_save_layout import fill
+
+
+def rename_potion(character):
+    """Example migration: health_potion becomes minor_health_potion"""
+    character['inventory'] = ["minor_health_potion" if item == "health_potion" else item
+                              for item in character['inventory']]
+
+
+def add_potion(character):
+    character['inventory'] = ["health_potion", "iron_sword"]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+    with tempfile.TemporaryDirectory() as directory:
+        fill(directory, count, sharded=True)
+        character_manager.bulk_transform(directory, add_potion, workers=workers)
+
+        print(f"{count} saves, {workers} workers")
+        for label, dry_run in (("dry run", True), ("migrate", False), ("re-run", False)):
+            start = time.perf_counter()
+            summary = character_manager.bulk_transform(directory, rename_potion, workers=workers,
+                                                       dry_run=dry_run)
+            seconds = time.perf_counter() - start
+            print(f"{label:8} {seconds:8.2f}s  {summary['total'] / seconds:8.0f} saves/s  "
+                  f"changed {summary['changed']}  failed {len(summary['failures'])}")
+
+
+if __name__ == "__main__":
+    main()
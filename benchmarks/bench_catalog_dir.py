@@ -0,0 +1,50 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Benchmark: serial vs parallel multi-file catalog loading
+
+Writes a directory of synthetic quest files, then compares calling
+load_quests on each file in turn with game_data.load_catalog_dir.
+
+Usage: python benchmarks/bench_catalog_dir.py [files] [quests_per_file] [workers]
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game_data
+from generate_content import write_quests
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    per_file = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for shard in range(files):
+            write_quests(os.path.join(directory, f"region_{shard:03}.txt"), per_file,
+                         seed=shard, prefix=f"region{shard}_quest")
+
+        start = time.perf_counter()
+        serial = {}
+        for filename in sorted(os.listdir(directory)):
+            serial.update(game_data.load_quests(os.path.join(directory, filename), use_cache=False))
+        serial_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parallel = game_data.load_catalog_dir(directory, "quests", workers=workers, use_cache=False)
+        parallel_time = time.perf_counter() - start
+
+    assert parallel == serial
+    print(f"{files} files x {per_file} quests, {workers} workers")
+    print(f"serial load_quests:  {serial_time:.3f}s")
+    print(f"load_catalog_dir:    {parallel_time:.3f}s")
+    print(f"speedup:             {serial_time / parallel_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
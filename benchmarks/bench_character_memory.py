@@ -0,0 +1,54 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Benchmark: memory of dict characters vs slotted Character objects
+
+Builds the same characters as plain dicts (the old create_character
+result) and as character_manager.Character, and reports the traced
+memory (tracemalloc) for each set.
+
+Usage: python benchmarks/bench_character_memory.py [count]
+"""
+
+import os
+import sys
+import gc
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+
+
+def build(count, make):
+    """Return the traced bytes held by count characters built with make"""
+    gc.collect()
+    tracemalloc.start()
+    characters = [make(index) for index in range(count)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del characters
+    return current
+
+
+def make_dict(index):
+    return dict(make_character(index))
+
+
+def make_character(index):
+    return character_manager.create_character(f"Hero{index}", "Warrior")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    dict_bytes = build(count, make_dict)
+    slot_bytes = build(count, make_character)
+
+    print(f"{count} characters")
+    print(f"dict       {dict_bytes:>12} bytes  {dict_bytes / count:8.1f} per character")
+    print(f"Character  {slot_bytes:>12} bytes  {slot_bytes / count:8.1f} per character")
+    print(f"saved      {1 - slot_bytes / dict_bytes:12.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Benchmark: Leaderboard updates and queries against sorting on demand
+
+Ranks the given number of characters, then reports microseconds per
+add_gold call with the leaderboard listening, per top(10) and per
+rank_of, next to the cost of sorting every character for one query.
+
+Usage: python benchmarks/bench_leaderboard.py [characters] [updates]
+       e.g. python benchmarks/bench_leaderboard.py 100000 20000
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+from leaderboard import Leaderboard
+
+
+def time_per_call(function, arguments):
+    """Return mean microseconds per function(*args) call"""
+    start = time.perf_counter()
+    for args in arguments:
+        function(*args)
+    return (time.perf_counter() - start) / len(arguments) * 1e6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    updates = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    rng = random.Random(163)
+
+    characters = []
+    for index in range(count):
+        character = character_manager.create_character(f"Hero{index}", "Warrior")
+        character['gold'] = rng.randint(10 ** 4, 10 ** 6)
+        characters.append(character)
+
+    board = Leaderboard()
+    start = time.perf_counter()
+    for character in characters:
+        board.update(character)
+    print(f"{count} characters ranked in {time.perf_counter() - start:.2f} s")
+
+    picks = [(rng.choice(characters), rng.randint(-100, 100)) for _ in range(updates)]
+    listening_us = time_per_call(character_manager.add_gold, picks)
+    board.close()
+    plain_us = time_per_call(character_manager.add_gold, picks)
+    names = [(character['name'],) for character, _ in picks]
+    top_us = time_per_call(board.top, [(10, "gold")] * updates)
+    rank_us = time_per_call(lambda name: board.rank_of(name, "gold"), names)
+    sort_us = time_per_call(lambda: sorted(characters, key=lambda c: (-c['gold'], c['name']))[:10], [()] * 5)
+
+    print("microseconds per call")
+    print(f"{'add_gold, no leaderboard':>32} {plain_us:>10.1f}")
+    print(f"{'add_gold, leaderboard listening':>32} {listening_us:>10.1f}")
+    print(f"{'top(10)':>32} {top_us:>10.1f}")
+    print(f"{'rank_of':>32} {rank_us:>10.1f}")
+    print(f"{'sort every character':>32} {sort_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
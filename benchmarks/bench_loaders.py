@@ -0,0 +1,97 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Benchmark: quest/item loader scaling
+
+For each size, generates synthetic quests.txt/items.txt files and reports
+parse time, peak traced memory (tracemalloc) and entries per second for
+game_data.load_quests and load_items. Results are written as JSON so runs
+from different versions can be diffed.
+
+Usage: python benchmarks/bench_loaders.py [--sizes 1000,100000,1000000]
+                                          [--output results.json]
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game_data
+from generate_content import write_quests, write_items
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+
+
+def measure(loader, filename):
+    """Time one uncached load, then repeat it under tracemalloc for peak memory"""
+    start = time.perf_counter()
+    entries = len(loader(filename, use_cache=False))
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    loader(filename, use_cache=False)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"entries": entries,
+            "seconds": round(seconds, 4),
+            "entries_per_second": round(entries / seconds) if seconds else None,
+            "peak_memory_bytes": peak,
+            "file_bytes": os.path.getsize(filename)}
+
+
+def git_revision():
+    """Return the current commit hash, or None outside a git checkout"""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game_data loaders")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="comma separated entry counts")
+    parser.add_argument("--output", default="benchmarks/results/loaders.json",
+                        help="where to write the JSON results")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    results = {"revision": git_revision(),
+               "python": platform.python_version(),
+               "platform": platform.platform(),
+               "runs": []}
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            quest_file = os.path.join(directory, f"quests_{size}.txt")
+            item_file = os.path.join(directory, f"items_{size}.txt")
+            write_quests(quest_file, size)
+            write_items(item_file, size)
+
+            for kind, loader, filename in (("quests", game_data.load_quests, quest_file),
+                                           ("items", game_data.load_items, item_file)):
+                run = {"kind": kind, "size": size}
+                run.update(measure(loader, filename))
+                results["runs"].append(run)
+                print(f"{kind:>6} {size:>9}: {run['seconds']:8.3f}s  "
+                      f"{run['entries_per_second']:>9} entries/s  "
+                      f"peak {run['peak_memory_bytes'] / 1e6:8.1f} MB")
+
+    if os.path.dirname(args.output):
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Benchmark: load_character vs peek_character as quest history grows
+
+For each completed_quests length, saves characters in the text and binary
+formats and reports microseconds per load_character and per
+peek_character call.
+
+Usage: python benchmarks/bench_peek.py [characters] [lengths]
+       e.g. python benchmarks/bench_peek.py 500 0,100,1000,10000
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+
+
+def time_per_call(function, names, save_directory):
+    """Return mean microseconds per function(name, save_directory) call"""
+    start = time.perf_counter()
+    for name in names:
+        function(name, save_directory)
+    return (time.perf_counter() - start) / len(names) * 1e6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    lengths = [int(length) for length in sys.argv[2].split(",")] if len(sys.argv) > 2 else [0, 100, 1000, 10000]
+
+    print(f"{count} characters, microseconds per call")
+    print(f"{'quests':>8} {'format':>7} {'load':>10} {'peek':>10}")
+    for length in lengths:
+        completed = [f"quest_{index}" for index in range(length)]
+        for label, binary in (("text", False), ("binary", True)):
+            with tempfile.TemporaryDirectory() as directory:
+                names = []
+                for index in range(count):
+                    character = character_manager.create_character(f"Hero{index}", "Warrior")
+                    character['completed_quests'] = completed
+                    character_manager.save_character(character, directory, binary=binary)
+                    names.append(character['name'])
+                load_us = time_per_call(character_manager.load_character, names, directory)
+                peek_us = time_per_call(character_manager.peek_character, names, directory)
+            print(f"{length:>8} {label:>7} {load_us:>10.1f} {peek_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
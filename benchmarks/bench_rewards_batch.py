@@ -0,0 +1,62 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Benchmark: server-wide rewards, per-character calls vs apply_rewards_batch
+
+Gives every character the same XP and gold, first with gain_experience and
+add_gold in a loop, then with character_manager.apply_rewards_batch, and
+reports the time for each.
+
+Usage: python benchmarks/bench_rewards_batch.py [characters] [xp] [gold]
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+from custom_exceptions import CharacterDeadError
+
+
+def make_characters(count, seed=0):
+    """Characters at mixed levels, with one in a thousand dead"""
+    rng = random.Random(seed)
+    characters = []
+    for index in range(count):
+        character = character_manager.create_character(f"Hero{index}", "Warrior")
+        character['level'] = rng.randint(1, 60)
+        if index % 1000 == 0:
+            character['health'] = 0
+        characters.append(character)
+    return characters
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    xp = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    gold = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    characters = make_characters(count)
+    start = time.perf_counter()
+    for character in characters:
+        try:
+            character_manager.gain_experience(character, xp)
+            character_manager.add_gold(character, gold)
+        except CharacterDeadError:
+            pass
+    loop_seconds = time.perf_counter() - start
+
+    characters = make_characters(count)
+    start = time.perf_counter()
+    errors = character_manager.apply_rewards_batch(characters, xp, gold)
+    batch_seconds = time.perf_counter() - start
+
+    print(f"{count} characters, {xp} XP and {gold} gold each ({len(errors)} dead)")
+    print(f"loop   {loop_seconds:7.3f}s")
+    print(f"batch  {batch_seconds:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
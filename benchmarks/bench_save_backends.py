@@ -0,0 +1,59 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Benchmark: text save files vs the SQLite backend
+
+Saves the same characters through the text file backend and through
+SQLiteBackend with several group commit sizes, then reports saves per
+second and loads per second for each.
+
+Usage: python benchmarks/bench_save_backends.py [characters] [list_length] [batch_sizes]
+       e.g. python benchmarks/bench_save_backends.py 2000 20 1,64,1024
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+from bench_save_formats import make_characters
+
+
+def run(characters, backend):
+    """Return (saves per second, loads per second) through a backend"""
+    start = time.perf_counter()
+    for character in characters:
+        backend.save(character)
+    backend.flush()
+    save_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for character in characters:
+        backend.load(character['name'])
+    load_seconds = time.perf_counter() - start
+    backend.close()
+    return len(characters) / save_seconds, len(characters) / load_seconds
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    list_length = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    batch_sizes = [int(size) for size in sys.argv[3].split(",")] if len(sys.argv) > 3 else [1, 64, 1024]
+    characters = make_characters(count, list_length)
+
+    print(f"{count} characters, lists of {list_length}")
+    print(f"{'backend':>18} {'saves/s':>10} {'loads/s':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        saves, loads = run(characters, character_manager.FileBackend(os.path.join(directory, "text")))
+        print(f"{'text files':>18} {saves:>10.0f} {loads:>10.0f}")
+        for batch_size in batch_sizes:
+            filename = os.path.join(directory, f"saves_{batch_size}.sqlite3")
+            backend = character_manager.SQLiteBackend(filename, batch_size=batch_size)
+            saves, loads = run(characters, backend)
+            print(f"{f'sqlite batch {batch_size}':>18} {saves:>10.0f} {loads:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Benchmark: text vs binary save format
+
+Saves and loads the same set of characters in both formats and reports
+saves per second, loads per second and total bytes on disk.
+
+Usage: python benchmarks/bench_save_formats.py [characters] [list_length]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+
+
+def make_characters(count, list_length, seed=0):
+    """Build characters whose inventory and quest lists share a small id pool"""
+    rng = random.Random(seed)
+    item_ids = [f"item_{index}" for index in range(200)]
+    quest_ids = [f"quest_{index}" for index in range(200)]
+    characters = []
+    for index in range(count):
+        character = character_manager.create_character(f"Hero{index}", "Warrior")
+        character['level'] = rng.randint(1, 50)
+        character['experience'] = rng.randint(0, 10 ** 6)
+        character['gold'] = rng.randint(0, 10 ** 6)
+        character['inventory'] = [rng.choice(item_ids) for _ in range(list_length)]
+        character['active_quests'] = rng.sample(quest_ids, min(list_length, 20))
+        character['completed_quests'] = rng.sample(quest_ids, min(list_length, 100))
+        characters.append(character)
+    return characters
+
+
+def run(characters, directory, binary):
+    """Save and then load every character, returning timings and disk usage"""
+    start = time.perf_counter()
+    for character in characters:
+        character_manager.save_character(character, directory, binary=binary)
+    save_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for character in characters:
+        character_manager.load_character(character['name'], directory)
+    load_seconds = time.perf_counter() - start
+
+    total_bytes = sum(os.path.getsize(os.path.join(directory, filename))
+                      for filename in os.listdir(directory))
+    return save_seconds, load_seconds, total_bytes
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    list_length = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    characters = make_characters(count, list_length)
+
+    print(f"{count} characters, {list_length} inventory entries each")
+    for label, binary in (("text", False), ("binary", True)):
+        with tempfile.TemporaryDirectory() as directory:
+            save_seconds, load_seconds, total_bytes = run(characters, directory, binary)
+        print(f"{label:7} saves/s {count / save_seconds:10.0f}  "
+              f"loads/s {count / load_seconds:10.0f}  bytes {total_bytes:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Benchmark: flat vs sharded save directory lookups
+
+Fills one flat and one sharded save directory with the same characters,
+then times load_character, a missing-save lookup (find_save_file on an
+unknown name) and listing one directory: the whole flat directory vs a
+single shard.
+
+Save files are written directly (no fsync) so setting up a million saves
+takes minutes rather than hours.
+
+Usage: python benchmarks/bench_save_layout.py [saves] [lookups]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+from custom_exceptions import CharacterNotFoundError
+
+
+def fill(save_directory, count, sharded):
+    """Write count save files into save_directory in the given layout"""
+    if sharded:
+        character_manager.migrate_to_sharded(save_directory)
+    character = character_manager.create_character("Hero", "Warrior")
+    for index in range(count):
+        name = f"Hero{index}"
+        # formatted per name: each save's checksum covers its NAME line
+        character['name'] = name
+        filename = character_manager.get_save_path(name, save_directory)
+        try:
+            file = open(filename, "wb")
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(filename))
+            file = open(filename, "wb")
+        with file:
+            file.write(character_manager.format_save_data(character).encode("utf-8"))
+
+
+def time_per_call(function, arguments):
+    """Return mean microseconds per call of function over arguments"""
+    start = time.perf_counter()
+    for argument in arguments:
+        function(argument)
+    return (time.perf_counter() - start) / len(arguments) * 1e6
+
+
+def missing(save_directory):
+    """Return a function that looks up a character that doesn't exist"""
+    def lookup(name):
+        try:
+            character_manager.find_save_file(name, save_directory)
+        except CharacterNotFoundError:
+            pass
+    return lookup
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    rng = random.Random(0)
+    names = [f"Hero{rng.randrange(count)}" for _ in range(lookups)]
+    unknown = [f"Nobody{index}" for index in range(lookups)]
+
+    print(f"{count} saves, {lookups} lookups")
+    with tempfile.TemporaryDirectory() as root:
+        for label, sharded in (("flat", False), ("sharded", True)):
+            save_directory = os.path.join(root, label)
+            os.makedirs(save_directory)
+            start = time.perf_counter()
+            fill(save_directory, count, sharded)
+            setup = time.perf_counter() - start
+
+            load_us = time_per_call(lambda name: character_manager.load_character(name, save_directory), names)
+            missing_us = time_per_call(missing(save_directory), unknown)
+            listed = os.path.dirname(character_manager.get_save_path(names[0], save_directory))
+            start = time.perf_counter()
+            listed_files = len(os.listdir(listed))
+            list_ms = (time.perf_counter() - start) * 1000
+
+            print(f"{label:8} setup {setup:7.1f}s  load {load_us:7.1f}us  "
+                  f"missing {missing_us:6.1f}us  listdir {list_ms:8.2f}ms ({listed_files} entries)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Synthetic content generator
+
+Writes quests.txt/items.txt files of any size in the exact format read by
+game_data.load_quests/load_items, for benchmarks and load testing.
+
+- Every PREREQUISITE is NONE or an earlier quest, so chains are valid and
+  acyclic, and a quest never needs a lower level than its prerequisite.
+- Item TYPE and EFFECT follow the mix of the shipped data/items.txt:
+  weapons raise strength or magic, armor raises max_health, consumables
+  restore health or magic.
+
+Usage: python benchmarks/generate_content.py quests|items COUNT OUTPUT [SEED]
+"""
+
+import os
+import sys
+import random
+
+# (type, weight, [(stat, low, high), ...]) used to pick item types and effects
+ITEM_PROFILES = [
+    ("consumable", 40, [("health", 10, 100), ("magic", 5, 40)]),
+    ("weapon", 35, [("strength", 2, 30), ("magic", 2, 30)]),
+    ("armor", 25, [("max_health", 5, 60)]),
+]
+
+MAX_LEVEL = 60
+
+
+def generate_quests(count, seed=0, prefix="quest"):
+    """
+    Yield count quest dictionaries with valid prerequisite chains
+    
+    About one quest in ten starts a new chain; the rest continue a recent
+    quest, which gives long chains like real questlines. Ids are
+    {prefix}_{n}, so files with different prefixes can be merged.
+    """
+    rng = random.Random(seed)
+    levels = []
+    for i in range(count):
+        if i == 0 or rng.random() < 0.1:
+            prerequisite = "NONE"
+            level = rng.randint(1, MAX_LEVEL // 2)
+        else:
+            parent = rng.randint(max(0, i - 50), i - 1)
+            prerequisite = f"{prefix}_{parent}"
+            level = min(MAX_LEVEL, levels[parent] + rng.randint(0, 2))
+        levels.append(level)
+        yield {"quest_id": f"{prefix}_{i}",
+               "title": f"Quest {i}",
+               "description": f"Synthetic quest number {i} for level {level} heroes",
+               "reward_xp": level * rng.randint(20, 60),
+               "reward_gold": level * rng.randint(5, 30),
+               "required_level": level,
+               "prerequisite": prerequisite}
+
+
+def generate_items(count, seed=0, prefix="item"):
+    """Yield count item dictionaries with realistic TYPE/EFFECT mixes"""
+    rng = random.Random(seed)
+    weights = [weight for _, weight, _ in ITEM_PROFILES]
+    for i in range(count):
+        item_type, _, effects = rng.choices(ITEM_PROFILES, weights)[0]
+        stat, low, high = rng.choice(effects)
+        value = rng.randint(low, high)
+        yield {"item_id": f"{prefix}_{i}",
+               "name": f"{stat.replace('_', ' ').title()} {item_type.title()} {i}",
+               "type": item_type,
+               "effect": f"{stat}:{value}",
+               "cost": value * rng.randint(3, 12),
+               "description": f"Synthetic {item_type} that adds {value} {stat}"}
+
+
+def write_quests(filename, count, seed=0, prefix="quest"):
+    """Write count synthetic quests to filename"""
+    with open(filename, "w") as file:
+        for quest in generate_quests(count, seed, prefix):
+            file.write(f"QUEST_ID: {quest['quest_id']}\n")
+            file.write(f"TITLE: {quest['title']}\n")
+            file.write(f"DESCRIPTION: {quest['description']}\n")
+            file.write(f"REWARD_XP: {quest['reward_xp']}\n")
+            file.write(f"REWARD_GOLD: {quest['reward_gold']}\n")
+            file.write(f"REQUIRED_LEVEL: {quest['required_level']}\n")
+            file.write(f"PREREQUISITE: {quest['prerequisite']}\n\n")
+
+
+def write_items(filename, count, seed=0, prefix="item"):
+    """Write count synthetic items to filename"""
+    with open(filename, "w") as file:
+        for item in generate_items(count, seed, prefix):
+            file.write(f"ITEM_ID: {item['item_id']}\n")
+            file.write(f"NAME: {item['name']}\n")
+            file.write(f"TYPE: {item['type']}\n")
+            file.write(f"EFFECT: {item['effect']}\n")
+            file.write(f"COST: {item['cost']}\n")
+            file.write(f"DESCRIPTION: {item['description']}\n\n")
+
+
+def main():
+    if len(sys.argv) < 4 or sys.argv[1] not in ("quests", "items"):
+        print(__doc__.strip().splitlines()[-1])
+        sys.exit(1)
+    kind, count, output = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    if kind == "quests":
+        write_quests(output, count, seed)
+    else:
+        write_items(output, count, seed)
+    print(f"Wrote {count} {kind} to {output}")
+
+
+if __name__ == "__main__":
+    main()
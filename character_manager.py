@@ -10,14 +10,208 @@ This module handles character creation, loading, and saving.
 """
 
 import os
+import sys
+import json
+import math
+import time
+import queue
+import zlib
+import struct
+import atexit
+import sqlite3
+import hashlib
+import operator
+import threading
+import contextlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from collections.abc import MutableMapping
+try:
+    import numpy as np
+except ImportError:  # only apply_rewards_batch needs it
+    np = None
+try:
+    import fcntl
+except ImportError:  # not on Windows; only save locking needs it
+    fcntl = None
 from custom_exceptions import (
     InvalidCharacterClassError,
     CharacterNotFoundError,
     SaveFileCorruptedError,
     InvalidSaveDataError,
-    CharacterDeadError
+    CharacterDeadError,
+    SaveLockTimeoutError
 )
 
+# Save file keys, in file order, and how their values are stored
+SAVE_TEXT_KEYS = ["NAME", "CLASS"]
+SAVE_INT_KEYS = ["LEVEL", "HEALTH", "MAX_HEALTH", "STRENGTH", "MAGIC", "EXPERIENCE", "GOLD"]
+SAVE_LIST_KEYS = ["INVENTORY", "ACTIVE_QUESTS", "COMPLETED_QUESTS"]
+SAVE_KEYS = SAVE_TEXT_KEYS + SAVE_INT_KEYS + SAVE_LIST_KEYS
+
+# Save file names are {character_name}{suffix}
+TEXT_SAVE_SUFFIX = "_save.txt"
+BINARY_SAVE_SUFFIX = "_save.bin"
+JOURNAL_SUFFIX = "_save.journal"
+# Lock files always go in the shard directory, whatever the layout
+LOCK_SUFFIX = "_save.lock"
+
+# A save directory containing this file uses the sharded layout, where saves
+# live in {save_directory}/ab/cd/ with ab/cd taken from a hash of the name.
+# The file holds SHARD_MIGRATING until every flat save has been moved
+SHARD_MARKER_FILENAME = "sharded_layout"
+SHARD_MIGRATING = "migrating"
+SHARD_COMPLETE = "complete"
+
+# Fields peek_character reads; they all come before the list fields in a
+# text save and in the header of a binary save
+PEEK_KEYS = ["NAME", "CLASS", "LEVEL", "HEALTH", "GOLD"]
+
+# Text saves end with a "CRC32: <hex>" line, the CRC32 of every byte
+# before it
+CHECKSUM_KEY = "CRC32"
+
+# Binary saves start with a magic number and format version, followed by
+# the seven integer stats as little-endian signed 64-bit values. Version 2
+# adds a CRC32 of everything before it as the last four bytes.
+BINARY_SAVE_MAGIC = b"QCSV"
+BINARY_SAVE_VERSION = 2
+BINARY_SAVE_VERSIONS = (1, 2)
+_BINARY_HEADER = struct.Struct("<4sB7q")
+_BINARY_CHECKSUM = struct.Struct("<I")
+
+# Save files handed to a bulk_transform worker per task
+BULK_CHUNK_SIZE = 256
+
+# Seconds to wait for a character's save lock before giving up
+LOCK_TIMEOUT = 10.0
+
+# Per-directory index of saved characters, one JSON record per line.
+# Compacted (see compact_index) once superseded records outnumber live ones
+# by more than INDEX_COMPACT_SLACK
+SAVE_INDEX_FILENAME = "save_index.jsonl"
+INDEX_COMPACT_SLACK = 64
+# Saves also compact the index once it grows more than this many bytes
+# past twice its size after the last compaction
+INDEX_COMPACT_BYTES = 16 * 1024
+
+# A journal bigger than this is folded back into the save file
+JOURNAL_COMPACT_BYTES = 64 * 1024
+# Most characters whose last journaled values are kept in memory; the next
+# journaled save of a character that was dropped re-reads its save file
+JOURNAL_STATE_ENTRIES = 1000
+
+# Character keys and the Character slot that stores each one. "class" is a
+# keyword, so it lives in character_class
+CHARACTER_ATTRIBUTES = {"name": "name",
+                        "class": "character_class",
+                        "level": "level",
+                        "health": "health",
+                        "max_health": "max_health",
+                        "strength": "strength",
+                        "magic": "magic",
+                        "experience": "experience",
+                        "gold": "gold",
+                        "inventory": "inventory",
+                        "active_quests": "active_quests",
+                        "completed_quests": "completed_quests",
+                        "equipped_weapon": "equipped_weapon",
+                        "equipped_armor": "equipped_armor"}
+
+# Directories (by absolute path) whose shard marker has been seen set to
+# SHARD_COMPLETE; that state is final, so they are never checked again
+_sharded_directories = {}
+
+# Functions called as listener(character, stat) after a character's
+# experience, gold or completed quests change (see add_stat_listener)
+_stat_listeners = []
+
+# Values behind the last journaled save fields per (save directory, name),
+# with lists copied, so a save compares against memory to find what changed.
+# Least recently saved first; bounded by JOURNAL_STATE_ENTRIES
+_journal_state = OrderedDict()
+
+# Save index size in bytes right after it was last compacted, per
+# directory (by absolute path), for the write path's compaction check
+_index_sizes = {}
+
+# ============================================================================
+# CHARACTER CLASS
+# ============================================================================
+
+class Character(MutableMapping):
+    """
+    Memory-light character record that behaves like the old character dict
+    
+    The usual keys live in __slots__, so there is no per-character dict.
+    character['gold'], 'equipped_weapon' in character, del, iteration,
+    len() and == against a plain dict all work as before. A slot that was
+    never set counts as a missing key. Keys outside CHARACTER_ATTRIBUTES go
+    to a small overflow dict that is only created when needed.
+    """
+    __slots__ = tuple(CHARACTER_ATTRIBUTES.values()) + ("_extra",)
+
+    def __init__(self, fields=None):
+        self._extra = None
+        if fields:
+            for key, value in fields.items():
+                self[key] = value
+
+    def __getitem__(self, key):
+        attribute = CHARACTER_ATTRIBUTES.get(key)
+        if attribute is None:
+            if self._extra is None:
+                raise KeyError(key)
+            return self._extra[key]
+        try:
+            return getattr(self, attribute)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        attribute = CHARACTER_ATTRIBUTES.get(key)
+        if attribute is None:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+        else:
+            setattr(self, attribute, value)
+
+    def __delitem__(self, key):
+        attribute = CHARACTER_ATTRIBUTES.get(key)
+        if attribute is None:
+            if self._extra is None:
+                raise KeyError(key)
+            del self._extra[key]
+            return
+        try:
+            delattr(self, attribute)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        attribute = CHARACTER_ATTRIBUTES.get(key)
+        if attribute is None:
+            return self._extra is not None and key in self._extra
+        return hasattr(self, attribute)
+
+    def __iter__(self):
+        for key, attribute in CHARACTER_ATTRIBUTES.items():
+            if hasattr(self, attribute):
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"Character({dict(self)!r})"
+
+    def __reduce__(self):
+        return (Character, (dict(self),))
+
 # ============================================================================
 # CHARACTER MANAGEMENT FUNCTIONS
 # ============================================================================
@@ -27,7 +221,7 @@ def create_character(name, character_class):
     
     Valid classes: Warrior, Mage, Rogue, Cleric
     
-    Returns: Dictionary with character data including:
+    Returns: Character (dictionary-like) with character data including:
             - name, class, level, health, max_health, strength, magic
             - experience, gold, inventory, active_quests, completed_quests
     
@@ -46,7 +240,7 @@ def create_character(name, character_class):
     elif character_class == "Cleric":
         base_stats ={"health":100, "strength":10,"magic":15}
 
-    character = {"name":name,
+    character = Character({"name":name,
     "class":character_class,
      "level":1,
      "health":base_stats["health"],
@@ -57,7 +251,7 @@ def create_character(name, character_class):
      "gold":100,
      "inventory":[],
      "active_quests":[],
-     "completed_quests":[]}
+     "completed_quests":[]})
     
     
     return character
@@ -81,7 +275,8 @@ def create_character(name, character_class):
     # Raise InvalidCharacterClassError if class not in valid list
     
 
-def save_character(character, save_directory="data/save_games"):
+def save_character(character, save_directory="data/save_games", journal=False,
+                   compact_bytes=JOURNAL_COMPACT_BYTES, binary=False, lock=False, backend=None):
     """
     Save character to file
     
@@ -100,27 +295,69 @@ def save_character(character, save_directory="data/save_games"):
     INVENTORY: item1,item2,item3
     ACTIVE_QUESTS: quest1,quest2
     COMPLETED_QUESTS: quest1,quest2
+    CRC32: 89abcdef
+    
+    The last line is the CRC32 of the lines above it, checked on load.
+    
+    With journal=True only the fields that changed since the last save are
+    appended to {character_name}_save.journal (finding them still compares
+    every field, see _append_journal), and the journal is folded
+    back into the save file once it grows past compact_bytes. Journaled
+    saves assume one process writes a given character at a time.
+    
+    With binary=True the compact binary format is written to
+    {character_name}_save.bin instead (see encode_binary_save). Saving in
+    one format removes the character's file in the other format. A
+    character with a stat too big for 64 bits is saved as text instead.
+    
+    With lock=True the character's exclusive save lock is held while
+    writing (see character_lock), so other locking processes never see a
+    half-finished save.
+    
+    With backend (a SaveBackend, e.g. SQLiteBackend) the character is
+    saved there instead and the file options are ignored.
     
     Returns: True if successful
     Raises: PermissionError, IOError (let them propagate or handle)
+            ValueError if journal and binary are both requested
+            SaveLockTimeoutError if lock=True and the lock wasn't free in time
     """
+    if backend is not None:
+        return backend.save(character)
+    if lock:
+        with character_lock(character['name'], save_directory):
+            return save_character(character, save_directory, journal, compact_bytes, binary)
+
     if not os.path.exists(save_directory):
         os.makedirs(save_directory)
+        _write_index(save_directory, {})
+
+    if binary:
+        if journal:
+            raise ValueError("Journaled saves use the text format")
+        try:
+            data = encode_binary_save(character)
+        except InvalidSaveDataError:
+            # a stat too big for the binary format: save it as text below
+            data = None
+        if data is not None:
+            write_file_atomic(get_save_path(character['name'], save_directory, BINARY_SAVE_SUFFIX),
+                              data)
+            for suffix in (TEXT_SAVE_SUFFIX, JOURNAL_SUFFIX):
+                _remove_if_exists(get_save_path(character['name'], save_directory, suffix))
+            _journal_state.pop((os.path.abspath(save_directory), character['name']), None)
+            _index_character(save_directory, character)
+            return True
+
+    if journal:
+        _append_journal(character, save_directory, compact_bytes)
+        _index_character(save_directory, character)
+        return True
 
-    filename= os.path.join(save_directory,f"{character['name']}_save.txt")
-    with open (filename,"w") as file:
-        file.write(f"NAME: {character['name']}\n")
-        file.write(f"CLASS: {character['class']}\n")
-        file.write(f"LEVEL: {character['level']}\n")    
-        file.write(f"HEALTH: {character['health']}\n")
-        file.write(f"MAX_HEALTH: {character['max_health']}\n")
-        file.write(f"STRENGTH: {character['strength']}\n")
-        file.write(f"MAGIC: {character['magic']}\n")
-        file.write(f"EXPERIENCE: {character['experience']}\n")
-        file.write(f"GOLD: {character['gold']}\n")
-        file.write(f"INVENTORY: {','.join(character['inventory'])}\n")
-        file.write(f"ACTIVE_QUESTS: {','.join(character['active_quests'])}\n")
-        file.write(f"COMPLETED_QUESTS: {','.join(character['completed_quests'])}\n")
+    filename= get_save_path(character['name'], save_directory)
+    write_snapshot(filename, format_save_data(character))
+    _index_character(save_directory, character)
+    _journal_state.pop((os.path.abspath(save_directory), character['name']), None)
     return True 
 
     # TODO: Implement save functionality
@@ -129,50 +366,583 @@ def save_character(character, save_directory="data/save_games"):
     # Lists should be saved as comma-separated values
     
 
-def load_character(character_name, save_directory="data/save_games"):
+def format_save_data(character):
+    """
+    Build the text of a save file for a character
+    
+    Returns: String in the format described in save_character
+    """
+    return format_save_fields(character_to_save_fields(character))
+
+
+def character_to_save_fields(character):
+    """
+    Convert a character to its save file fields
+    
+    Returns: Dictionary {SAVE_KEY: value text} in save file order
+    """
+    return {key: _save_field_text(key, character[key.lower()]) for key in SAVE_KEYS}
+
+
+def _save_field_text(key, value):
+    """Text of one save field's value"""
+    if key in SAVE_LIST_KEYS:
+        return ','.join(value)
+    return str(value)
+
+
+def format_save_fields(fields):
+    """Turn {SAVE_KEY: value text} into save file text, checksum line last"""
+    text = "".join(f"{key}: {value}\n" for key, value in fields.items())
+    return f"{text}{CHECKSUM_KEY}: {zlib.crc32(text.encode('utf-8')):08x}\n"
+
+
+def get_save_path(character_name, save_directory="data/save_games", suffix=TEXT_SAVE_SUFFIX):
+    """
+    Return the path of a character's save file (or journal, by suffix)
+    
+    In a sharded save directory this is the path inside its shard.
+    """
+    if is_sharded(save_directory):
+        return os.path.join(save_directory, shard_prefix(character_name), f"{character_name}{suffix}")
+    return os.path.join(save_directory, f"{character_name}{suffix}")
+
+
+def shard_prefix(character_name):
+    """Return the shard subdirectory for a character, e.g. 3f/a0"""
+    digest = hashlib.blake2b(character_name.encode("utf-8"), digest_size=2).hexdigest()
+    return os.path.join(digest[:2], digest[2:])
+
+
+def is_sharded(save_directory="data/save_games"):
+    """
+    Return True if a save directory uses the sharded layout
+    
+    Only a completed migration is cached; until then the marker file is
+    checked on every call, so a long-running process notices a migration
+    started by another one.
+    """
+    return _shard_state(save_directory) is not None
+
+
+def _shard_state(save_directory):
+    """
+    Return a directory's marker state: None when flat, else SHARD_MIGRATING
+    or SHARD_COMPLETE (cached once complete, see _sharded_directories)
+    """
+    key = os.path.abspath(save_directory)
+    if key in _sharded_directories:
+        return SHARD_COMPLETE
+    try:
+        with open(os.path.join(save_directory, SHARD_MARKER_FILENAME), "r") as file:
+            state = file.read().strip() or SHARD_MIGRATING
+    except FileNotFoundError:
+        return None
+    if state == SHARD_COMPLETE:
+        _sharded_directories[key] = state
+    return state
+
+
+def _set_shard_state(save_directory, state):
+    """Write a directory's shard marker"""
+    write_file_atomic(os.path.join(save_directory, SHARD_MARKER_FILENAME), state + "\n")
+
+
+def migrate_to_sharded(save_directory="data/save_games"):
+    """
+    Move a flat save directory's files into the sharded layout
+    
+    The marker is written first, so new saves go to their shard straight
+    away, and reads fall back to the flat paths for anything not moved
+    yet. Running it again after an interruption finishes the job. If a
+    character already has the same file in its shard, that one is newer
+    and the flat copy is dropped. Once everything is moved the marker is
+    set to complete and reads stop checking the flat paths.
+    
+    Save locks (character_lock) are already in the shard directories in
+    either layout, so a lock held during the migration keeps working.
+    Flat lock files left by older versions are deleted.
+    
+    Returns: Number of files moved
+    """
+    if not os.path.exists(save_directory):
+        os.makedirs(save_directory)
+    if _shard_state(save_directory) is None:
+        _set_shard_state(save_directory, SHARD_MIGRATING)
+
+    moved = 0
+    with os.scandir(save_directory) as entries:
+        filenames = [entry.name for entry in entries if entry.is_file()]
+    for filename in filenames:
+        if filename.endswith(LOCK_SUFFIX):
+            _remove_if_exists(os.path.join(save_directory, filename))
+            continue
+        for suffix in (TEXT_SAVE_SUFFIX, BINARY_SAVE_SUFFIX, JOURNAL_SUFFIX):
+            if filename.endswith(suffix):
+                source = os.path.join(save_directory, filename)
+                target = get_save_path(filename[:-len(suffix)], save_directory, suffix)
+                if os.path.exists(target):
+                    os.remove(source)
+                else:
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    os.replace(source, target)
+                    moved += 1
+                break
+
+    if _shard_state(save_directory) != SHARD_COMPLETE:
+        _set_shard_state(save_directory, SHARD_COMPLETE)
+    return moved
+
+
+def _save_path_candidates(character_name, save_directory, suffix):
+    """Paths a save may be at: its shard, then mid-migration the flat path"""
+    paths = [get_save_path(character_name, save_directory, suffix)]
+    if _shard_state(save_directory) == SHARD_MIGRATING:
+        paths.append(os.path.join(save_directory, f"{character_name}{suffix}"))
+    return paths
+
+
+def _remove_if_exists(filename):
+    """Delete a file, ignoring it if it's already gone"""
+    try:
+        os.remove(filename)
+    except FileNotFoundError:
+        pass
+
+
+def write_snapshot(filename, text):
+    """
+    Write a full text save file and drop its journal and binary twin
+    
+    The journal is only removed after the new save file is in place, and
+    replaying an old journal onto the newer snapshot gives the same result.
+    """
+    write_file_atomic(filename, text)
+    base = filename[:-len(TEXT_SAVE_SUFFIX)]
+    _remove_if_exists(base + JOURNAL_SUFFIX)
+    _remove_if_exists(base + BINARY_SAVE_SUFFIX)
+
+
+def _journal_values(character):
+    """The values behind a character's save fields, with lists copied"""
+    values = {}
+    for key in SAVE_KEYS:
+        value = character[key.lower()]
+        values[key] = list(value) if key in SAVE_LIST_KEYS else value
+    return values
+
+
+def _append_journal(character, save_directory, compact_bytes):
+    """
+    Append the changed fields of a character to its save journal
+    
+    Only the changed fields are turned into text and written. Finding them
+    still compares every field against the values kept from the last save,
+    so the lists are walked (and copied) on every save: the disk I/O and
+    formatting shrink to the changed fields, the comparison doesn't. Lists
+    are edited in place (inventory.append), so there is no cheaper way to
+    know they changed. The copies are kept for the JOURNAL_STATE_ENTRIES
+    most recently saved characters only; for the others the last values
+    are read back from the save file.
+    """
+    name = character['name']
+    filename = get_save_path(name, save_directory)
+    journal_filename = get_save_path(name, save_directory, JOURNAL_SUFFIX)
+    state_key = (os.path.abspath(save_directory), name)
+
+    values = _journal_values(character)
+    last_values = _journal_state.pop(state_key, None)
+    changed = {}
+    if last_values is None:
+        # first journaled save in this process: compare against the disk
+        if not os.path.exists(filename):
+            write_snapshot(filename, format_save_data(character))
+            _remember_journal_values(state_key, values)
+            return
+        last_fields = read_save_fields(name, save_directory)
+        for key, value in character_to_save_fields(character).items():
+            if last_fields.get(key) != value:
+                changed[key] = value
+    else:
+        for key, value in values.items():
+            last = last_values[key]
+            # 5 == 5.0 but they save differently, so compare types too
+            if type(value) is not type(last) or value != last:
+                changed[key] = _save_field_text(key, value)
+
+    if changed:
+        with open(journal_filename, "a") as file:
+            file.write(json.dumps(changed) + "\n")
+            file.flush()
+            journal_size = file.tell()
+        if journal_size >= compact_bytes:
+            write_snapshot(filename, format_save_data(character))
+    _remember_journal_values(state_key, values)
+
+
+def _remember_journal_values(state_key, values):
+    """Keep a character's journaled values, dropping the least recently saved"""
+    _journal_state[state_key] = values
+    while len(_journal_state) > JOURNAL_STATE_ENTRIES:
+        try:
+            _journal_state.popitem(last=False)
+        except KeyError:
+            # emptied by another thread meanwhile
+            break
+
+
+def compact_journal(character_name, save_directory="data/save_games"):
+    """
+    Fold a character's journal into its save file
+    
+    Returns: True if there was a journal to compact
+    Raises: Same exceptions as load_character
+    """
+    if not os.path.exists(get_save_path(character_name, save_directory, JOURNAL_SUFFIX)):
+        return False
+    fields = read_save_fields(character_name, save_directory)
+    write_snapshot(get_save_path(character_name, save_directory), format_save_fields(fields))
+    _journal_state.pop((os.path.abspath(save_directory), character_name), None)
+    return True
+
+
+def write_file_atomic(filename, text):
+    """
+    Replace a file's contents without ever leaving it half-written
+    
+    The data goes to a temporary file in the same directory which is then
+    swapped in with os.replace, so readers see the old or the new file.
+    text may be a string or bytes. A string is written as UTF-8 with its
+    "\\n" line endings untouched, whatever the platform and locale, so a
+    save file holds exactly the bytes its checksum was computed over.
+    """
+    if isinstance(text, str):
+        text = text.encode("utf-8")
+    # unique per writer, so concurrent saves never share a temp file
+    temp_filename = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        try:
+            file = open(temp_filename, "wb")
+        except FileNotFoundError:
+            # first file in a new shard directory
+            os.makedirs(os.path.dirname(temp_filename), exist_ok=True)
+            file = open(temp_filename, "wb")
+        with file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_filename, filename)
+    except BaseException:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        raise
+    
+
+def load_character(character_name, save_directory="data/save_games", lock=False, backend=None):
     """
     Load character from save file
     
     Args:
         character_name: Name of character to load
         save_directory: Directory containing save files
+        lock: If True, hold the character's shared save lock while reading
+        backend: Optional SaveBackend to load from instead of save_directory
     
     Returns: Character dictionary
     Raises: 
         CharacterNotFoundError if save file doesn't exist
         SaveFileCorruptedError if file exists but can't be read
         InvalidSaveDataError if data format is wrong
+        SaveLockTimeoutError if lock=True and the lock wasn't free in time
+    """
+    if backend is not None:
+        return backend.load(character_name)
+    if lock:
+        with character_lock(character_name, save_directory, exclusive=False):
+            return load_character(character_name, save_directory)
+    return _load_save_file(find_save_file(character_name, save_directory))
+
+
+def _load_save_file(filename):
+    """load_character for a known save file path"""
+    data = _read_save_bytes(filename)
+    if data.startswith(BINARY_SAVE_MAGIC):
+        return decode_binary_save(data)
+    fields = _parse_save_text(data)
+    _replay_journal_if_present(filename, fields)
+    return save_fields_to_character(fields)
+
+
+def iter_characters(save_directory="data/save_games", errors=None):
+    """
+    Yield every saved character in a directory, one at a time
+    
+    Same as load_character on each save, found with a streaming scan
+    (flat or sharded layout), without holding them all in memory.
+    
+    Args:
+        errors: Optional list; if given, (filename, exception) is appended
+                for each unreadable save and iteration carries on,
+                otherwise the exception is raised
+    
+    Yields: Character
+    """
+    if not os.path.exists(save_directory):
+        return
+    for filename in _iter_save_files(save_directory):
+        try:
+            character = _load_save_file(filename)
+        except (SaveFileCorruptedError, InvalidSaveDataError) as error:
+            if errors is None:
+                raise
+            errors.append((filename, error))
+            continue
+        yield character
+
+
+def peek_character(character_name, save_directory="data/save_games"):
+    """
+    Read a character's name, class, level, health and gold only
+    
+    Stops reading a text save once those fields are found, before the
+    inventory and quest lines, and reads only the header of a binary save,
+    so the cost doesn't grow with list length. A journal is still applied.
+    
+    Returns: Dictionary {"name", "class", "level", "health", "gold"}
+    Raises: Same exceptions as load_character
+    """
+    return _peek_save_file(find_save_file(character_name, save_directory))
+
+
+def iter_character_summaries(save_directory="data/save_games", errors=None):
+    """
+    Yield peek_character summaries for every save in a directory
+    
+    Save files are found with a streaming scan (flat or sharded layout).
+    
+    Args:
+        errors: Optional list; if given, (filename, exception) is appended
+                for each unreadable save and iteration carries on,
+                otherwise the exception is raised
+    
+    Yields: Dictionary {"name", "class", "level", "health", "gold"}
     """
-    filename = os.path.join(save_directory,f"{character_name}_save.txt")
+    if not os.path.exists(save_directory):
+        return
+    for filename in _iter_save_files(save_directory):
+        try:
+            summary = _peek_save_file(filename)
+        except (SaveFileCorruptedError, InvalidSaveDataError) as error:
+            if errors is None:
+                raise
+            errors.append((filename, error))
+            continue
+        yield summary
+
+
+def _peek_save_file(filename):
+    """peek_character for a known save file path"""
+    try:
+        with open(filename, "rb") as file:
+            data = file.read(256)
+            if data.startswith(BINARY_SAVE_MAGIC):
+                try:
+                    return _peek_binary_save(data)
+                except InvalidSaveDataError:
+                    # name or class longer than the first read
+                    return _peek_binary_save(data + file.read())
+
+            file.seek(0)
+            fields = {}
+            for line in file:
+                try:
+                    line = line.decode("utf-8")
+                except UnicodeDecodeError:
+                    raise SaveFileCorruptedError(f"Could not read save file")
+                if ":" not in line:
+                    raise InvalidSaveDataError(f"Format not valid")
+                key, value = line.strip().split(":", 1)
+                key = key.strip()
+                if key in SAVE_LIST_KEYS:
+                    break
+                fields[key] = value.strip()
+                if all(peek_key in fields for peek_key in PEEK_KEYS):
+                    break
+    except OSError:
+        raise SaveFileCorruptedError(f"Could not read save file")
+
+    _replay_journal_if_present(filename, fields)
+    summary = {}
+    for key in PEEK_KEYS:
+        if key not in fields:
+            raise InvalidSaveDataError(f"Missing a required key: {key}")
+        if key in SAVE_INT_KEYS:
+            if not fields[key].isdigit():
+                raise InvalidSaveDataError(f"Expected Integer value for {key}")
+            summary[key.lower()] = int(fields[key])
+        else:
+            summary[key.lower()] = fields[key]
+    return summary
+
+
+def _peek_binary_save(data):
+    """Read the summary fields from the start of a binary save"""
+    try:
+        header = _BINARY_HEADER.unpack_from(data, 0)
+        if header[1] not in BINARY_SAVE_VERSIONS:
+            raise InvalidSaveDataError(f"Unsupported binary save version: {header[1]}")
+        name, position = _read_binary_text(data, _BINARY_HEADER.size)
+        character_class, position = _read_binary_text(data, position)
+    except (struct.error, IndexError, UnicodeDecodeError):
+        raise InvalidSaveDataError("Binary save file is truncated or corrupted")
+    return {"name": name, "class": character_class, "level": header[2],
+            "health": header[3], "gold": header[8]}
+
 
-    if not os.path.exists(filename):
-        raise CharacterNotFoundError(f"Save directory does not exist")
+def find_save_file(character_name, save_directory="data/save_games"):
+    """
+    Return the path of a character's save file, text or binary
     
+    Raises: CharacterNotFoundError if there is neither
+    """
+    for suffix in (TEXT_SAVE_SUFFIX, BINARY_SAVE_SUFFIX):
+        for filename in _save_path_candidates(character_name, save_directory, suffix):
+            if os.path.exists(filename):
+                return filename
+    raise CharacterNotFoundError(f"Save directory does not exist")
+
+
+def _read_save_bytes(filename):
+    """Read a whole save file, raising SaveFileCorruptedError on failure"""
     try:
-        with open (filename,"r") as file:
-            lines = file.readlines()
-    except:
+        with open(filename, "rb") as file:
+            return file.read()
+    except OSError:
         raise SaveFileCorruptedError(f"Could not read save file")
+
+
+def _parse_save_text(data):
+    """
+    Split the raw bytes of a text save into {SAVE_KEY: value text}
+    
+    The checksum line is verified (see _check_save_text) and left out.
     
-    character={}
+    Raises: SaveFileCorruptedError, InvalidSaveDataError
+    """
+    data, checked = _check_save_text(data)
+    try:
+        lines = data.decode("utf-8").splitlines()
+    except UnicodeDecodeError:
+        raise SaveFileCorruptedError(f"Could not read save file")
 
+    fields = {}
     for line in lines:
         if ":" not in line:
             raise InvalidSaveDataError(f"Format not valid")
         
         key,value = line.strip().split(":",1)
-        key = key.strip()
-        value = value.strip()
+        fields[key.strip()] = value.strip()
+    return fields
+
+
+def _check_save_text(data):
+    """
+    Verify the CRC32 line at the end of a text save's raw bytes
+    
+    Saves written before checksums were added have no CRC32 line; those
+    are accepted as long as they end with a newline like every complete
+    save does, so a file cut off part way through a line is still caught.
+    
+    Returns: (bytes before the checksum line, True if it had one)
+    Raises: SaveFileCorruptedError on a mismatch or a truncated file
+    """
+    start = data.rfind(b"\n", 0, len(data) - 1) + 1
+    last_line = data[start:]
+    prefix = CHECKSUM_KEY.encode("ascii") + b":"
+    if not last_line.startswith(prefix):
+        if data and not data.endswith(b"\n"):
+            raise SaveFileCorruptedError("Save file is truncated")
+        return data, False
+    try:
+        expected = int(last_line[len(prefix):], 16)
+    except ValueError:
+        raise SaveFileCorruptedError("Save file checksum line is damaged")
+    if not last_line.endswith(b"\n") or zlib.crc32(memoryview(data)[:start]) != expected:
+        raise SaveFileCorruptedError("Save file does not match its checksum")
+    return data[:start], True
+
+
+def _replay_journal_if_present(filename, fields):
+    """Apply the journal next to a text save file to fields if one exists"""
+    if not filename.endswith(TEXT_SAVE_SUFFIX):
+        return
+    journal_filename = filename[:-len(TEXT_SAVE_SUFFIX)] + JOURNAL_SUFFIX
+    if os.path.exists(journal_filename):
+        _replay_journal(journal_filename, fields)
+    
+
+def read_save_fields(character_name, save_directory="data/save_games"):
+    """
+    Read a save file, replaying its journal if there is one
+    
+    Returns: Dictionary {SAVE_KEY: value text}
+    Raises: CharacterNotFoundError, SaveFileCorruptedError, InvalidSaveDataError
+    """
+    filename = find_save_file(character_name, save_directory)
+    data = _read_save_bytes(filename)
+    if data.startswith(BINARY_SAVE_MAGIC):
+        return character_to_save_fields(decode_binary_save(data))
+    fields = _parse_save_text(data)
+    _replay_journal_if_present(filename, fields)
+    return fields
+
+
+def _replay_journal(journal_filename, fields):
+    """
+    Apply every journal record to fields in order
+    
+    A torn last record (a crash during append) is ignored.
+    """
+    try:
+        with open(journal_filename, "r") as file:
+            records = file.readlines()
+    except OSError:
+        raise SaveFileCorruptedError(f"Could not read save journal")
+
+    for number, record in enumerate(records):
+        try:
+            changes = json.loads(record)
+        except ValueError:
+            if number == len(records) - 1 and not record.endswith("\n"):
+                break
+            raise InvalidSaveDataError(f"Bad journal record on line {number + 1}")
+        if not isinstance(changes, dict):
+            raise InvalidSaveDataError(f"Bad journal record on line {number + 1}")
+        fields.update(changes)
+
+
+def save_fields_to_character(fields):
+    """
+    Convert {SAVE_KEY: value text} into a Character
+    
+    Raises: InvalidSaveDataError if a key or value is invalid or a key is
+            missing
+    """
+    for key in SAVE_KEYS:
+        if key not in fields:
+            raise InvalidSaveDataError(f"Missing a required key: {key}")
+    character=Character()
 
-        if key in ["NAME", "CLASS"]:
+    for key, value in fields.items():
+        if key in SAVE_TEXT_KEYS:
             character[key.lower()] = value 
     
-        elif key in ["LEVEL","HEALTH","MAX_HEALTH","STRENGTH","MAGIC","EXPERIENCE","GOLD"]:
+        elif key in SAVE_INT_KEYS:
             if not value.isdigit():
                 raise InvalidSaveDataError(f"Expected Integer value for {key}")
             character[key.lower()] = int(value)
 
-        elif key in ["INVENTORY","ACTIVE_QUESTS","COMPLETED_QUESTS"]:
+        elif key in SAVE_LIST_KEYS:
             if value == "":
                 character[key.lower()] = []
             else:
@@ -192,45 +962,236 @@ def load_character(character_name, save_directory="data/save_games"):
     # Validate data format → InvalidSaveDataError
     # Parse comma-separated lists back into Python lists
 
-def list_saved_characters(save_directory="data/save_games"):
+def list_saved_characters(save_directory="data/save_games", summary=False, backend=None):
     """
     Get list of all saved character names
     
-    Returns: List of character names (without _save.txt extension)
+    Names come from the directory's save index, so no save file is opened
+    and the directory isn't listed. A missing index is rebuilt first.
+    
+    Args:
+        summary: If True, return index records instead of names:
+                 {"name", "class", "level", "mtime"}
+        backend: Optional SaveBackend to list instead of save_directory
+    
+    Returns: List of character names (without _save.txt/_save.bin extension)
     """
+    if backend is not None:
+        return backend.list_names(summary)
     if not os.path.exists(save_directory):
         return []
+
+    index = read_save_index(save_directory)
+    if index is None:
+        index = rebuild_index(save_directory)
+    if summary:
+        return list(index.values())
+    return list(index)
+
+
+def read_save_index(save_directory="data/save_games"):
+    """
+    Read a save directory's index
+    
+    Later records replace earlier ones for the same name, and a torn last
+    line (a save interrupted mid-append) is ignored. When the file holds
+    many superseded records it is compacted with compact_index.
+    
+    Returns: Dictionary {name: record}, or None if the index is missing or
+             unreadable (call rebuild_index)
+    """
+    try:
+        with open(os.path.join(save_directory, SAVE_INDEX_FILENAME), "r") as file:
+            parsed = _parse_index(file)
+    except (OSError, UnicodeDecodeError):
+        return None
+    if parsed is None:
+        return None
+
+    index, lines = parsed
+    if lines > 2 * len(index) + INDEX_COMPACT_SLACK and fcntl is not None:
+        return compact_index(save_directory) or index
+    return index
+
+
+def compact_index(save_directory="data/save_games"):
+    """
+    Rewrite a save directory's index with one record per character
+    
+    Saves in other processes may append to the index at any moment, so
+    the file is re-read and replaced while holding an exclusive flock on
+    it. Appenders hold a shared flock and reopen the file if it was
+    replaced while they waited (see _append_index_records), so no record
+    is lost.
+    
+    Returns: Dictionary {name: record}, or None if the index is missing or
+             unreadable (call rebuild_index)
+    Raises: ImportError where fcntl isn't available (Windows)
+    """
+    if fcntl is None:
+        raise ImportError("Index compaction requires fcntl (not available on this platform)")
+    filename = os.path.join(save_directory, SAVE_INDEX_FILENAME)
+    while True:
+        try:
+            file = open(filename, "r")
+        except OSError:
+            return None
+        with file:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            if _index_replaced(file, filename):
+                # another process compacted it while we waited
+                continue
+            try:
+                parsed = _parse_index(file)
+            except UnicodeDecodeError:
+                return None
+            if parsed is None:
+                return None
+            _write_index(save_directory, parsed[0])
+            _index_sizes[os.path.abspath(save_directory)] = os.path.getsize(filename)
+            return parsed[0]
+
+
+def _parse_index(file):
+    """Return ({name: record}, number of complete lines), or None if unreadable"""
+    index = {}
+    lines = 0
+    for line in file:
+        if not line.endswith("\n"):
+            break
+        try:
+            record = json.loads(line)
+            name = record["name"]
+        except (ValueError, KeyError, TypeError):
+            return None
+        if record.get("deleted"):
+            index.pop(name, None)
+        else:
+            index[name] = record
+        lines += 1
+    return index, lines
+
+
+def _index_replaced(file, filename):
+    """Whether filename no longer names the open index file"""
+    try:
+        return os.stat(filename).st_ino != os.fstat(file.fileno()).st_ino
+    except FileNotFoundError:
+        return True
+
+
+def rebuild_index(save_directory="data/save_games"):
+    """
+    Recreate a save directory's index from the save files themselves
+    
+    Use this when the index is missing or out of date, e.g. after save
+    files were copied in by hand. Saves that can't be read are still
+    listed, with class and level set to None. Files load_character
+    wouldn't find (a flat save left in a completed sharded directory)
+    are skipped.
     
-    files = os.listdir(save_directory)
+    Returns: Dictionary {name: record} that was written
+    """
+    names = {}
+    for _, _, filenames in os.walk(save_directory):
+        for filename in sorted(filenames):
+            for suffix in (TEXT_SAVE_SUFFIX, BINARY_SAVE_SUFFIX):
+                if filename.endswith(suffix):
+                    names[filename[:-len(suffix)]] = True
+
+    index = {}
+    for name in names:
+        try:
+            mtime = os.path.getmtime(find_save_file(name, save_directory))
+        except CharacterNotFoundError:
+            continue
+        try:
+            summary = peek_character(name, save_directory)
+            index[name] = _index_record(name, summary['class'], summary['level'], mtime)
+        except (SaveFileCorruptedError, InvalidSaveDataError):
+            index[name] = _index_record(name, None, None, mtime)
+
+    if not os.path.exists(save_directory):
+        os.makedirs(save_directory)
+    _write_index(save_directory, index)
+    return index
+
+
+def _index_record(name, character_class, level, mtime):
+    """Build one save index record"""
+    return {"name": name, "class": character_class, "level": level, "mtime": mtime}
+
 
-    saved_characters = []
+def _index_character(save_directory, character):
+    """Record a just-saved character in the save index"""
+    _append_index_records(save_directory, [_index_record(
+        character['name'], character['class'], character['level'], time.time())])
 
-    for filename in files:
-        if filename.endswith("_save.txt"):
-            name = filename.replace("_save.txt","")
-            saved_characters.append(name)
-    return saved_characters
-    # TODO: Implement this function
-    # Return empty list if directory doesn't exist
-    # Extract character names from filenames
+
+def _append_index_records(save_directory, records):
+    """
+    Append records to the save index, skipping it if there is none yet
     
+    Holds a shared flock while writing so compact_index can't replace the
+    file between our open and our write. Every save appends a record, so
+    the index is compacted here once it has grown by INDEX_COMPACT_BYTES
+    plus its size after the last compaction; that keeps it bounded even
+    if nothing ever reads it, at an amortized O(1) cost per save.
+    """
+    filename = os.path.join(save_directory, SAVE_INDEX_FILENAME)
+    text = "".join(json.dumps(record) + "\n" for record in records)
+    while True:
+        if not os.path.exists(filename):
+            # list_saved_characters will build it from the save files
+            return
+        with open(filename, "a") as file:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_SH)
+                if _index_replaced(file, filename):
+                    continue
+            file.write(text)
+            file.flush()
+            size = file.tell()
+        break
+
+    # compact_index needs the exclusive lock, so only after ours is released
+    compacted_size = _index_sizes.get(os.path.abspath(save_directory), 0)
+    if fcntl is not None and size > 2 * compacted_size + INDEX_COMPACT_BYTES:
+        compact_index(save_directory)
 
-def delete_character(character_name, save_directory="data/save_games"):
+
+def _write_index(save_directory, index):
+    """Replace the save index with one record per character"""
+    write_file_atomic(os.path.join(save_directory, SAVE_INDEX_FILENAME),
+                      "".join(json.dumps(record) + "\n" for record in index.values()))
+
+
+def delete_character(character_name, save_directory="data/save_games", backend=None):
     """
     Delete a character's save file
     
+    Args:
+        backend: Optional SaveBackend to delete from instead of save_directory
+    
     Returns: True if deleted successfully
     Raises: CharacterNotFoundError if character doesn't exist
     """
+    if backend is not None:
+        return backend.delete(character_name)
     if not os.path.exists(save_directory):
         raise CharacterNotFoundError(f"Character does not exist")
     
-    filepath = os.path.join(save_directory,f"{character_name}_save.txt")
-
-    if not os.path.exists(filepath):
+    try:
+        filepath = find_save_file(character_name, save_directory)
+    except CharacterNotFoundError:
         raise CharacterNotFoundError(f"Character does not exist")
     
     os.remove(filepath)
+    for suffix in (TEXT_SAVE_SUFFIX, BINARY_SAVE_SUFFIX, JOURNAL_SUFFIX):
+        for path in _save_path_candidates(character_name, save_directory, suffix):
+            _remove_if_exists(path)
+    _journal_state.pop((os.path.abspath(save_directory), character_name), None)
+    _append_index_records(save_directory, [{"name": character_name, "deleted": True}])
     return True
    
     # TODO: Implement character deletion
@@ -238,38 +1199,1198 @@ def delete_character(character_name, save_directory="data/save_games"):
     
 
 # ============================================================================
-# CHARACTER OPERATIONS
+# BINARY SAVE FORMAT
 # ============================================================================
 
-def gain_experience(character, xp_amount):
+def encode_binary_save(character):
     """
-    Add experience to character and handle level ups
+    Pack a character into the binary save format
     
-    Level up formula: level_up_xp = current_level * 100
-    Example when leveling up:
-    - Increase level by 1
-    - Increase max_health by 10
-    - Increase strength by 2
-    - Increase magic by 2
-    - Restore health to max_health
+    Layout (version 2):
+        header   - magic, version byte, then level, health, max_health,
+                   strength, magic, experience, gold (struct "<4sB7q")
+        name     - varint byte length + UTF-8 text, then class the same way
+        id table - varint byte length + the distinct inventory/quest ids as
+                   newline separated UTF-8 (ids can't hold newlines, the
+                   text format is line based too)
+        lists    - inventory, active_quests, completed_quests, each a
+                   varint count followed by varint indexes into the id table
+        checksum - CRC32 of everything above (struct "<I")
     
-    Raises: CharacterDeadError if character health is 0
+    Version 1 files are the same without the checksum and still load.
+    
+    Returns: bytes
+    Raises: InvalidSaveDataError if a stat isn't an int that fits in 64
+            bits (huge XP awards can level past that); the text format
+            has no such limit
     """
+    for key in ("level", "health", "max_health", "strength", "magic", "experience", "gold"):
+        value = character[key]
+        if type(value) is not int or not -2 ** 63 <= value < 2 ** 63:
+            raise InvalidSaveDataError(
+                f"{key.upper()} {value!r} can't be stored in a binary save (64-bit ints only)")
+    data = bytearray(_BINARY_HEADER.pack(
+        BINARY_SAVE_MAGIC, BINARY_SAVE_VERSION,
+        character['level'], character['health'], character['max_health'],
+        character['strength'], character['magic'], character['experience'],
+        character['gold']))
+    _write_binary_text(data, character['name'])
+    _write_binary_text(data, character['class'])
 
-    if character["health"] ==0:
+    id_indexes = {}
+    lists = []
+    for key in ("inventory", "active_quests", "completed_quests"):
+        indexes = []
+        for entry_id in character[key]:
+            index = id_indexes.get(entry_id)
+            if index is None:
+                index = id_indexes[entry_id] = len(id_indexes)
+            indexes.append(index)
+        lists.append(indexes)
+
+    # dicts keep insertion order, so the keys are the table in index order
+    _write_binary_text(data, "\n".join(id_indexes))
+    for indexes in lists:
+        _write_varint(data, len(indexes))
+        if len(id_indexes) <= 0x80:
+            # every index fits in a single varint byte
+            data.extend(indexes)
+        else:
+            for index in indexes:
+                _write_varint(data, index)
+    data.extend(_BINARY_CHECKSUM.pack(zlib.crc32(data)))
+    return bytes(data)
+
+
+def decode_binary_save(data):
+    """
+    Unpack bytes written by encode_binary_save
+    
+    Returns: Character
+    Raises: SaveFileCorruptedError if the checksum doesn't match
+            InvalidSaveDataError if the data is not a valid binary save
+    """
+    try:
+        header = _BINARY_HEADER.unpack_from(data, 0)
+        if header[0] != BINARY_SAVE_MAGIC:
+            raise InvalidSaveDataError("Not a binary save file")
+        if header[1] not in BINARY_SAVE_VERSIONS:
+            raise InvalidSaveDataError(f"Unsupported binary save version: {header[1]}")
+        if header[1] >= 2:
+            end = len(data) - _BINARY_CHECKSUM.size
+            expected, = _BINARY_CHECKSUM.unpack_from(data, end)
+            if zlib.crc32(memoryview(data)[:end]) != expected:
+                raise SaveFileCorruptedError("Binary save file does not match its checksum")
+            data = data[:end]
+        position = _BINARY_HEADER.size
+        name, position = _read_binary_text(data, position)
+        character_class, position = _read_binary_text(data, position)
+        id_text, position = _read_binary_text(data, position)
+        id_table = id_text.split("\n") if id_text else []
+
+        lists = []
+        for _ in range(3):
+            count, position = _read_varint(data, position)
+            chunk = data[position:position + count]
+            if len(chunk) == count and (not chunk or max(chunk) < 0x80):
+                # all single byte varints, the common case
+                lists.append([id_table[index] for index in chunk])
+                position += count
+                continue
+            entries = []
+            for _ in range(count):
+                index = data[position]
+                if index < 0x80:
+                    position += 1
+                else:
+                    index, position = _read_varint(data, position)
+                entries.append(id_table[index])
+            lists.append(entries)
+    except (struct.error, IndexError, UnicodeDecodeError):
+        raise InvalidSaveDataError("Binary save file is truncated or corrupted")
+    if position != len(data):
+        raise InvalidSaveDataError("Binary save file has trailing data")
+
+    return Character({"name": name,
+            "class": character_class,
+            "level": header[2],
+            "health": header[3],
+            "max_health": header[4],
+            "strength": header[5],
+            "magic": header[6],
+            "experience": header[7],
+            "gold": header[8],
+            "inventory": lists[0],
+            "active_quests": lists[1],
+            "completed_quests": lists[2]})
+
+
+def convert_save(character_name, save_directory="data/save_games", binary=True):
+    """
+    Rewrite a character's save in the other format
+    
+    Args:
+        binary: True to convert to the binary format, False for text
+    
+    Returns: Path of the new save file (still a text save if the character
+             can't be stored in the binary format, see save_character)
+    Raises: Same exceptions as load_character
+    """
+    character = load_character(character_name, save_directory)
+    save_character(character, save_directory, binary=binary)
+    return find_save_file(character_name, save_directory)
+
+
+def _write_varint(data, value):
+    """Append an unsigned LEB128 varint to a bytearray"""
+    while value >= 0x80:
+        data.append((value & 0x7F) | 0x80)
+        value >>= 7
+    data.append(value)
+
+
+def _read_varint(data, position):
+    """Read an unsigned LEB128 varint, returning (value, new position)"""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def _write_binary_text(data, text):
+    """Append length-prefixed UTF-8 text to a bytearray"""
+    encoded = text.encode("utf-8")
+    _write_varint(data, len(encoded))
+    data.extend(encoded)
+
+
+def _read_binary_text(data, position):
+    """Read length-prefixed UTF-8 text, returning (text, new position)"""
+    length, position = _read_varint(data, position)
+    end = position + length
+    if end > len(data):
+        raise IndexError("text runs past the end of the data")
+    return data[position:end].decode("utf-8"), end
+
+# ============================================================================
+# WRITE-BEHIND SAVING
+# ============================================================================
+
+class SaveManager:
+    """
+    Coalesces character saves instead of writing after every action
+    
+    Call mark_dirty() when a character changes and maybe_flush() after each
+    action. Dirty characters are written once max_pending changes have
+    piled up or max_delay seconds have passed since the first unsaved
+    change, and always on flush()/close() and at interpreter exit.
+    A character whose save text hasn't changed is never rewritten.
+    """
+
+    def __init__(self, save_directory="data/save_games", max_pending=20, max_delay=30.0,
+                 clock=time.monotonic):
+        """
+        Args:
+            save_directory: Directory passed to save_character
+            max_pending: Number of changes that forces a flush
+            max_delay: Seconds an unsaved change may wait
+            clock: Function returning the current time (for tests)
+        """
+        self.save_directory = save_directory
+        self.max_pending = max_pending
+        self.max_delay = max_delay
+        self.clock = clock
+        self.pending = 0
+        self.writes = 0
+        self._dirty = {}
+        self._last_saved = {}
+        self._first_change = None
+        atexit.register(self.flush)
+
+    def mark_dirty(self, character):
+        """Record that a character changed and needs saving"""
+        if character is None:
+            return
+        self._dirty[character["name"]] = character
+        self.pending += 1
+        if self._first_change is None:
+            self._first_change = self.clock()
+
+    def is_dirty(self):
+        """Return True if any change hasn't been written yet"""
+        return bool(self._dirty)
+
+    def maybe_flush(self):
+        """
+        Flush if the operation or time budget is used up
+        
+        Returns: True if a flush happened
+        """
+        if not self._dirty:
+            return False
+        if self.pending >= self.max_pending or self.clock() - self._first_change >= self.max_delay:
+            self.flush()
+            return True
+        return False
+
+    def flush(self):
+        """
+        Write every dirty character now
+        
+        Returns: Number of save files written
+        """
+        written = 0
+        for name, character in list(self._dirty.items()):
+            text = format_save_data(character)
+            if self._last_saved.get(name) != text:
+                if not os.path.exists(self.save_directory):
+                    os.makedirs(self.save_directory)
+                    _write_index(self.save_directory, {})
+                write_snapshot(get_save_path(name, self.save_directory), text)
+                _journal_state.pop((os.path.abspath(self.save_directory), name), None)
+                _index_character(self.save_directory, character)
+                self._last_saved[name] = text
+                written += 1
+            del self._dirty[name]
+        self.pending = 0
+        self._first_change = None
+        self.writes += written
+        return written
+
+    def close(self):
+        """Flush and stop the exit-time flush"""
+        self.flush()
+        atexit.unregister(self.flush)
+
+# ============================================================================
+# CHARACTER CACHE
+# ============================================================================
+
+class CharacterCache:
+    """
+    Bounded LRU of live characters shared by every session in the process
+    
+    get() returns the cached character or loads it with load_character.
+    Callers change the character in place and call mark_dirty(character);
+    dirty characters are written with save_character when they are evicted and
+    on flush()/close(). Entries are evicted least recently used first once
+    there are more than max_entries, or their estimated size passes
+    max_bytes. All methods are thread-safe, and concurrent get() calls for
+    the same name return the same object, loading it only once.
+    
+    If writing back an evicted character fails, it stays cached and dirty
+    (so the change isn't lost) and the save error is raised from the call
+    that caused the eviction; the cache may then be over budget until a
+    later eviction or flush() succeeds.
+    """
+
+    def __init__(self, save_directory="data/save_games", max_entries=1000, max_bytes=None):
+        """
+        Args:
+            save_directory: Directory passed to load_character/save_character
+            max_entries: Most characters kept in memory
+            max_bytes: Optional budget for estimate_character_size totals
+        """
+        self.save_directory = save_directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writebacks = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._dirty = set()
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def get(self, character_name):
+        """
+        Return a character, loading it on a cache miss
+        
+        Raises: Same exceptions as load_character
+        """
+        while True:
+            with self._lock:
+                character = self._entries.get(character_name)
+                if character is not None:
+                    self._entries.move_to_end(character_name)
+                    self.hits += 1
+                    return character
+                loading = self._loading.get(character_name)
+                if loading is None:
+                    loading = self._loading[character_name] = threading.Event()
+                    self.misses += 1
+                    break
+            # someone else is loading it; use their result (or retry)
+            loading.wait()
+
+        try:
+            character = load_character(character_name, self.save_directory)
+            with self._lock:
+                del self._loading[character_name]
+                if character_name in self._entries:
+                    # put() while we were loading; the cached object wins
+                    character = self._entries[character_name]
+                else:
+                    self._insert(character)
+        except BaseException:
+            with self._lock:
+                self._loading.pop(character_name, None)
+            raise
+        finally:
+            # always wake the waiters, even if the load or a write-back failed
+            loading.set()
+        return character
+
+    def put(self, character, dirty=True):
+        """Add a character (e.g. a new one) to the cache, replacing any cached copy"""
+        with self._lock:
+            name = character['name']
+            if name in self._entries:
+                self._forget(name)
+            self._insert(character)
+            if dirty:
+                self._dirty.add(name)
+
+    def mark_dirty(self, character):
+        """
+        Record that a character from get() changed and needs writing back
+        
+        A session may still hold a character that was evicted (and written
+        back) since it called get(); it is put back in the cache, so the
+        change is saved and later get() calls share the object again.
+        
+        Raises: ValueError if the character was evicted and another copy
+                has been loaded since; call get() and apply the change to
+                the cached copy
+        """
+        with self._lock:
+            character_name = character['name']
+            cached = self._entries.get(character_name)
+            if cached is None:
+                self._insert(character)
+                self._dirty.add(character_name)
+                return
+            if cached is not character:
+                raise ValueError(f"{character_name} was reloaded after this copy was evicted")
+            self._dirty.add(character_name)
+            # it may have grown, e.g. a longer inventory
+            self.bytes -= self._sizes[character_name]
+            self._sizes[character_name] = estimate_character_size(self._entries[character_name])
+            self.bytes += self._sizes[character_name]
+            self._evict()
+
+    def flush(self):
+        """
+        Write every dirty character back, keeping them cached
+        
+        Returns: Number of characters written
+        """
+        with self._lock:
+            names = list(self._dirty)
+            for name in names:
+                self._write_back(name)
+            return len(names)
+
+    def close(self):
+        """Write back dirty characters and empty the cache"""
+        with self._lock:
+            for name in list(self._entries):
+                if name in self._dirty:
+                    self._write_back(name)
+                self._forget(name)
+
+    def __contains__(self, character_name):
+        with self._lock:
+            return character_name in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def _insert(self, character):
+        """Add a character as most recently used and evict if over budget"""
+        name = character['name']
+        self._entries[name] = character
+        self._sizes[name] = estimate_character_size(character)
+        self.bytes += self._sizes[name]
+        self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until within both budgets"""
+        # the newest entry always stays, even if it alone is over max_bytes
+        while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes is not None and self.bytes > self.max_bytes)):
+            name = next(iter(self._entries))
+            if name in self._dirty:
+                self._write_back(name)
+            self._forget(name)
+
+    def _write_back(self, name):
+        """Save a dirty character; on failure it stays dirty"""
+        save_character(self._entries[name], self.save_directory)
+        self._dirty.discard(name)
+        self.writebacks += 1
+
+    def _forget(self, name):
+        """Remove an entry without saving it"""
+        del self._entries[name]
+        self.bytes -= self._sizes.pop(name)
+        self._dirty.discard(name)
+
+
+def estimate_character_size(character):
+    """
+    Rough number of bytes a character holds in memory
+    
+    Counts the character object, its values and the strings in its lists.
+    Used for CharacterCache's max_bytes budget.
+    """
+    size = sys.getsizeof(character)
+    for value in character.values():
+        size += sys.getsizeof(value)
+        if isinstance(value, list):
+            for entry in value:
+                size += sys.getsizeof(entry)
+    return size
+
+# ============================================================================
+# SAVE LOCKING
+# ============================================================================
+
+@contextlib.contextmanager
+def character_lock(character_name, save_directory="data/save_games", exclusive=True,
+                   timeout=LOCK_TIMEOUT):
+    """
+    Hold a character's save lock across processes
+    
+    Uses fcntl.flock on {character_name}_save.lock in the character's shard
+    directory, in flat directories too: the lock file is the same before,
+    during and after migrate_to_sharded, so two processes can never hold
+    "exclusive" locks on different files for one character.
+    Any number of shared (reader) holders, or one exclusive (writer).
+    Locks are advisory: only code that also locks is kept out. flock locks
+    belong to the open file, so don't take the same character's lock twice
+    in one process - the second attempt waits on the first.
+    
+    Args:
+        exclusive: True for a write lock, False for a read lock
+        timeout: Seconds to wait before giving up
+    
+    Raises: SaveLockTimeoutError if the lock isn't free within timeout
+            ImportError where fcntl isn't available (Windows)
+    """
+    if fcntl is None:
+        raise ImportError("Save locking requires fcntl (not available on this platform)")
+    filename = os.path.join(save_directory, shard_prefix(character_name),
+                            f"{character_name}{LOCK_SUFFIX}")
+    try:
+        file = open(filename, "a")
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        file = open(filename, "a")
+
+    with file:
+        operation = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+        deadline = time.monotonic() + timeout
+        delay = 0.001
+        while True:
+            try:
+                fcntl.flock(file.fileno(), operation | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise SaveLockTimeoutError(
+                        f"Timed out after {timeout}s waiting for the save lock on {character_name}")
+                time.sleep(min(delay, remaining))
+                delay = min(delay * 2, 0.05)
+        try:
+            yield
+        finally:
+            fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+@contextlib.contextmanager
+def locked(character_name, save_directory="data/save_games", timeout=LOCK_TIMEOUT):
+    """
+    Read-modify-write a saved character under its exclusive lock
+    
+    with character_manager.locked("Hero") as char:
+        char['gold'] += 10
+    
+    The character is loaded once the lock is held and saved (in the format
+    it was loaded from) when the block finishes. If the block raises,
+    nothing is saved.
+    
+    Raises: SaveLockTimeoutError, plus the exceptions of load_character
+    """
+    with character_lock(character_name, save_directory, timeout=timeout):
+        binary = find_save_file(character_name, save_directory).endswith(BINARY_SAVE_SUFFIX)
+        character = load_character(character_name, save_directory)
+        yield character
+        save_character(character, save_directory, binary=binary)
+
+# ============================================================================
+# BULK MIGRATIONS
+# ============================================================================
+
+def bulk_transform(save_directory, fn, workers=None, dry_run=False, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Apply a content migration to every save file in a directory
+    
+    Save files are found with a streaming directory scan and handed out in
+    chunks to a process pool. For each one fn(character) is called; it can
+    change the character in place or return a replacement. Changed saves
+    are rewritten atomically in their own format (a journal is folded in);
+    unchanged ones aren't touched. A failure on one file (bad save data,
+    or an exception from fn) is recorded and the rest carry on.
+    
+    Run it while the game is offline, or against characters nobody holds
+    a lock on - it doesn't take save locks.
+    
+    Args:
+        fn: Transform; must be picklable (a module-level function) when
+            more than one worker is used
+        workers: Number of worker processes (default: CPU count, 1 = serial)
+        dry_run: If True, report what would change but write nothing
+        chunk_size: Save files per worker task
+    
+    Returns: Dictionary with "total", "changed" and "unchanged" counts and
+             "failures": {filename: exception}
+    """
+    summary = {"total": 0, "changed": 0, "unchanged": 0, "failures": {}}
+    for results in _run_in_chunks(save_directory, _transform_chunk, (fn, dry_run), workers, chunk_size):
+        _record_transform_results(save_directory, summary, results, dry_run)
+    return summary
+
+
+def _run_in_chunks(save_directory, task, args, workers, chunk_size):
+    """
+    Yield task(chunk, *args) for chunks of the save files in a directory
+    
+    Chunks run in a pool of workers processes (default: CPU count), or in
+    this process when workers is 1. Results come back as chunks finish.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunks = _chunked(_iter_save_files(save_directory), chunk_size)
+
+    if workers <= 1:
+        for chunk in chunks:
+            yield task(chunk, *args)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for chunk in chunks:
+            pending.add(executor.submit(task, chunk, *args))
+            # keep a bounded number of chunks in flight so a huge directory
+            # is never listed into memory all at once
+            if len(pending) >= workers * 4:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in pending:
+            yield future.result()
+
+
+def _iter_save_files(directory):
+    """Yield every text/binary save file path under directory (any layout)"""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                yield from _iter_save_files(entry.path)
+            elif entry.name.endswith(TEXT_SAVE_SUFFIX) or entry.name.endswith(BINARY_SAVE_SUFFIX):
+                yield entry.path
+
+
+def _chunked(iterable, size):
+    """Yield lists of up to size items from iterable"""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _transform_chunk(filenames, fn, dry_run):
+    """
+    Worker for bulk_transform
+    
+    Returns: List of (filename, status, detail). status is "changed" with
+             (name, class, level), "unchanged" with None, or "failed" with
+             the exception
+    """
+    results = []
+    for filename in filenames:
+        try:
+            results.append(_transform_save_file(filename, fn, dry_run))
+        except Exception as error:
+            results.append((filename, "failed", error))
+    return results
+
+
+def _transform_save_file(filename, fn, dry_run):
+    """Load, transform and (unless dry_run) rewrite a single save file"""
+    data = _read_save_bytes(filename)
+    binary = data.startswith(BINARY_SAVE_MAGIC)
+    if binary:
+        character = decode_binary_save(data)
+        # an older format version is rewritten only if fn changes something
+        before = data if data[4] == BINARY_SAVE_VERSION else encode_binary_save(character)
+    else:
+        fields = _parse_save_text(data)
+        _replay_journal_if_present(filename, fields)
+        character = save_fields_to_character(fields)
+        before = format_save_data(character)
+
+    result = fn(character)
+    if result is not None:
+        character = result
+    after = encode_binary_save(character) if binary else format_save_data(character)
+    if after == before:
+        return filename, "unchanged", None
+
+    if not dry_run:
+        if binary:
+            write_file_atomic(filename, after)
+        else:
+            write_snapshot(filename, after)
+    return filename, "changed", (character['name'], character['class'], character['level'])
+
+
+def _record_transform_results(save_directory, summary, results, dry_run):
+    """Add one chunk's results to the bulk_transform summary and save index"""
+    index_records = []
+    for filename, status, detail in results:
+        summary["total"] += 1
+        if status == "failed":
+            summary["failures"][filename] = detail
+            continue
+        summary[status] += 1
+        if status == "changed" and not dry_run:
+            name, character_class, level = detail
+            _journal_state.pop((os.path.abspath(save_directory), name), None)
+            index_records.append(_index_record(name, character_class, level, time.time()))
+    if index_records:
+        _append_index_records(save_directory, index_records)
+
+# ============================================================================
+# SAVE VERIFICATION
+# ============================================================================
+
+def verify_all_saves(save_directory="data/save_games", workers=None, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Check every save file in a directory for corruption
+    
+    Each save (and its journal) is loaded in full, as load_character would,
+    which verifies its checksum before parsing. Files are checked in
+    parallel by a process pool, like bulk_transform. Nothing is written.
+    
+    Args:
+        workers: Number of worker processes (default: CPU count, 1 = serial)
+        chunk_size: Save files per worker task
+    
+    Returns: Dictionary with "total" and "ok" counts, "unchecked": list of
+             save files that loaded but predate checksums, and
+             "failures": {filename: exception} (SaveFileCorruptedError,
+             InvalidSaveDataError, ...)
+    """
+    summary = {"total": 0, "ok": 0, "unchecked": [], "failures": {}}
+    if not os.path.exists(save_directory):
+        return summary
+    for results in _run_in_chunks(save_directory, _verify_chunk, (), workers, chunk_size):
+        for filename, status, error in results:
+            summary["total"] += 1
+            if status == "ok":
+                summary["ok"] += 1
+            elif status == "unchecked":
+                summary["unchecked"].append(filename)
+            else:
+                summary["failures"][filename] = error
+    return summary
+
+
+def _verify_chunk(filenames):
+    """
+    Worker for verify_all_saves
+    
+    Returns: List of (filename, status, exception or None); status is
+             "ok", "unchecked" or "failed"
+    """
+    results = []
+    for filename in filenames:
+        try:
+            data = _read_save_bytes(filename)
+            if data.startswith(BINARY_SAVE_MAGIC):
+                decode_binary_save(data)
+                checked = data[4] >= 2
+            else:
+                body, checked = _check_save_text(data)
+                fields = _parse_save_text(body)
+                _replay_journal_if_present(filename, fields)
+                save_fields_to_character(fields)
+            results.append((filename, "ok" if checked else "unchecked", None))
+        except Exception as error:
+            results.append((filename, "failed", error))
+    return results
+
+# ============================================================================
+# STORAGE BACKENDS
+# ============================================================================
+
+class SaveBackend(ABC):
+    """
+    Where save_character, load_character, delete_character and
+    list_saved_characters keep characters when given backend=
+    
+    FileBackend stores the usual save files; SQLiteBackend stores every
+    character in one database. Backends raise the same exceptions as the
+    file functions: CharacterNotFoundError for a missing character,
+    SaveFileCorruptedError for unreadable storage and InvalidSaveDataError
+    for stored values that aren't valid.
+    """
+
+    @abstractmethod
+    def save(self, character):
+        """Save one character. Returns: True"""
+
+    def save_many(self, characters):
+        """Save several characters. Returns: Number saved"""
+        count = 0
+        for character in characters:
+            self.save(character)
+            count += 1
+        return count
+
+    @abstractmethod
+    def load(self, character_name):
+        """Returns: Character"""
+
+    @abstractmethod
+    def delete(self, character_name):
+        """Returns: True"""
+
+    @abstractmethod
+    def list_names(self, summary=False):
+        """Same as list_saved_characters"""
+
+    def flush(self):
+        """Make every save so far durable"""
+
+    def close(self):
+        """Flush and release the backend's resources"""
+        self.flush()
+
+
+class FileBackend(SaveBackend):
+    """The save file functions as a SaveBackend"""
+
+    def __init__(self, save_directory="data/save_games", binary=False):
+        self.save_directory = save_directory
+        self.binary = binary
+
+    def save(self, character):
+        return save_character(character, self.save_directory, binary=self.binary)
+
+    def load(self, character_name):
+        return load_character(character_name, self.save_directory)
+
+    def delete(self, character_name):
+        return delete_character(character_name, self.save_directory)
+
+    def list_names(self, summary=False):
+        return list_saved_characters(self.save_directory, summary)
+
+
+# Character columns of the SQLite schema, in SAVE_KEYS order ("class" is
+# quoted in SQL), and the child table for each list
+SQLITE_COLUMNS = [key.lower() for key in SAVE_TEXT_KEYS + SAVE_INT_KEYS]
+SQLITE_LIST_TABLES = [key.lower() for key in SAVE_LIST_KEYS]
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS characters (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    "class" TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    health INTEGER NOT NULL,
+    max_health INTEGER NOT NULL,
+    strength INTEGER NOT NULL,
+    magic INTEGER NOT NULL,
+    experience INTEGER NOT NULL,
+    gold INTEGER NOT NULL,
+    saved_at REAL NOT NULL
+);
+""" + "".join(f"""
+CREATE TABLE IF NOT EXISTS {table} (
+    character_id INTEGER NOT NULL REFERENCES characters(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (character_id, position)
+) WITHOUT ROWID;
+""" for table in SQLITE_LIST_TABLES)
+
+_SQLITE_UPSERT = (
+    "INSERT INTO characters (name, \"class\", level, health, max_health, strength, magic, "
+    "experience, gold, saved_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(name) DO UPDATE SET \"class\" = excluded.\"class\", level = excluded.level, "
+    "health = excluded.health, max_health = excluded.max_health, strength = excluded.strength, "
+    "magic = excluded.magic, experience = excluded.experience, gold = excluded.gold, "
+    "saved_at = excluded.saved_at"
+)
+# Most "?" placeholders used in one statement (SQLite's lowest default limit)
+SQLITE_MAX_PARAMETERS = 999
+
+_SQLITE_SELECT = ("SELECT id, name, \"class\", level, health, max_health, strength, magic, "
+                  "experience, gold FROM characters WHERE name = ?")
+# Every list entry of one character as (list number, position, value)
+_SQLITE_SELECT_LISTS = " UNION ALL ".join(
+    f"SELECT {index}, position, value FROM {table} WHERE character_id = ?1"
+    for index, table in enumerate(SQLITE_LIST_TABLES)) + " ORDER BY 1, 2"
+
+
+class SQLiteBackend(SaveBackend):
+    """
+    Every character in one SQLite database
+    
+    A characters table holds the scalar fields and the inventory, active
+    and completed quest lists live in child tables, one row per entry.
+    
+    Saves are group committed: save() stages a snapshot of the character
+    and the staged saves are written in one transaction once batch_size
+    have piled up, on flush()/close() and at interpreter exit. Until they
+    are committed load() still sees them. save_many() commits its
+    characters at once. Commits from one backend happen one at a time, in
+    the order the saves were staged.
+    
+    Up to pool_size connections are opened and shared by the threads
+    using the backend. The database uses write-ahead logging so readers
+    aren't blocked by a commit. A write lock held by another process for
+    longer than timeout raises SaveLockTimeoutError.
+    """
+
+    def __init__(self, filename="data/save_games.sqlite3", pool_size=4, batch_size=256,
+                 timeout=LOCK_TIMEOUT):
+        """
+        Args:
+            filename: Database file, created (with its directory) if missing
+            pool_size: Most connections open at once
+            batch_size: Staged saves that force a commit (1 commits every save)
+            timeout: Seconds to wait for another process's write lock
+        
+        Raises: SaveFileCorruptedError if the file isn't a usable database
+        """
+        self.filename = filename
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.commits = 0
+        self._pool = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        # held while committing, so commits happen in the order of staging
+        self._write_lock = threading.Lock()
+        self._pending = {}
+        # snapshots being committed right now, still visible to load()
+        self._in_flight = {}
+        directory = os.path.dirname(filename)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            connection.executescript(SQLITE_SCHEMA)
+        atexit.register(self.flush)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.filename, timeout=self.timeout,
+                                     isolation_level=None, check_same_thread=False)
+        try:
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = FULL")
+            connection.execute("PRAGMA foreign_keys = ON")
+        except sqlite3.DatabaseError as error:
+            connection.close()
+            raise SaveFileCorruptedError(f"Could not open save database {self.filename}: {error}")
+        return connection
+
+    @contextlib.contextmanager
+    def _connection(self):
+        """Borrow a pooled connection, opening one if the pool is empty"""
+        self._slots.acquire()
+        try:
+            try:
+                connection = self._pool.get_nowait()
+            except queue.Empty:
+                connection = self._connect()
+            try:
+                yield connection
+            except sqlite3.OperationalError as error:
+                if "locked" in str(error):
+                    raise SaveLockTimeoutError(
+                        f"Timed out after {self.timeout}s waiting for {self.filename}: {error}")
+                raise SaveFileCorruptedError(f"Could not use save database {self.filename}: {error}")
+            except sqlite3.DatabaseError as error:
+                raise SaveFileCorruptedError(f"Could not use save database {self.filename}: {error}")
+            finally:
+                self._pool.put(connection)
+        finally:
+            self._slots.release()
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        with self._connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            self.commits += 1
+
+    def save(self, character):
+        """
+        Stage a character's save; it's committed with the rest of its batch
+        
+        Returns: True
+        Raises: InvalidSaveDataError if the character can't be stored (see
+                _sqlite_snapshot); nothing is staged for it
+        """
+        snapshot = _sqlite_snapshot(character)
+        with self._lock:
+            self._pending[snapshot[0][0]] = snapshot
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+        return True
+
+    def save_many(self, characters):
+        """
+        Save characters in one transaction
+        
+        Returns: Number saved
+        Raises: InvalidSaveDataError if any character can't be stored;
+                nothing is saved then
+        """
+        snapshots = [_sqlite_snapshot(character) for character in characters]
+        with self._write_lock:
+            with self._lock:
+                for snapshot in snapshots:
+                    self._pending.pop(snapshot[0][0], None)
+            self._commit(snapshots)
+        return len(snapshots)
+
+    def flush(self):
+        """
+        Commit every staged save in one transaction
+        
+        Returns: Number of characters written
+        """
+        with self._write_lock:
+            with self._lock:
+                snapshots = list(self._pending.values())
+                self._pending.clear()
+            if snapshots:
+                self._commit(snapshots)
+        return len(snapshots)
+
+    def _commit(self, snapshots):
+        """
+        Write snapshots (with _write_lock held), keeping them visible to
+        load() until the transaction is committed
+        
+        If the database write fails (a lock timeout, a full disk) they go
+        back to the staged saves, unless a newer save of the same character
+        was staged meanwhile. A snapshot sqlite3 can't bind would fail
+        again on every retry and hold up every later save, so after such an
+        error the batch is dropped; _sqlite_snapshot checks values before
+        staging so this shouldn't happen.
+        """
+        with self._lock:
+            for snapshot in snapshots:
+                self._in_flight[snapshot[0][0]] = snapshot
+        try:
+            self._write(snapshots)
+        except BaseException as error:
+            if not isinstance(error, (ValueError, TypeError, OverflowError, sqlite3.InterfaceError)):
+                with self._lock:
+                    for snapshot in snapshots:
+                        self._pending.setdefault(snapshot[0][0], snapshot)
+            raise
+        finally:
+            with self._lock:
+                for snapshot in snapshots:
+                    del self._in_flight[snapshot[0][0]]
+
+    def _write(self, snapshots):
+        names = [row[0] for row, lists in snapshots]
+        with self._transaction() as connection:
+            connection.executemany(_SQLITE_UPSERT, [row for row, lists in snapshots])
+            ids = {}
+            for start in range(0, len(names), SQLITE_MAX_PARAMETERS):
+                chunk = names[start:start + SQLITE_MAX_PARAMETERS]
+                ids.update(connection.execute(
+                    f"SELECT name, id FROM characters WHERE name IN ({','.join('?' * len(chunk))})",
+                    chunk))
+            for index, table in enumerate(SQLITE_LIST_TABLES):
+                connection.executemany(f"DELETE FROM {table} WHERE character_id = ?",
+                                       [(ids[name],) for name in names])
+                connection.executemany(
+                    f"INSERT INTO {table} (character_id, position, value) VALUES (?, ?, ?)",
+                    [(ids[row[0]], position, value)
+                     for row, lists in snapshots
+                     for position, value in enumerate(lists[index])])
+
+    def load(self, character_name):
+        """
+        Load a character, including saves not committed yet
+        
+        Raises: CharacterNotFoundError, SaveFileCorruptedError,
+                InvalidSaveDataError
+        """
+        with self._lock:
+            snapshot = self._pending.get(character_name) or self._in_flight.get(character_name)
+        if snapshot is not None:
+            row, lists = snapshot
+            return _sqlite_character(row[:len(SQLITE_COLUMNS)], lists)
+
+        with self._connection() as connection:
+            found = connection.execute(_SQLITE_SELECT, (character_name,)).fetchone()
+            if found is None:
+                raise CharacterNotFoundError(f"Character does not exist")
+            lists = [[] for table in SQLITE_LIST_TABLES]
+            for index, position, value in connection.execute(_SQLITE_SELECT_LISTS, (found[0],)):
+                lists[index].append(value)
+        return _sqlite_character(found[1:], lists)
+
+    def delete(self, character_name):
+        """
+        Delete a character (staged or committed)
+        
+        Raises: CharacterNotFoundError if character doesn't exist
+        """
+        with self._write_lock:
+            with self._lock:
+                staged = self._pending.pop(character_name, None)
+            with self._transaction() as connection:
+                deleted = connection.execute("DELETE FROM characters WHERE name = ?",
+                                             (character_name,)).rowcount
+        if not deleted and staged is None:
+            raise CharacterNotFoundError(f"Character does not exist")
+        return True
+
+    def list_names(self, summary=False):
+        """
+        Saved character names in the order they were first saved
+        
+        Args:
+            summary: If True, return {"name", "class", "level", "mtime"}
+                     records like list_saved_characters
+        """
+        self.flush()
+        with self._connection() as connection:
+            rows = connection.execute(
+                "SELECT name, \"class\", level, saved_at FROM characters ORDER BY id").fetchall()
+        if summary:
+            return [_index_record(*row) for row in rows]
+        return [row[0] for row in rows]
+
+    def close(self):
+        """Commit staged saves and close every pooled connection"""
+        self.flush()
+        atexit.unregister(self.flush)
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def _sqlite_snapshot(character):
+    """
+    ((characters row), (inventory, active quests, completed quests))
+    
+    Raises: InvalidSaveDataError unless name and class are text, the stats
+            are non-negative ints that fit an SQLite INTEGER and list
+            entries are text
+    """
+    try:
+        row = tuple(character[column] for column in SQLITE_COLUMNS) + (time.time(),)
+        lists = tuple(tuple(character[table]) for table in SQLITE_LIST_TABLES)
+    except (KeyError, TypeError) as error:
+        raise InvalidSaveDataError(f"Character is missing save data: {error}")
+    for column, value in zip(SQLITE_COLUMNS, row):
+        if column in ("name", "class"):
+            if not isinstance(value, str):
+                raise InvalidSaveDataError(f"Expected text value for {column.upper()}")
+        elif type(value) is not int:
+            raise InvalidSaveDataError(f"Expected Integer value for {column.upper()}, got {value!r}")
+        elif not 0 <= value < 2 ** 63:
+            # negative values wouldn't load back (see _sqlite_character)
+            raise InvalidSaveDataError(f"{column.upper()} {value} doesn't fit an SQLite INTEGER")
+    for table, values in zip(SQLITE_LIST_TABLES, lists):
+        if not all(isinstance(value, str) for value in values):
+            raise InvalidSaveDataError(f"Expected text entries in {table.upper()}")
+    return row, lists
+
+
+def _sqlite_character(row, lists):
+    """Build a Character from a characters row (SQLITE_COLUMNS) and its lists"""
+    character = Character()
+    for column, value in zip(SQLITE_COLUMNS, row):
+        if column in ("name", "class"):
+            if not isinstance(value, str):
+                raise InvalidSaveDataError(f"Expected text value for {column.upper()}")
+        elif not isinstance(value, int) or value < 0:
+            raise InvalidSaveDataError(f"Expected Integer value for {column.upper()}")
+        character[column] = value
+    for table, values in zip(SQLITE_LIST_TABLES, lists):
+        character[table] = list(values)
+    return character
+
+# ============================================================================
+# CHARACTER OPERATIONS
+# ============================================================================
+
+def gain_experience(character, xp_amount):
+    """
+    Add experience to character and handle level ups
+    
+    Level up formula: level_up_xp = current_level * 100
+    Example when leveling up:
+    - Increase level by 1
+    - Increase max_health by 10
+    - Increase strength by 2
+    - Increase magic by 2
+    - Restore health to max_health
+    
+    Raises: CharacterDeadError if character health is 0
+    """
+
+    if character["health"] ==0:
         raise CharacterDeadError("Character is dead and cannot gain experience")
     
     character["experience"] += xp_amount
-    level_up_xp = character["level"] * 100
-    
-    while character["experience"] >= level_up_xp:
-        character["experience"] -= level_up_xp
-        character["level"] += 1
-        character["max_health"] += 10
-        character["strength"] += 2
-        character["magic"] += 2
+    levels, character["experience"] = levels_gained(character["level"], character["experience"])
+
+    if levels:
+        character["level"] += levels
+        character["max_health"] += 10 * levels
+        character["strength"] += 2 * levels
+        character["magic"] += 2 * levels
         character["health"] = character["max_health"]
-        level_up_xp = character["level"] * 100
+    if _stat_listeners:
+        notify_stat_change(character, "experience")
 
     return character
     # TODO: Implement experience gain and leveling
@@ -279,6 +2400,82 @@ def gain_experience(character, xp_amount):
     # Update stats on level up
     
 
+def add_stat_listener(listener):
+    """
+    Call listener(character, stat) whenever a character's stats change
+    
+    stat is "experience" (gain_experience, which also covers level ups),
+    "gold" (add_gold) or "completed_quests" (quest_handler.complete_quest,
+    after its rewards are granted). Used by leaderboard.Leaderboard.
+    """
+    if listener not in _stat_listeners:
+        _stat_listeners.append(listener)
+
+
+def remove_stat_listener(listener):
+    """Stop calling a listener added with add_stat_listener"""
+    if listener in _stat_listeners:
+        _stat_listeners.remove(listener)
+
+
+def notify_stat_change(character, stat):
+    """Tell every stat listener that a character's stat changed"""
+    for listener in list(_stat_listeners):
+        listener(character, stat)
+
+
+def levels_gained(level, experience):
+    """
+    Work out the level ups for a character's experience in one step
+    
+    Leveling from L costs L*100, then (L+1)*100, ... so k level ups cost
+    100 * (k*L + k*(k-1)/2). The largest affordable k is the root of that
+    quadratic, found with an integer square root, so huge awards take the
+    same time as small ones. Matches leveling one level at a time exactly.
+    Non-integer values (e.g. float XP) do go one level at a time, since
+    the integer square root needs ints and float rounding must match.
+    
+    Returns: (levels gained, experience left over)
+    """
+    try:
+        operator.index(level)
+        operator.index(experience)
+    except TypeError:
+        return _levels_gained_one_at_a_time(level, experience)
+
+    levels = 0
+    # Levels below 1 cost nothing (or pay out), so step those one by one
+    while level < 1 and experience >= level * 100:
+        experience -= level * 100
+        level += 1
+        levels += 1
+    if experience < level * 100:
+        return levels, experience
+
+    # Largest k with k*k + (2L-1)*k <= 2*budget, budget in units of 100 XP
+    budget = experience // 100
+    b = 2 * level - 1
+    k = (math.isqrt(b * b + 8 * budget) - b) // 2
+    # isqrt floors, so k can only be 1 short; check both ways to be sure
+    while (k + 1) * level + (k + 1) * k // 2 <= budget:
+        k += 1
+    while k * level + k * (k - 1) // 2 > budget:
+        k -= 1
+
+    experience -= 100 * (k * level + k * (k - 1) // 2)
+    return levels + k, experience
+
+
+def _levels_gained_one_at_a_time(level, experience):
+    """levels_gained by the original loop, for non-integer values"""
+    levels = 0
+    while experience >= level * 100:
+        experience -= level * 100
+        level += 1
+        levels += 1
+    return levels, experience
+
+
 def add_gold(character, amount):
     """
     Add gold to character's inventory
@@ -294,6 +2491,8 @@ def add_gold(character, amount):
     if new_gold < 0:
         raise ValueError("Gold cannot be negative")
     character["gold"] = new_gold
+    if _stat_listeners:
+        notify_stat_change(character, "gold")
     return character["gold"]
     # TODO: Implement gold management
     # Check that result won't be negative
@@ -347,6 +2546,193 @@ def revive_character(character):
     # Restore health to half of max_health
 
 
+# ============================================================================
+# BATCH REWARDS
+# ============================================================================
+
+# Rows outside these limits are leveled with levels_gained instead, where
+# the float square root and int64 sums could lose exactness
+BATCH_MAX_LEVEL = 10 ** 7
+BATCH_MAX_EXPERIENCE = 10 ** 15
+
+
+def apply_rewards_batch(characters, xp_amount, gold_amount, raise_errors=False):
+    """
+    Give many characters experience and gold at once
+    
+    Same result as calling gain_experience(character, xp_amount) and then
+    add_gold(character, gold_amount) on each character, but the level ups
+    are worked out for every row together with NumPy arrays. xp_amount
+    and gold_amount may be single numbers or one value per character.
+    
+    As with the per-character calls, a dead character (health 0) gets
+    nothing, and a character whose gold would go negative still gets the
+    experience but not the gold.
+    
+    Most of the time goes into reading the four stats out of the Python
+    objects and writing the results back in one loop; the NumPy part is a
+    small share of it.
+    
+    Args:
+        raise_errors: If True, check every row first and raise the first
+                      error without changing any character
+    
+    Returns: Dictionary {row index: CharacterDeadError or ValueError} for
+             the rows that failed
+    Raises: ImportError if NumPy isn't installed
+            CharacterDeadError, ValueError if raise_errors is True
+    """
+    if np is None:
+        raise ImportError("apply_rewards_batch requires NumPy (pip install numpy)")
+    characters = list(characters)
+    count = len(characters)
+    if count == 0:
+        return {}
+
+    # Reading slots directly is much faster than Character.__getitem__
+    use_attributes = set(map(type, characters)) == {Character}
+    level, experience, gold, health = _gather(
+        characters, ("level", "experience", "gold", "health"), use_attributes)
+    xp = np.broadcast_to(np.asarray(xp_amount), (count,))
+    gold_change = np.broadcast_to(np.asarray(gold_amount), (count,))
+    if any(column.dtype != np.int64 for column in (level, experience, gold, health, xp, gold_change)):
+        # floats, or ints too big for int64: int64 would truncate or fail
+        return _apply_rewards_one_by_one(characters, xp_amount, gold_amount, raise_errors)
+
+    # Rows whose operands could wrap around in int64 when added are done
+    # one at a time with Python ints instead (checked before adding; np.abs
+    # itself wraps for the most negative int64)
+    big = np.zeros(count, dtype=bool)
+    for column in (experience, xp, gold, gold_change):
+        big |= (column > BATCH_MAX_EXPERIENCE) | (column < -BATCH_MAX_EXPERIENCE)
+    big_rows = np.flatnonzero(big).tolist()
+
+    alive = health != 0
+    new_gold = gold + gold_change
+    gold_ok = alive & (new_gold >= 0)
+    errors = {}
+    for row in np.flatnonzero(~gold_ok & ~big).tolist():
+        if not alive[row]:
+            errors[row] = CharacterDeadError("Character is dead and cannot gain experience")
+        else:
+            errors[row] = ValueError("Gold cannot be negative")
+    for row in big_rows:
+        if not alive[row]:
+            errors[row] = CharacterDeadError("Character is dead and cannot gain experience")
+        elif int(gold[row]) + int(gold_change[row]) < 0:
+            errors[row] = ValueError("Gold cannot be negative")
+    if errors and raise_errors:
+        raise errors[min(errors)]
+
+    for row in big_rows:
+        if alive[row]:
+            gain_experience(characters[row], int(xp[row]))
+            if row not in errors:
+                add_gold(characters[row], int(gold_change[row]))
+    alive &= ~big
+    gold_ok &= ~big
+
+    experience = experience + xp
+    slow = alive & ((level < 1) | (level > BATCH_MAX_LEVEL)
+                    | (np.abs(experience) > BATCH_MAX_EXPERIENCE))
+    fast = alive & ~slow & (experience >= level * 100)
+
+    # Same quadratic as levels_gained: k*k + (2L-1)*k <= 2*budget
+    budget = experience // 100
+    b = 2 * level - 1
+    discriminant = np.maximum(b * b + 8 * budget, 0)
+    levels = np.where(fast, (np.sqrt(discriminant.astype(np.float64)) - b) // 2, 0).astype(np.int64)
+    while True:
+        too_few = fast & ((levels + 1) * level + (levels + 1) * levels // 2 <= budget)
+        too_many = fast & (levels * level + levels * (levels - 1) // 2 > budget)
+        if not too_few.any() and not too_many.any():
+            break
+        levels += too_few
+        levels -= too_many
+    experience -= 100 * (levels * level + levels * (levels - 1) // 2)
+
+    for row in np.flatnonzero(slow).tolist():
+        levels[row], experience[row] = levels_gained(int(level[row]), int(experience[row]))
+
+    # Scatter back in one pass: experience and gold for every living
+    # character, and for those who leveled up the other stats, read and
+    # raised as Python numbers so a stat near the int64 limit can't wrap
+    # and a float stat stays a float
+    new_gold = np.where(gold_ok, new_gold, gold)
+    rows = np.flatnonzero(alive)
+    targets = characters if len(rows) == count else [characters[row] for row in rows.tolist()]
+    values = zip(targets, experience[rows].tolist(), new_gold[rows].tolist(), levels[rows].tolist())
+    if use_attributes:
+        for character, new_experience, gold_total, gained in values:
+            character.experience = new_experience
+            character.gold = gold_total
+            if gained:
+                character.level += gained
+                character.max_health += 10 * gained
+                character.health = character.max_health
+                character.strength += 2 * gained
+                character.magic += 2 * gained
+    else:
+        for character, new_experience, gold_total, gained in values:
+            character["experience"] = new_experience
+            character["gold"] = gold_total
+            if gained:
+                character["level"] += gained
+                character["max_health"] += 10 * gained
+                character["health"] = character["max_health"]
+                character["strength"] += 2 * gained
+                character["magic"] += 2 * gained
+
+    if _stat_listeners:
+        # the same notifications gain_experience and add_gold send; big
+        # rows were already reported by those calls
+        rows = np.flatnonzero(alive)
+        for row, got_gold in zip(rows.tolist(), gold_ok[rows].tolist()):
+            notify_stat_change(characters[row], "experience")
+            if got_gold:
+                notify_stat_change(characters[row], "gold")
+    return errors
+
+
+def _gather(characters, keys, use_attributes):
+    """
+    Read one array per key from a list of characters
+    
+    The dtype is whatever NumPy infers: int64 for ordinary stats, float64
+    if any value is a float, object for ints too big for int64.
+    """
+    columns = []
+    for key in keys:
+        if use_attributes:
+            getter = operator.attrgetter(CHARACTER_ATTRIBUTES[key])
+        else:
+            getter = operator.itemgetter(key)
+        columns.append(np.array(list(map(getter, characters))))
+    return columns
+
+
+def _apply_rewards_one_by_one(characters, xp_amount, gold_amount, raise_errors):
+    """apply_rewards_batch for values that aren't int64, without NumPy"""
+    count = len(characters)
+    xp_amounts = list(xp_amount) if hasattr(xp_amount, "__len__") else [xp_amount] * count
+    gold_amounts = list(gold_amount) if hasattr(gold_amount, "__len__") else [gold_amount] * count
+    errors = {}
+    for row, character in enumerate(characters):
+        if character["health"] == 0:
+            errors[row] = CharacterDeadError("Character is dead and cannot gain experience")
+        elif character["gold"] + gold_amounts[row] < 0:
+            errors[row] = ValueError("Gold cannot be negative")
+    if errors and raise_errors:
+        raise errors[min(errors)]
+
+    for row, character in enumerate(characters):
+        if character["health"] == 0:
+            continue
+        gain_experience(character, xp_amounts[row])
+        if row not in errors:
+            add_gold(character, gold_amounts[row])
+    return errors
+
 # ============================================================================
 # VALIDATION
 # ============================================================================
@@ -123,3 +123,6 @@ class InvalidSaveDataError(GameError):
     """Raised when save file contains invalid data"""
     pass
 
+class SaveLockTimeoutError(GameError):
+    """Raised when a character's save lock can't be acquired in time"""
+    pass
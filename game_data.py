@@ -10,17 +10,36 @@ This module handles loading and validating game data from text files.
 """
 
 import os
+import json
+import mmap
+import pickle
+import sqlite3
+import hashlib
+from abc import abstractmethod
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+
+# NumPy is only needed for ItemColumns, the rest of the module works without it
+try:
+    import numpy as np
+except ImportError:
+    np = None
 from custom_exceptions import (
     InvalidDataFormatError,
     MissingDataFileError,
     CorruptedDataError
 )
 
+# Bump this whenever the parsed dict layout changes so old caches are ignored
+CACHE_VERSION = 1
+CACHE_SUFFIX = ".cache"
+INDEX_SUFFIX = ".idx"
+
 # ============================================================================
 # DATA LOADING FUNCTIONS
 # ============================================================================
 
-def load_quests(filename="data/quests.txt"):
+def load_quests(filename="data/quests.txt", use_cache=True, as_graph=False):
     """
     Load quest data from file
     
@@ -33,46 +52,31 @@ def load_quests(filename="data/quests.txt"):
     REQUIRED_LEVEL: 1
     PREREQUISITE: previous_quest_id (or NONE)
     
-    Returns: Dictionary of quests {quest_id: quest_data_dict}
+    If use_cache is True a compiled copy is kept in {filename}.cache and
+    reused while the data file is unchanged.
+    
+    If as_graph is True the quests are returned as a QuestGraph, which
+    behaves like the dictionary but also knows the prerequisite structure.
+    
+    Returns: Dictionary of quests {quest_id: quest_data_dict} (or QuestGraph)
     Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+            (with as_graph, also for unknown or cyclic prerequisites)
     """
-    try:
-        with open(filename, "r") as file:
-            lines = file.readlines()
-    except FileNotFoundError:
-        raise MissingDataFileError(f"Data file not found: {filename}")
-    except Exception:
-        raise CorruptedDataError(f"Error reading data file.")
-    
-    quest = {}
-    current_block = []
+    if use_cache:
+        quests = _load_with_cache(filename, "quests", _parse_quests_file)
+    else:
+        quests = _parse_quests_file(filename)
+    if as_graph:
+        return QuestGraph(quests)
+    return quests
 
-    for line in lines:
-        Line = line.strip()
-        if Line == "":
-            if current_block:
-                quest_data = parse_quest_block(current_block)
-                quest_id = quest_data["quest_id"]
-                quest[quest_id] = quest_data
-                current_block = []
-        else:
-            current_block.append(Line)
-
-    if current_block:
-        quest_data = parse_quest_block(current_block)
-        quest_id = quest_data["quest_id"]
-        quest[quest_id] = quest_data
-        
-    return quest 
 
-    # TODO: Implement this function
-    # Must handle:
-    # - FileNotFoundError → raise MissingDataFileError
-    # - Invalid format → raise InvalidDataFormatError
-    # - Corrupted/unreadable data → raise CorruptedDataError
+def _parse_quests_file(filename):
+    """Read and parse a quest file without touching the cache"""
+    return parse_data_file(filename, "quests")
     
 
-def load_items(filename="data/items.txt"):
+def load_items(filename="data/items.txt", use_cache=True):
     """
     Load item data from file
     
@@ -84,45 +88,228 @@ def load_items(filename="data/items.txt"):
     COST: 100
     DESCRIPTION: Item description
     
+    If use_cache is True a compiled copy is kept in {filename}.cache and
+    reused while the data file is unchanged.
+    
     Returns: Dictionary of items {item_id: item_data_dict}
     Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
     """
+    if use_cache:
+        return _load_with_cache(filename, "items", _parse_items_file)
+    return _parse_items_file(filename)
+
+
+def _parse_items_file(filename):
+    """Read and parse an item file without touching the cache"""
+    return parse_data_file(filename, "items")
+
+
+def iter_quests(filename="data/quests.txt"):
+    """
+    Stream quests from a file one block at a time
+    
+    Reads the file incrementally, so memory use does not grow with the
+    size of the file. Uses the same format as load_quests.
+    
+    Yields: One quest dictionary per block
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    return _iter_entries(filename, "quests")
+
+
+def iter_items(filename="data/items.txt"):
+    """
+    Stream items from a file one block at a time
+    
+    Each item is parsed and validated before it is yielded. Uses the same
+    format as load_items.
+    
+    Yields: One item dictionary per block
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    return _iter_entries(filename, "items")
 
+
+def parse_data_file(filename, kind, collect_errors=False):
+    """
+    Parse a whole quest or item file in a single pass
+    
+    Args:
+        filename: Path of the data file
+        kind: "quests" or "items"
+        collect_errors: If True, bad blocks are skipped and reported instead
+                        of stopping at the first one
+    
+    Returns: Dictionary {id: data_dict}, or (dictionary, errors) when
+             collect_errors is True. Each error is a dictionary with
+             'line' (first line of the block), 'id' (or None) and 'message'.
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    id_field = CATALOG_ID_FIELDS[kind]
+    errors = [] if collect_errors else None
+    catalog = {}
+    for entry in _iter_entries(filename, kind, errors):
+        catalog[entry[id_field]] = entry
+    if collect_errors:
+        return catalog, errors
+    return catalog
+
+
+def _iter_entries(filename, kind, errors=None):
+    """
+    Yield parsed entries from a data file
+    
+    If errors is a list, bad blocks are appended to it and skipped,
+    otherwise the first bad block raises InvalidDataFormatError.
+    """
+    if kind not in CATALOG_ID_FIELDS:
+        raise ValueError(f"Unknown catalog kind: {kind}")
+    for line_number, fields, bad_line in _tokenize_blocks(filename):
+        try:
+            entry = _parse_tokenized_block(filename, kind, line_number, fields, bad_line)
+        except InvalidDataFormatError as e:
+            if errors is None:
+                raise
+            errors.append({"line": line_number,
+                           "id": _block_entry_id(fields, CATALOG_ID_FIELDS[kind]),
+                           "message": str(e)})
+            continue
+        yield entry
+
+
+def _parse_tokenized_block(filename, kind, line_number, fields, bad_line):
+    """
+    Build one entry from a tokenized block
+    
+    Raises: InvalidDataFormatError with the file name and line number added
+    """
     try:
-        with open(filename, "r") as file:
-            lines = file.readlines()
+        if bad_line is not None:
+            raise InvalidDataFormatError(f"Line {bad_line} has no ':'")
+        return _ENTRY_BUILDERS[kind](fields)
+    except InvalidDataFormatError as e:
+        raise InvalidDataFormatError(f"{filename}, line {line_number}: {e}")
+
+
+def _tokenize_blocks(filename):
+    """
+    Walk a data file once, splitting it into blocks of {field: value}
+    
+    Keys are normalized (stripped and lowercased) and values stripped as
+    each line is read, so blocks never need a second pass. A repeated key
+    keeps its last value, like the block parsers always have.
+    
+    Yields: (first_line_number, fields, bad_line) for each block, where
+            bad_line is the number of the first line without ':' (or None)
+    Raises: MissingDataFileError, CorruptedDataError
+    """
+    try:
+        file = open(filename, "r")
     except FileNotFoundError:
         raise MissingDataFileError(f"Data file not found: {filename}")
     except Exception:
         raise CorruptedDataError(f"Error reading data file.")
+
+    with file:
+        fields = {}
+        start_line = None
+        bad_line = None
+        try:
+            for line_number, line in enumerate(file, 1):
+                key, sep, value = line.partition(":")
+                if not sep:
+                    if line.strip() == "":
+                        if start_line is not None:
+                            yield start_line, fields, bad_line
+                            fields = {}
+                            start_line = None
+                            bad_line = None
+                        continue
+                    if bad_line is None:
+                        bad_line = line_number
+                if start_line is None:
+                    start_line = line_number
+                try:
+                    fields[_FIELD_NAMES[key]] = value.strip()
+                except KeyError:
+                    fields[_normalize_field_name(key)] = value.strip()
+        except (OSError, ValueError):
+            raise CorruptedDataError(f"Error reading data file.")
+
+        if start_line is not None:
+            yield start_line, fields, bad_line
     
-    items= {}
-    current_block = []
-
-    for line in lines: 
-        stripped_line=line.strip()
-        if stripped_line =="":
-            if current_block:
-                item_data = parse_item_block(current_block)
-                
-                validate_item_data(item_data)
-                
-                item_id = item_data["item_id"]
-                items[item_id] = item_data
-                current_block = []
-        else:
-            current_block.append(stripped_line)
 
-    if current_block:
-        item_data = parse_item_block(current_block)
-        validate_item_data(item_data)
-        item_id = item_data["item_id"]
-        items[item_id] = item_data
+# Loader and id field for each catalog kind
+CATALOG_LOADERS = {"quests": load_quests, "items": load_items}
+CATALOG_ID_FIELDS = {"quests": "quest_id", "items": "item_id"}
+
+
+def load_catalog_dir(directory, kind, workers=None, use_cache=True):
+    """
+    Load every *.txt file in a directory and merge them into one catalog
+    
+    Files are parsed in parallel with a process pool, one file per task.
+    
+    Args:
+        directory: Directory holding the quest or item files
+        kind: "quests" or "items"
+        workers: Number of worker processes (default: CPU count, 1 = serial)
+        use_cache: Passed on to load_quests/load_items for each file
     
-    return items
+    Returns: Dictionary {id: data_dict} merged in filename order
+    Raises:
+        MissingDataFileError if the directory doesn't exist
+        InvalidDataFormatError if a file is invalid or an id appears in
+        more than one file (all duplicates are listed, sorted by id)
+        CorruptedDataError if a file can't be read
+    """
+    if kind not in CATALOG_LOADERS:
+        raise ValueError(f"Unknown catalog kind: {kind}")
+    if not os.path.isdir(directory):
+        raise MissingDataFileError(f"Data directory not found: {directory}")
+
+    filenames = []
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(".txt"):
+            filenames.append(os.path.join(directory, filename))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(filenames))
+
+    tasks = [(kind, filename, use_cache) for filename in filenames]
+    if workers <= 1:
+        shards = [_load_catalog_shard(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            shards = list(executor.map(_load_catalog_shard, tasks))
+
+    catalog = {}
+    owners = {}
+    duplicates = {}
+    for filename, shard in zip(filenames, shards):
+        for entry_id, entry in shard.items():
+            if entry_id in owners:
+                duplicates.setdefault(entry_id, [owners[entry_id]]).append(filename)
+            else:
+                owners[entry_id] = filename
+                catalog[entry_id] = entry
+
+    if duplicates:
+        id_field = CATALOG_ID_FIELDS[kind]
+        details = []
+        for entry_id in sorted(duplicates):
+            details.append(f"{entry_id} ({', '.join(duplicates[entry_id])})")
+        raise InvalidDataFormatError(f"Duplicate {id_field} across files: {'; '.join(details)}")
+    return catalog
+
+
+def _load_catalog_shard(task):
+    """Load one file for load_catalog_dir (runs inside a worker process)"""
+    kind, filename, use_cache = task
+    return CATALOG_LOADERS[kind](filename, use_cache=use_cache)
 
-    # TODO: Implement this function
-    # Must handle same exceptions as load_quests
     
 
 def validate_quest_data(quest_dict):
@@ -174,8 +361,7 @@ def validate_item_data(item_dict):
             raise InvalidDataFormatError(f"Missing required field: {field}")
     
     #Types can only be weapon, armor, or consumable
-    valid_types = ["weapon", "armor", "consumable"]
-    if item_dict["type"] not in valid_types:
+    if item_dict["type"] not in VALID_ITEM_TYPES:
         raise InvalidDataFormatError(f"Invalid item type: {item_dict['type']}")
         
     #Cost has to be an interger to work propperly 
@@ -246,48 +432,881 @@ def create_default_data_files():
     
 
 # ============================================================================
-# HELPER FUNCTIONS
+# COMPILED CACHE
 # ============================================================================
 
-def parse_quest_block(lines):
+def get_cache_path(filename):
+    """Return the path of the compiled cache kept next to a data file"""
+    return filename + CACHE_SUFFIX
+
+
+def _file_digest(filename):
+    """Hash the raw bytes of a data file"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filename, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_cache(cache_path):
     """
-    Parse a block of lines into a quest dictionary
+    Read a cache blob from disk
+    
+    Returns: The cache dictionary, or None if missing or unreadable
+    """
+    try:
+        with open(cache_path, "rb") as file:
+            blob = pickle.load(file)
+    except Exception:
+        # Missing, truncated or garbage caches are simply rebuilt
+        return None
+    if not isinstance(blob, dict) or blob.get("version") != CACHE_VERSION:
+        return None
+    return blob
+
+
+def _write_cache(cache_path, blob):
+    """
+    Write a cache blob atomically
+    
+    Failing to write the cache is never fatal, the data was already parsed.
+    """
+    temp_path = cache_path + ".tmp"
+    try:
+        with open(temp_path, "wb") as file:
+            pickle.dump(blob, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        if os.path.exists(temp_path):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+
+def _load_with_cache(filename, kind, parse_file, cache_path=None):
+    """
+    Load parsed data for filename from its cache, rebuilding when stale
+    
+    The cache is trusted when the source path, mtime and size match. If only
+    the stat info changed (file touched or copied) the content hash decides.
     
     Args:
-        lines: List of strings representing one quest
+        filename: Path of the data file
+        kind: "quests", "items", etc., stored so caches can't be mixed up
+        parse_file: Function that parses filename into a dictionary
+        cache_path: Where to keep the cache (default: {filename}.cache)
     
-    Returns: Dictionary with quest data
-    Raises: InvalidDataFormatError if parsing fails
+    Returns: Dictionary of parsed data
+    Raises: Same exceptions as parse_file
+    """
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        raise MissingDataFileError(f"Data file not found: {filename}")
+    except OSError:
+        raise CorruptedDataError(f"Error reading data file.")
+
+    source = os.path.abspath(filename)
+    if cache_path is None:
+        cache_path = get_cache_path(filename)
+    blob = _read_cache(cache_path)
+
+    if blob is not None and blob.get("source") == source and blob.get("kind") == kind:
+        if blob.get("mtime") == stat.st_mtime_ns and blob.get("size") == stat.st_size:
+            return blob["data"]
+        if blob.get("size") == stat.st_size and blob.get("hash") == _file_digest(filename):
+            blob["mtime"] = stat.st_mtime_ns
+            _write_cache(cache_path, blob)
+            return blob["data"]
+
+    # Hash before parsing so a write racing the parse only makes the cache stale
+    content_hash = _file_digest(filename)
+    data = parse_file(filename)
+    blob = {"version": CACHE_VERSION,
+            "kind": kind,
+            "source": source,
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "hash": content_hash,
+            "data": data}
+    _write_cache(cache_path, blob)
+    return data
+
+# ============================================================================
+# INDEXED ITEM CATALOG
+# ============================================================================
+
+class IndexedItemCatalog(Mapping):
+    """
+    Read-only {item_id: item_data_dict} mapping backed by the item file
+    
+    The data file is memory-mapped and only an index of
+    item_id -> (offset, length) is built up front (and persisted next to the
+    file as {filename}.idx). Items are parsed and validated the first time
+    they are looked up, so startup cost depends on the items actually used.
+    
+    Can be passed anywhere the dictionary from load_items is expected.
+    The file should not be edited while a catalog is open on it.
     """
-    # A new quest dictionary is created 
-    quest = {}
 
-    for line in lines:
-        if ":" not in line:
-            raise InvalidDataFormatError(f"Quest dosent have : in lines")
+    def __init__(self, filename="data/items.txt", use_index_file=True):
+        """
+        Open the item file and load or build its offset index
         
-        key, value = line.split(":", 1)
-        
-        key = key.strip().lower()
-        value = value.strip()
+        Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+        """
+        self.filename = filename
+        if use_index_file:
+            self._index = _load_with_cache(filename, "item_index", _build_item_index,
+                                           cache_path=filename + INDEX_SUFFIX)
+        else:
+            self._index = _build_item_index(filename)
+        self._items = {}
 
-        quest[key] = value
+        try:
+            self._file = open(filename, "rb")
+            size = os.fstat(self._file.fileno()).st_size
+            # mmap refuses empty files, and an empty catalog never needs reading
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        except OSError:
+            raise CorruptedDataError(f"Error reading data file.")
+
+    def __getitem__(self, item_id):
+        """Return the item dictionary, parsing its block on first access"""
+        if item_id in self._items:
+            return self._items[item_id]
+        offset, length = self._index[item_id]
+        if self._map is None:
+            raise CorruptedDataError("Item catalog is closed.")
 
+        try:
+            text = self._map[offset:offset + length].decode("utf-8")
+        except UnicodeDecodeError:
+            raise CorruptedDataError(f"Error reading data file.")
+        lines = []
+        for line in text.splitlines():
+            if line.strip() != "":
+                lines.append(line.strip())
+
+        item_data = parse_item_block(lines)
+        validate_item_data(item_data)
+        self._items[item_id] = item_data
+        return item_data
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, item_id):
+        return item_id in self._index
+
+    def close(self):
+        """Release the memory map and file handle"""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _build_item_index(filename):
+    """
+    Scan an item file once and record where each item block lives
+    
+    Returns: Dictionary {item_id: (byte_offset, byte_length)}
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
     try:
-        quest["reward_xp"] = int(quest["reward_xp"])
-        quest["reward_gold"] = int(quest["reward_gold"])
-        quest["required_level"] = int(quest["required_level"])
+        file = open(filename, "rb")
+    except FileNotFoundError:
+        raise MissingDataFileError(f"Data file not found: {filename}")
     except Exception:
-        raise InvalidDataFormatError("Quest fields must be integers.")
-    return quest
+        raise CorruptedDataError(f"Error reading data file.")
+
+    index = {}
+    with file:
+        offset = 0
+        block_start = None
+        block_end = 0
+        item_id = None
+        try:
+            for raw_line in file:
+                line = raw_line.decode("utf-8").strip()
+                if line == "":
+                    if block_start is not None:
+                        _add_index_entry(index, item_id, block_start, block_end)
+                        block_start = None
+                        item_id = None
+                else:
+                    if block_start is None:
+                        block_start = offset
+                    block_end = offset + len(raw_line)
+                    key, sep, value = line.partition(":")
+                    if sep and key.strip().lower() == "item_id":
+                        item_id = value.strip()
+                offset += len(raw_line)
+        except (OSError, ValueError):
+            raise CorruptedDataError(f"Error reading data file.")
+
+    if block_start is not None:
+        _add_index_entry(index, item_id, block_start, block_end)
+    return index
+
+
+def _add_index_entry(index, item_id, block_start, block_end):
+    """Record one block in the item index"""
+    if item_id is None:
+        raise InvalidDataFormatError("Missing required field: item_id")
+    index[item_id] = (block_start, block_end - block_start)
+
+# ============================================================================
+# QUEST GRAPH
+# ============================================================================
+
+class QuestGraph(Mapping):
+    """
+    Quest dictionary compiled with its prerequisite structure
+    
+    Acts as a read-only {quest_id: quest_data_dict} mapping, so it can be
+    passed to every quest_handler function, and also holds:
+        parent   - {quest_id: prerequisite quest_id or None}
+        children - {quest_id: [quest_ids that require it]}
+        depth    - {quest_id: number of prerequisites above it}
+        order    - every quest_id, prerequisites before the quests needing them
+    
+    Built once, so prerequisite lookups are O(1) and a chain costs only
+    its own length.
+    """
+
+    def __init__(self, quests):
+        """
+        Compile the graph for a quest dictionary
         
+        Raises: InvalidDataFormatError if a prerequisite doesn't exist or
+                the prerequisites form a cycle
+        """
+        self.quests = quests
+        self.parent = {}
+        self.children = {}
+        for quest_id in quests:
+            self.children[quest_id] = []
 
+        for quest_id, quest in quests.items():
+            prerequisite = quest.get("prerequisite", "NONE")
+            if prerequisite == "NONE":
+                self.parent[quest_id] = None
+                continue
+            if prerequisite not in quests:
+                raise InvalidDataFormatError(
+                    f"Quest {quest_id} has unknown prerequisite: {prerequisite}")
+            self.parent[quest_id] = prerequisite
+            self.children[prerequisite].append(quest_id)
 
+        # Walk down from the quests without prerequisites; anything never
+        # reached must sit on a cycle (every quest has at most one parent)
+        self.depth = {}
+        self.order = []
+        for quest_id, parent in self.parent.items():
+            if parent is None:
+                self.depth[quest_id] = 0
+                self.order.append(quest_id)
+        position = 0
+        while position < len(self.order):
+            quest_id = self.order[position]
+            position += 1
+            for child in self.children[quest_id]:
+                self.depth[child] = self.depth[quest_id] + 1
+                self.order.append(child)
 
-    # TODO: Implement parsing logic
-    # Split each line on ": " to get key-value pairs
-    # Convert numeric strings to integers
-    # Handle parsing errors gracefully
+        if len(self.order) != len(quests):
+            cyclic = sorted(quest_id for quest_id in quests if quest_id not in self.depth)
+            raise InvalidDataFormatError(f"Quest prerequisites form a cycle: {', '.join(cyclic)}")
+
+    def __getitem__(self, quest_id):
+        return self.quests[quest_id]
+
+    def __iter__(self):
+        return iter(self.quests)
+
+    def __len__(self):
+        return len(self.quests)
+
+    def __contains__(self, quest_id):
+        return quest_id in self.quests
+
+    def prerequisite_chain(self, quest_id):
+        """
+        Return [earliest_prereq, ..., quest_id] for a quest
+        
+        Raises: KeyError if the quest doesn't exist
+        """
+        chain = [None] * (self.depth[quest_id] + 1)
+        position = len(chain) - 1
+        while quest_id is not None:
+            chain[position] = quest_id
+            quest_id = self.parent[quest_id]
+            position -= 1
+        return chain
+
+    def dependents(self, quest_id):
+        """Return the quests that list quest_id as their prerequisite"""
+        return list(self.children[quest_id])
+
+# ============================================================================
+# COLUMNAR ITEM VIEW
+# ============================================================================
+
+class ItemColumns:
+    """
+    Column-oriented copy of an item catalog for vectorized queries
+    
+    Built from the {item_id: item_data_dict} mapping returned by load_items.
+    Each column is a NumPy array with one row per item:
+        ids          - item ids (object array), maps rows back to items
+        cost         - item cost
+        type_code    - index into VALID_ITEM_TYPES
+        stat_code    - index into self.stat_names (the EFFECT stat)
+        effect_value - EFFECT amount
+    
+    Example:
+        columns = ItemColumns(all_items)
+        rows = columns.select(item_type="weapon", stat="strength",
+                              min_value=5, max_value=10, max_cost=300)
+        cheap_weapons = columns.ids_for(rows)
+    
+    Raises: ImportError if NumPy is not installed
+    """
+
+    def __init__(self, items):
+        """Build the columns from an item dictionary"""
+        if np is None:
+            raise ImportError("ItemColumns requires NumPy (pip install numpy)")
+
+        count = len(items)
+        self.ids = np.empty(count, dtype=object)
+        self.cost = np.empty(count, dtype=np.int64)
+        self.type_code = np.empty(count, dtype=np.int8)
+        self.stat_code = np.empty(count, dtype=np.int16)
+        self.effect_value = np.empty(count, dtype=np.int64)
+        self.stat_names = []
+
+        stat_codes = {}
+        type_codes = {}
+        for code, item_type in enumerate(VALID_ITEM_TYPES):
+            type_codes[item_type] = code
+
+        for row, (item_id, item) in enumerate(items.items()):
+            stat, value = next(iter(item["effect"].items()))
+            if stat not in stat_codes:
+                stat_codes[stat] = len(self.stat_names)
+                self.stat_names.append(stat)
+            self.ids[row] = item_id
+            self.cost[row] = item["cost"]
+            self.type_code[row] = type_codes[item["type"]]
+            self.stat_code[row] = stat_codes[stat]
+            self.effect_value[row] = value
+        self._stat_codes = stat_codes
+        self._type_codes = type_codes
+
+    def __len__(self):
+        return len(self.ids)
+
+    def select(self, item_type=None, stat=None, min_value=None, max_value=None,
+               min_cost=None, max_cost=None):
+        """
+        Find the rows matching every given condition
+        
+        Value and cost bounds are inclusive. Conditions left as None are
+        ignored. An unknown item_type or stat matches nothing.
+        
+        Returns: Boolean NumPy array, one entry per row
+        """
+        mask = np.ones(len(self.ids), dtype=bool)
+        if item_type is not None:
+            if item_type not in self._type_codes:
+                return np.zeros(len(self.ids), dtype=bool)
+            mask &= self.type_code == self._type_codes[item_type]
+        if stat is not None:
+            if stat not in self._stat_codes:
+                return np.zeros(len(self.ids), dtype=bool)
+            mask &= self.stat_code == self._stat_codes[stat]
+        if min_value is not None:
+            mask &= self.effect_value >= min_value
+        if max_value is not None:
+            mask &= self.effect_value <= max_value
+        if min_cost is not None:
+            mask &= self.cost >= min_cost
+        if max_cost is not None:
+            mask &= self.cost <= max_cost
+        return mask
+
+    def ids_for(self, mask):
+        """Return the item ids of the selected rows as a list"""
+        return self.ids[mask].tolist()
+
+    def price_histogram(self, bins=10, mask=None):
+        """
+        Histogram of item costs
+        
+        Args:
+            bins: Number of bins or a sequence of bin edges
+            mask: Optional row selection from select()
+        
+        Returns: (counts, bin_edges) as NumPy arrays
+        """
+        costs = self.cost if mask is None else self.cost[mask]
+        return np.histogram(costs, bins=bins)
+
+    def stat_per_gold(self, mask=None):
+        """
+        Effect value bought per gold spent, for each row
+        
+        Free items (cost 0) get inf so they sort as the best deals.
+        
+        Returns: Float NumPy array (only the masked rows if mask is given)
+        """
+        values = self.effect_value if mask is None else self.effect_value[mask]
+        costs = self.cost if mask is None else self.cost[mask]
+        ratio = np.full(len(values), np.inf)
+        np.divide(values, costs, out=ratio, where=costs != 0)
+        return ratio
+
+    def mean_cost_by_type(self):
+        """
+        Average cost of each item type
+        
+        Returns: Dictionary {item_type: average cost} for types present
+        """
+        counts = np.bincount(self.type_code, minlength=len(VALID_ITEM_TYPES))
+        totals = np.bincount(self.type_code, weights=self.cost, minlength=len(VALID_ITEM_TYPES))
+        averages = {}
+        for code, item_type in enumerate(VALID_ITEM_TYPES):
+            if counts[code]:
+                averages[item_type] = float(totals[code] / counts[code])
+        return averages
+
+# ============================================================================
+# SQLITE CATALOG
+# ============================================================================
+
+# Quest fields with their own column; anything else in a block goes to "extra"
+QUEST_COLUMNS = ("quest_id", "title", "description", "reward_xp",
+                 "reward_gold", "required_level", "prerequisite")
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quests (
+    quest_id TEXT PRIMARY KEY,
+    title TEXT,
+    description TEXT,
+    reward_xp INTEGER,
+    reward_gold INTEGER,
+    required_level INTEGER,
+    prerequisite TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS quests_required_level ON quests (required_level);
+CREATE INDEX IF NOT EXISTS quests_prerequisite ON quests (prerequisite);
+CREATE TABLE IF NOT EXISTS items (
+    item_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    effect_stat TEXT NOT NULL,
+    effect_value INTEGER NOT NULL,
+    cost INTEGER NOT NULL,
+    description TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_type ON items (type);
+CREATE INDEX IF NOT EXISTS items_cost ON items (cost);
+"""
+
+
+class SqliteCatalog:
+    """
+    Quest and item catalogs stored in a local SQLite database
+    
+    import_quests/import_items load the text files once, after which
+    lookups read single rows from the database instead of parsing text and
+    no catalog is held in memory.
+    
+    self.quests and self.items are read-only mappings with the same
+    {id: data_dict} shape as load_quests/load_items, so they can be passed
+    to quest_handler and inventory_system unchanged.
+    
+    Example:
+        with SqliteCatalog("data/catalog.db") as catalog:
+            catalog.import_quests("data/quests.txt")
+            quest = catalog.quests["first_steps"]
+            early = catalog.get_quests_by_level(1, 3)
+    """
+
+    def __init__(self, db_path="data/catalog.db"):
+        """
+        Open (or create) the catalog database
+        
+        Raises: CorruptedDataError if the database can't be opened
+        """
+        self.db_path = db_path
+        try:
+            self._connection = sqlite3.connect(db_path)
+            self._connection.executescript(_SQLITE_SCHEMA)
+        except sqlite3.DatabaseError as e:
+            raise CorruptedDataError(f"Cannot open catalog database {db_path}: {e}")
+        self.quests = SqliteQuestTable(self._connection)
+        self.items = SqliteItemTable(self._connection)
+
+    def import_quests(self, filename="data/quests.txt"):
+        """
+        Replace the stored quests with the contents of a quest file
+        
+        The file is streamed and written in one transaction, so a bad file
+        leaves the previous quests in place.
+        
+        Returns: Number of quests imported
+        Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+        """
+        rows = (_quest_to_row(quest) for quest in iter_quests(filename))
+        return self._bulk_import("quests", "INSERT OR REPLACE INTO quests VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def import_items(self, filename="data/items.txt"):
+        """
+        Replace the stored items with the contents of an item file
+        
+        Returns: Number of items imported
+        Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+        """
+        rows = (_item_to_row(item) for item in iter_items(filename))
+        return self._bulk_import("items", "INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def _bulk_import(self, table, insert_sql, rows):
+        """Clear a table and insert rows in a single transaction"""
+        try:
+            with self._connection:
+                self._connection.execute(f"DELETE FROM {table}")
+                self._connection.executemany(insert_sql, rows)
+        except sqlite3.DatabaseError as e:
+            raise CorruptedDataError(f"Cannot write catalog database {self.db_path}: {e}")
+        return len(getattr(self, table))
+
+    def get_quests_by_level(self, min_level, max_level):
+        """Return quests with min_level <= required_level <= max_level"""
+        return self.quests.get_quests_by_level(min_level, max_level)
+
+    def get_quests_requiring(self, prerequisite):
+        """Return quests whose prerequisite is the given quest id"""
+        return self.quests.select("prerequisite = ?", (prerequisite,))
+
+    def get_items_by_type(self, item_type, max_cost=None):
+        """Return items of a type, optionally no more expensive than max_cost"""
+        if max_cost is None:
+            return self.items.select("type = ?", (item_type,))
+        return self.items.select("type = ? AND cost <= ?", (item_type, max_cost))
+
+    def close(self):
+        """Close the database connection"""
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class _SqliteTable(Mapping):
+    """
+    Read-only {id: data_dict} view of one catalog table
+    
+    Subclasses set table and key_column and implement _row_to_dict.
+    """
+
+    table = None
+    key_column = None
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    @abstractmethod
+    def _row_to_dict(self, row):
+        """Turn a SELECT * row into the record dictionary"""
+
+    def __getitem__(self, key):
+        row = self._connection.execute(
+            f"SELECT * FROM {self.table} WHERE {self.key_column} = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return self._row_to_dict(row)
+
+    def __contains__(self, key):
+        row = self._connection.execute(
+            f"SELECT 1 FROM {self.table} WHERE {self.key_column} = ?", (key,)).fetchone()
+        return row is not None
+
+    def __iter__(self):
+        for (key,) in self._connection.execute(f"SELECT {self.key_column} FROM {self.table} ORDER BY rowid"):
+            yield key
+
+    def __len__(self):
+        return self._connection.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def iter_records(self):
+        """Stream every record in file order with a single query"""
+        for row in self._connection.execute(f"SELECT * FROM {self.table} ORDER BY rowid"):
+            yield self._row_to_dict(row)
+
+    def select(self, where, parameters=()):
+        """Return the records matching an SQL WHERE clause, in file order"""
+        cursor = self._connection.execute(
+            f"SELECT * FROM {self.table} WHERE {where} ORDER BY rowid", parameters)
+        return [self._row_to_dict(row) for row in cursor]
+
+
+class SqliteQuestTable(_SqliteTable):
+    """Quests stored by SqliteCatalog, shaped like load_quests results"""
+
+    table = "quests"
+    key_column = "quest_id"
+
+    def _row_to_dict(self, row):
+        quest = dict(zip(QUEST_COLUMNS, row[:7]))
+        for key in QUEST_COLUMNS:
+            if quest[key] is None:
+                del quest[key]
+        if row[7]:
+            quest.update(json.loads(row[7]))
+        return quest
+
+    def get_quests_by_level(self, min_level, max_level):
+        """Level range query answered by the required_level index"""
+        return self.select("required_level BETWEEN ? AND ?", (min_level, max_level))
+
+
+class SqliteItemTable(_SqliteTable):
+    """Items stored by SqliteCatalog, shaped like load_items results"""
+
+    table = "items"
+    key_column = "item_id"
+
+    def _row_to_dict(self, row):
+        item_id, name, item_type, effect_stat, effect_value, cost, description = row
+        return {"item_id": item_id,
+                "name": name,
+                "type": item_type,
+                "effect": {effect_stat: effect_value},
+                "cost": cost,
+                "description": description}
+
+
+def _quest_to_row(quest):
+    """Flatten a quest dictionary into a quests table row"""
+    extra = {}
+    for key, value in quest.items():
+        if key not in QUEST_COLUMNS:
+            extra[key] = value
+    row = [quest.get(key) for key in QUEST_COLUMNS]
+    row.append(json.dumps(extra) if extra else None)
+    return row
+
+
+def _item_to_row(item):
+    """Flatten an item dictionary into an items table row"""
+    effect_stat, effect_value = next(iter(item["effect"].items()))
+    return (item["item_id"], item["name"], item["type"], effect_stat,
+            effect_value, item["cost"], item["description"])
+
+# ============================================================================
+# HOT RELOAD
+# ============================================================================
+
+class CatalogDiff:
+    """
+    Result of reloading one watched data file
+    
+    added, removed and changed are sorted lists of quest/item ids.
+    A diff is falsy when nothing changed.
+    """
+
+    def __init__(self, filename, added=None, removed=None, changed=None):
+        self.filename = filename
+        self.added = added or []
+        self.removed = removed or []
+        self.changed = changed or []
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self):
+        return (f"CatalogDiff({self.filename!r}, added={self.added}, "
+                f"removed={self.removed}, changed={self.changed})")
+
+
+class CatalogWatcher:
+    """
+    Polls quest/item files and patches live catalog dictionaries in place
+    
+    Every block of a watched file is remembered by the hash of its text.
+    When a file's mtime or size changes only the blocks with new hashes are
+    parsed, and the live dictionary gets just the added, removed and changed
+    entries, so a one-line fix doesn't reparse the whole catalog.
+    
+    Example:
+        watcher = CatalogWatcher()
+        watcher.watch("data/items.txt", "items", all_items)
+        for diff in watcher.poll():
+            print(diff)
+    """
+
+    def __init__(self):
+        """Create a watcher with no files"""
+        self._watched = {}
+
+    def watch(self, filename, kind, catalog):
+        """
+        Start watching a data file
+        
+        catalog must currently hold the contents of filename, for example
+        the dictionary returned by load_quests/load_items.
+        
+        Args:
+            filename: Path of the data file
+            kind: "quests" or "items"
+            catalog: Live dictionary to keep up to date
+        
+        Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+        """
+        if kind not in CATALOG_LOADERS:
+            raise ValueError(f"Unknown catalog kind: {kind}")
+        id_field = CATALOG_ID_FIELDS[kind]
+
+        stamp = _file_stamp(filename)
+        block_hashes = {}
+        for line_number, fields, bad_line in _tokenize_blocks(filename):
+            entry_id = _block_entry_id(fields, id_field)
+            if entry_id is None:
+                raise InvalidDataFormatError(f"{filename}, line {line_number}: Missing required field: {id_field}")
+            block_hashes[entry_id] = _block_hash(fields)
+
+        self._watched[filename] = {"kind": kind,
+                                   "catalog": catalog,
+                                   "stamp": stamp,
+                                   "block_hashes": block_hashes}
+
+    def unwatch(self, filename):
+        """Stop watching a data file"""
+        self._watched.pop(filename, None)
+
+    def poll(self):
+        """
+        Check every watched file and apply any changes
+        
+        Returns: List of CatalogDiff, one per file whose contents changed
+        Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+                (the live dictionary is left untouched when a file is invalid)
+        """
+        diffs = []
+        for filename in list(self._watched):
+            diff = self.reload(filename)
+            if diff:
+                diffs.append(diff)
+        return diffs
+
+    def reload(self, filename, force=False):
+        """
+        Reload one watched file if its mtime or size changed
+        
+        Returns: CatalogDiff (empty if nothing changed)
+        """
+        state = self._watched[filename]
+        stamp = _file_stamp(filename)
+        if stamp == state["stamp"] and not force:
+            return CatalogDiff(filename)
+
+        old_hashes = state["block_hashes"]
+        known_ids = {}
+        for entry_id, block_hash in old_hashes.items():
+            known_ids[block_hash] = entry_id
+
+        new_hashes = {}
+        parsed = {}
+        kind = state["kind"]
+        for line_number, fields, bad_line in _tokenize_blocks(filename):
+            block_hash = _block_hash(fields)
+            if block_hash in known_ids:
+                entry_id = known_ids[block_hash]
+            else:
+                entry = _parse_tokenized_block(filename, kind, line_number, fields, bad_line)
+                entry_id = entry[CATALOG_ID_FIELDS[kind]]
+                parsed[entry_id] = entry
+            new_hashes[entry_id] = block_hash
+
+        diff = CatalogDiff(filename)
+        for entry_id in new_hashes:
+            if entry_id not in old_hashes:
+                diff.added.append(entry_id)
+            elif new_hashes[entry_id] != old_hashes[entry_id]:
+                diff.changed.append(entry_id)
+        for entry_id in old_hashes:
+            if entry_id not in new_hashes:
+                diff.removed.append(entry_id)
+        diff.added.sort()
+        diff.changed.sort()
+        diff.removed.sort()
+
+        catalog = state["catalog"]
+        for entry_id in diff.removed:
+            catalog.pop(entry_id, None)
+        for entry_id in diff.added + diff.changed:
+            catalog[entry_id] = parsed[entry_id]
+
+        state["stamp"] = stamp
+        state["block_hashes"] = new_hashes
+        return diff
+
+
+def _file_stamp(filename):
+    """Return (mtime_ns, size) for a data file"""
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        raise MissingDataFileError(f"Data file not found: {filename}")
+    except OSError:
+        raise CorruptedDataError(f"Error reading data file.")
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _block_hash(fields):
+    """Hash the normalized contents of one block"""
+    text = "\n".join(f"{key}:{value}" for key, value in fields.items())
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _block_entry_id(fields, id_field):
+    """Return the QUEST_ID/ITEM_ID of a block without parsing it, or None"""
+    return fields.get(id_field)
+
+# ============================================================================
+# HELPER FUNCTIONS
+# ============================================================================
+
+def parse_quest_block(lines):
+    """
+    Parse a block of lines into a quest dictionary
+    
+    Args:
+        lines: List of strings representing one quest
+    
+    Returns: Dictionary with quest data
+    Raises: InvalidDataFormatError if parsing fails
+    """
+    return _build_quest(_split_lines(lines, "Quest dosent have : in lines"))
     
 
 def parse_item_block(lines):
@@ -300,42 +1319,101 @@ def parse_item_block(lines):
     Returns: Dictionary with item data
     Raises: InvalidDataFormatError if parsing fails
     """
-    item = {}
-    #Checking for dict format and splitting on :
+    return _build_item(_split_lines(lines, "Item dosent have : in lines"))
+
+
+def _split_lines(lines, error_message):
+    """Split KEY: value lines into a {field: value} dictionary"""
+    fields = {}
+    for line in lines:
+        key, sep, value = line.partition(":")
+        if not sep:
+            raise InvalidDataFormatError(error_message)
+        field = _FIELD_NAMES.get(key)
+        if field is None:
+            field = _normalize_field_name(key)
+        fields[field] = value.strip()
+    return fields
+
+
+def _normalize_field_name(key):
+    """Normalize a raw key and remember it for the next lookup"""
+    field = key.strip().lower()
+    if len(_FIELD_NAMES) < 1024:
+        _FIELD_NAMES[key] = field
+    return field
+
+
+def _parse_effect(value):
+    """Parse an EFFECT value such as 'strength:5' into {'strength': 5}"""
+    stat, amount = value.split(":", 1)
+    return {stat.strip().lower(): int(amount.strip())}
+
+
+def _build_quest(fields):
+    """Turn a block's {field: value} dictionary into a quest (in place)"""
     try:
-        for line in lines:
-            if ":" not in line:
-                raise InvalidDataFormatError(f"Item dosent have : in lines")
-            
+        for field in QUEST_INT_FIELDS:
+            fields[field] = int(fields[field])
+    except Exception:
+        raise InvalidDataFormatError("Quest fields must be integers.")
+    return fields
 
-            key, value = line.split(":", 1)
-            key = key.strip().lower()
-            value = value.strip()
-
-            if key == "item_id":
-                item["item_id"] = value
-            elif key == "name":
-                item["name"] = value
-            elif key == "type":
-                item["type"] = value.lower()
-            elif key == "effect":
-
-                stat, amount = value.split(":", 1)
-                stat = stat.strip()
-                amount = int(amount.strip())
-                item["effect"] = {stat.lower(): amount}
-
-            elif key == "cost":
-                item["cost"] = int(value)
-            elif key == "description":
-                item["description"] = value
-            else:
-                raise InvalidDataFormatError(f"Unknown item field: {key}")
+
+def _build_item(fields):
+    """Turn a block's {field: value} dictionary into an item (in place)"""
+    if not fields.keys() <= ITEM_FIELD_PARSERS.keys():
+        for key in fields:
+            if key not in ITEM_FIELD_PARSERS:
+                raise InvalidDataFormatError(f"Error parsing item: Unknown item field: {key}")
+    try:
+        for key, convert in _ITEM_CONVERTERS:
+            if key in fields:
+                fields[key] = convert(fields[key])
     except ValueError:
         raise InvalidDataFormatError("Item fields have invalid format.")
-    except Exception as e:
-        raise InvalidDataFormatError(f"Error parsing item: {e}")
+    return fields
+
+
+def _build_quest_entry(fields):
+    """Build a quest from a tokenized block and check it has an id"""
+    quest = _build_quest(fields)
+    if "quest_id" not in quest:
+        raise InvalidDataFormatError("Missing required field: quest_id")
+    return quest
+
+
+def _build_item_entry(fields):
+    """Build an item from a tokenized block and validate it"""
+    item = _build_item(fields)
+    # A complete item with a known type is already valid: _build_item
+    # converted cost and effect. Anything else gets the full error message.
+    if item.keys() != ITEM_FIELD_PARSERS.keys() or item["type"] not in VALID_ITEM_TYPES:
+        validate_item_data(item)
     return item
+
+
+# Raw key text -> normalized field name, filled in as keys are seen
+_FIELD_NAMES = {}
+
+# Quest fields converted to integers; every other quest field stays a string
+QUEST_INT_FIELDS = ("reward_xp", "reward_gold", "required_level")
+
+# Item field name -> function converting its stripped value (None = keep text)
+ITEM_FIELD_PARSERS = {
+    "item_id": None,
+    "name": None,
+    "type": str.lower,
+    "effect": _parse_effect,
+    "cost": int,
+    "description": None,
+}
+
+_ITEM_CONVERTERS = [(key, convert) for key, convert in ITEM_FIELD_PARSERS.items() if convert is not None]
+
+VALID_ITEM_TYPES = ("weapon", "armor", "consumable")
+
+_ENTRY_BUILDERS = {"quests": _build_quest_entry, "items": _build_item_entry}
         
 # ============================================================================
 # TESTING
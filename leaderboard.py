@@ -0,0 +1,356 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Leaderboard Module
+
+Name: Chu Hemmingway
+
+AI Usage: [Document any AI assistance used]
+
+This module keeps characters ranked by level, gold and completed quests.
+"""
+
+import os
+import json
+import bisect
+import threading
+
+from custom_exceptions import CharacterNotFoundError, InvalidSaveDataError
+import character_manager
+
+# ============================================================================
+# METRICS
+# ============================================================================
+
+# Metric name -> function giving a character's score as a tuple, compared
+# in order (so level ties are broken by experience)
+METRICS = {
+    "level": lambda character: (character["level"], character["experience"]),
+    "gold": lambda character: (character["gold"],),
+    "quests": lambda character: (len(character["completed_quests"]),),
+}
+
+# Metrics that can change with each stat passed to stat listeners; anything
+# else (completed quests also pay gold and experience) re-ranks everything
+STAT_METRICS = {
+    "experience": ("level",),
+    "gold": ("gold",),
+}
+
+LEADERBOARD_VERSION = 1
+
+def _sort_key(name, score):
+    """Highest score first, ties in name order"""
+    return tuple(-value for value in score) + (name,)
+
+def _score_from_key(key):
+    return tuple(-value for value in key[:-1])
+
+# ============================================================================
+# SORTED KEYS
+# ============================================================================
+
+# Keys per block of a SortedKeys; blocks split at twice this size
+BLOCK_SIZE = 512
+
+class SortedKeys:
+    """
+    Sorted list of keys stored as a list of short sorted blocks
+
+    One flat sorted list would shift every later key on each insert and
+    delete; with blocks only one short block moves. Finding a key is a
+    binary search over the block maxima and then within one block. The
+    block lengths are kept in a Fenwick tree, so the number of keys before
+    a block (for index) takes O(log n) too. Splitting or dropping a block
+    rebuilds the tree, which happens at most once per BLOCK_SIZE changes.
+    """
+
+    def __init__(self, keys=()):
+        keys = sorted(keys)
+        self._blocks = [keys[start:start + BLOCK_SIZE] for start in range(0, len(keys), BLOCK_SIZE)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._length = len(keys)
+        self._build_tree()
+
+    def _build_tree(self):
+        """Fenwick tree of block lengths: _tree[i] sums a range ending at block i-1"""
+        tree = [0] + [len(block) for block in self._blocks]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _tree_add(self, block_index, delta):
+        i = block_index + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _keys_before(self, block_index):
+        """Number of keys in the blocks before block_index"""
+        total = 0
+        i = block_index
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for block in self._blocks:
+            yield from block
+
+    def _block_for(self, key):
+        return min(bisect.bisect_left(self._maxes, key), len(self._maxes) - 1)
+
+    def add(self, key):
+        if not self._blocks:
+            self._blocks.append([key])
+            self._maxes.append(key)
+            self._length = 1
+            self._build_tree()
+            return
+        index = self._block_for(key)
+        block = self._blocks[index]
+        bisect.insort(block, key)
+        self._maxes[index] = block[-1]
+        self._length += 1
+        if len(block) > 2 * BLOCK_SIZE:
+            self._blocks[index:index + 1] = [block[:BLOCK_SIZE], block[BLOCK_SIZE:]]
+            self._maxes[index:index + 1] = [block[BLOCK_SIZE - 1], block[-1]]
+            self._build_tree()
+        else:
+            self._tree_add(index, 1)
+
+    def remove(self, key):
+        """Remove a key known to be present"""
+        index = self._block_for(key)
+        block = self._blocks[index]
+        del block[bisect.bisect_left(block, key)]
+        self._length -= 1
+        if block:
+            self._maxes[index] = block[-1]
+            self._tree_add(index, -1)
+        else:
+            del self._blocks[index]
+            del self._maxes[index]
+            self._build_tree()
+
+    def index(self, key):
+        """0-based position of a key known to be present"""
+        index = self._block_for(key)
+        return self._keys_before(index) + bisect.bisect_left(self._blocks[index], key)
+
+    def first(self, n):
+        """The n smallest keys"""
+        result = []
+        for block in self._blocks:
+            if len(result) >= n:
+                break
+            result.extend(block[:n - len(result)])
+        return result
+
+# ============================================================================
+# LEADERBOARD
+# ============================================================================
+
+class Leaderboard:
+    """
+    Characters ranked on every metric in METRICS
+
+    Each metric keeps its entries in a SortedKeys, so top(n) reads the
+    front blocks and rank_of(name) and updates take O(log n) (amortized,
+    plus moving keys within one block). With listen=True the board is
+    updated through character_manager.add_stat_listener whenever
+    gain_experience, add_gold or quest_handler.complete_quest changes a
+    character. All methods are safe to call from several threads.
+    """
+
+    def __init__(self, filename=None, listen=True):
+        """
+        Args:
+            filename: Optional file the board is loaded from (if it exists)
+                      and written to by save()
+            listen: Whether to follow stat changes as they happen
+        """
+        self.filename = filename
+        self._lock = threading.Lock()
+        self._keys = {metric: SortedKeys() for metric in METRICS}
+        self._entries = {metric: {} for metric in METRICS}
+        self._listening = False
+        if filename is not None and os.path.exists(filename):
+            self.load(filename)
+        if listen:
+            character_manager.add_stat_listener(self._on_stat_change)
+            self._listening = True
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries["level"])
+
+    def __contains__(self, name):
+        with self._lock:
+            return name in self._entries["level"]
+
+    def close(self):
+        """Stop following stat changes"""
+        if self._listening:
+            character_manager.remove_stat_listener(self._on_stat_change)
+            self._listening = False
+
+    def _on_stat_change(self, character, stat):
+        self.update(character, STAT_METRICS.get(stat))
+
+    def update(self, character, metrics=None):
+        """
+        Put a character at its current place on the leaderboard
+
+        Characters without a name, or missing a stat a metric needs, are
+        ignored - listeners also see the partial characters used in tests.
+
+        The scores are read with the lock held, so when threads update the
+        same character the last one to place it also read its latest stats.
+
+        Args:
+            metrics: Metrics to re-rank (default: all of them); a character
+                     not on the board yet is ranked on all of them anyway
+
+        Returns: True if the character was ranked, False if it was ignored
+        """
+        with self._lock:
+            try:
+                name = character["name"]
+                if name not in self._entries["level"]:
+                    metrics = None
+                scores = {metric: METRICS[metric](character) for metric in metrics or METRICS}
+            except (KeyError, TypeError):
+                return False
+            for metric, score in scores.items():
+                self._place(metric, name, _sort_key(name, score))
+        return True
+
+    def _place(self, metric, name, key):
+        keys = self._keys[metric]
+        entries = self._entries[metric]
+        old_key = entries.get(name)
+        if old_key == key:
+            return
+        if old_key is not None:
+            keys.remove(old_key)
+        keys.add(key)
+        entries[name] = key
+
+    def remove(self, name):
+        """
+        Take a character off the leaderboard (e.g. after delete_character)
+
+        Raises: CharacterNotFoundError if the character isn't ranked
+        """
+        with self._lock:
+            if name not in self._entries["level"]:
+                raise CharacterNotFoundError(f"{name} is not on the leaderboard")
+            for metric in METRICS:
+                self._keys[metric].remove(self._entries[metric].pop(name))
+
+    def _check_metric(self, metric):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown leaderboard metric: {metric}")
+
+    def top(self, n=10, metric="level"):
+        """
+        Get the best characters on a metric
+
+        Returns: List of up to n (name, score) pairs, best first; score is
+                 the metric value (level, gold or number of quests)
+        Raises: ValueError for an unknown metric
+        """
+        self._check_metric(metric)
+        with self._lock:
+            best = self._keys[metric].first(n)
+        return [(key[-1], -key[0]) for key in best]
+
+    def rank_of(self, name, metric="level"):
+        """
+        Get a character's place on a metric
+
+        Returns: 1-based rank (1 is best)
+        Raises: CharacterNotFoundError if the character isn't ranked,
+                ValueError for an unknown metric
+        """
+        self._check_metric(metric)
+        with self._lock:
+            key = self._entries[metric].get(name)
+            if key is None:
+                raise CharacterNotFoundError(f"{name} is not on the leaderboard")
+            return self._keys[metric].index(key) + 1
+
+    # ------------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------------
+
+    def rebuild(self, save_directory="data/save_games", errors=None):
+        """
+        Replace the board with the characters saved in a directory
+
+        One streaming pass over the saves (character_manager.iter_characters);
+        each metric is sorted once at the end instead of inserted into.
+
+        Args:
+            errors: Passed to iter_characters - a list collects unreadable
+                    saves instead of raising
+
+        Returns: Number of characters ranked
+        """
+        entries = {metric: {} for metric in METRICS}
+        for character in character_manager.iter_characters(save_directory, errors):
+            name = character["name"]
+            # a name saved twice (e.g. mid-migration) keeps its last save
+            for metric, score in METRICS.items():
+                entries[metric][name] = _sort_key(name, score(character))
+        self._replace(entries)
+        return len(entries["level"])
+
+    def save(self, filename=None):
+        """
+        Write the board to disk atomically
+
+        Raises: ValueError if no filename was given here or to the constructor
+        """
+        filename = filename or self.filename
+        if filename is None:
+            raise ValueError("No leaderboard file given")
+        with self._lock:
+            scores = {
+                name: {metric: list(_score_from_key(self._entries[metric][name])) for metric in METRICS}
+                for name in self._entries["level"]
+            }
+        text = json.dumps({"version": LEADERBOARD_VERSION, "scores": scores})
+        character_manager.write_file_atomic(filename, text)
+
+    def load(self, filename=None):
+        """
+        Replace the board with one written by save()
+
+        Raises: InvalidSaveDataError if the file isn't a saved leaderboard
+        """
+        filename = filename or self.filename
+        try:
+            with open(filename, "r") as file:
+                data = json.load(file)
+            if data.get("version") != LEADERBOARD_VERSION:
+                raise InvalidSaveDataError(f"Unsupported leaderboard version in {filename}")
+            entries = {metric: {} for metric in METRICS}
+            for name, scores in data["scores"].items():
+                for metric in METRICS:
+                    entries[metric][name] = _sort_key(name, [int(value) for value in scores[metric]])
+        except (ValueError, KeyError, TypeError, AttributeError) as error:
+            raise InvalidSaveDataError(f"Invalid leaderboard file {filename}: {error}")
+        self._replace(entries)
+
+    def _replace(self, entries):
+        keys = {metric: SortedKeys(entries[metric].values()) for metric in METRICS}
+        with self._lock:
+            self._keys = keys
+            self._entries = entries
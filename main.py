@@ -28,6 +28,9 @@ all_quests = {}
 all_items = {}
 game_running = False
 
+# Batches saves so the game loop doesn't rewrite the save file every action
+save_manager = character_manager.SaveManager()
+
 # ============================================================================
 # MAIN MENU
 # ============================================================================
@@ -155,7 +158,14 @@ def game_loop():
             shop()
         else:
             game_running = False
-        save_game()
+
+        # Viewing stats changes nothing; everything else may
+        if choice != 1:
+            save_manager.mark_dirty(current_character)
+        if game_running:
+            save_manager.maybe_flush()
+        else:
+            save_game()
     
 
 def game_menu():
@@ -198,7 +208,7 @@ def view_character_stats():
         if key not in ['inventory', 'active_quests', 'completed_quests']:
             print(f"{key}: {current_character[key]}")
         else:
-            print(f"{key}: {", ".join(current_character[key])}")
+            print(f"{key}: {', '.join(current_character[key])}")
     # TODO: Implement stats display
     # Show: name, class, level, health, stats, gold, etc.
     # Use character_manager functions
@@ -323,7 +333,8 @@ def save_game():
     # TODO: Implement save
     # Use character_manager.save_character()
     # Handle any file I/O exceptions
-    character_manager.save_character(current_character)
+    save_manager.mark_dirty(current_character)
+    save_manager.flush()
 
 def load_game_data():
     """Load all quest and item data from files"""
@@ -14,7 +14,8 @@ from custom_exceptions import (
     QuestRequirementsNotMetError,
     QuestAlreadyCompletedError,
     QuestNotActiveError,
-    InsufficientLevelError
+    InsufficientLevelError,
+    InvalidDataFormatError
 )
 import character_manager
 
@@ -106,6 +107,7 @@ def complete_quest(character, quest_id, quest_data_dict):
     # Grant rewards (use character_manager.gain_experience and add_gold)
     character_manager.gain_experience(character, quest['reward_xp'])
     character['gold'] += quest['reward_gold']
+    character_manager.notify_stat_change(character, "completed_quests")
     # Return reward summary
     return {
         'reward_xp': quest['reward_xp'],
@@ -234,23 +236,28 @@ def get_quest_prerequisite_chain(quest_id, quest_data_dict):
     # TODO: Implement prerequisite chain tracing
     # Follow prerequisite links backwards
     # Build list in reverse order
+    # A QuestGraph from game_data already knows every chain
+    chain = getattr(quest_data_dict, "prerequisite_chain", None)
+    if chain is not None:
+        if quest_id not in quest_data_dict:
+            raise QuestNotFoundError("get_quest_prerequisite_chain Quest not found")
+        return chain(quest_id)
+
     list1=[]
-    list2=[]
+    seen=set()
     current=quest_id
     while True:
-        found=False
-        for q_id,quest in quest_data_dict.items():
-            if q_id==current:
-                found=True
-                list1.append(q_id)
-                if quest["prerequisite"]=="NONE":
-                    for i in reversed(list1):
-                        list2.append(i)
-                    return list2
-                current=quest["prerequisite"]
-                break
-        if found==False:
-                raise QuestNotFoundError("get_quest_prerequisite_chain Quest not found")
+        if current not in quest_data_dict:
+            raise QuestNotFoundError("get_quest_prerequisite_chain Quest not found")
+        if current in seen:
+            raise InvalidDataFormatError(f"Quest prerequisites form a cycle at {current}")
+        seen.add(current)
+        list1.append(current)
+        quest=quest_data_dict[current]
+        if quest["prerequisite"]=="NONE":
+            list1.reverse()
+            return list1
+        current=quest["prerequisite"]
 
 # ============================================================================
 # QUEST STATISTICS
@@ -298,6 +305,10 @@ def get_quests_by_level(quest_data_dict, min_level, max_level):
     Returns: List of quest dictionaries
     """
     # TODO: Implement level filtering
+    # Catalogs that can answer this themselves (like SqliteCatalog.quests) do
+    query = getattr(quest_data_dict, "get_quests_by_level", None)
+    if query is not None:
+        return query(min_level, max_level)
     lvl_list=[]
     for i in quest_data_dict:
         quest=quest_data_dict[i]
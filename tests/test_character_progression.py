@@ -0,0 +1,194 @@
+"""
+Test Character Progression
+Tests for experience, leveling and rewards
+"""
+
+import pytest
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+from custom_exceptions import *
+
+# ============================================================================
+# LEVELING TESTS
+# ============================================================================
+
+def gain_experience_one_level_at_a_time(character, xp_amount):
+    """The original leveling loop, kept as the reference behaviour"""
+    if character["health"] == 0:
+        raise CharacterDeadError("Character is dead and cannot gain experience")
+
+    character["experience"] += xp_amount
+    level_up_xp = character["level"] * 100
+
+    while character["experience"] >= level_up_xp:
+        character["experience"] -= level_up_xp
+        character["level"] += 1
+        character["max_health"] += 10
+        character["strength"] += 2
+        character["magic"] += 2
+        character["health"] = character["max_health"]
+        level_up_xp = character["level"] * 100
+
+    return character
+
+def random_character(rng):
+    char = dict(character_manager.create_character("Prop", rng.choice(["Warrior", "Mage", "Rogue", "Cleric"])))
+    char['level'] = rng.choice([1, 2, rng.randint(1, 60), rng.randint(1, 10 ** 6)])
+    char['experience'] = rng.randint(0, char['level'] * 100 - 1)
+    char['health'] = rng.randint(1, char['max_health'])
+    return char
+
+def random_award(rng, level):
+    # Up to a few thousand levels, so the reference loop stays quick
+    magnitude = rng.choice([10 ** 2, 10 ** 4, level * 100 * 50, level * 100 * 3000])
+    return rng.randint(-magnitude // 10, magnitude)
+
+def assert_same_as_loop(char, xp_amount):
+    expected = gain_experience_one_level_at_a_time(dict(char), xp_amount)
+    actual = character_manager.gain_experience(dict(char), xp_amount)
+    assert actual == expected, (char, xp_amount)
+
+def test_gain_experience_matches_loop_randomized():
+    """Property test: the closed form agrees with the loop on random inputs"""
+    rng = random.Random(163)
+    for _ in range(3000):
+        char = random_character(rng)
+        xp_amount = random_award(rng, char['level'])
+        assert_same_as_loop(char, xp_amount)
+
+def test_gain_experience_matches_loop_exhaustive_small():
+    """Every level 0-10 and awards up to the cost of ~15 levels, including boundaries"""
+    for level in range(0, 11):
+        for experience in (0, 1, 99, level * 100 - 1 if level else 0):
+            for xp_amount in range(-200, 15000, 11):
+                char = dict(character_manager.create_character("Grid", "Mage"))
+                char['level'] = level
+                char['experience'] = experience
+                assert_same_as_loop(char, xp_amount)
+
+def test_gain_experience_matches_loop_float_amounts():
+    """Float awards (e.g. 150.0) level exactly as the loop does, float leftovers included"""
+    rng = random.Random(18)
+    for _ in range(500):
+        char = random_character(rng)
+        char['level'] = rng.randint(1, 60)
+        char['experience'] = rng.randint(0, char['level'] * 100 - 1)
+        xp_amount = rng.choice([150.0, 0.5, 99.99, rng.uniform(-100, 50000)])
+        assert_same_as_loop(char, xp_amount)
+
+    char = character_manager.create_character("Float", "Mage")
+    character_manager.gain_experience(char, 150.0)
+    assert char['level'] == 2 and char['experience'] == 50.0
+
+def test_gain_experience_huge_award():
+    """A very large award finishes immediately and lands exactly on the triangular sum"""
+    char = character_manager.create_character("Huge", "Warrior")
+    levels = 10 ** 12
+    cost = 100 * (levels * 1 + levels * (levels - 1) // 2)
+    character_manager.gain_experience(char, cost + 99)
+
+    assert char['level'] == levels + 1
+    assert char['experience'] == 99
+    assert char['max_health'] == 120 + 10 * levels
+    assert char['health'] == char['max_health']
+
+# ============================================================================
+# BATCH REWARD TESTS
+# ============================================================================
+
+def reward_one_by_one(characters, xp_amounts, gold_amounts):
+    """Reference: gain_experience then add_gold per character, collecting errors"""
+    errors = {}
+    for row, char in enumerate(characters):
+        try:
+            character_manager.gain_experience(char, xp_amounts[row])
+            character_manager.add_gold(char, gold_amounts[row])
+        except (CharacterDeadError, ValueError) as e:
+            errors[row] = type(e)
+    return errors
+
+def test_apply_rewards_batch_matches_single_calls():
+    """Test that batch rewards give the same characters as the per-character calls"""
+    pytest.importorskip("numpy")
+    rng = random.Random(19)
+    chars = [random_character(rng) for _ in range(2000)]
+    chars[3]['health'] = 0
+    chars[7]['level'] = 0
+    chars[11]['experience'] = 10 ** 16
+    xp_amounts = [random_award(rng, char['level']) for char in chars]
+    gold_amounts = [rng.randint(-150, 500) for _ in chars]
+
+    expected = [dict(char) for char in chars]
+    expected_errors = reward_one_by_one(expected, xp_amounts, gold_amounts)
+    slotted = [character_manager.Character(char) for char in chars]
+    for batch in (chars, slotted):
+        errors = character_manager.apply_rewards_batch(batch, xp_amounts, gold_amounts)
+        assert {row: type(e) for row, e in errors.items()} == expected_errors
+        assert [dict(char) for char in batch] == expected
+    assert expected_errors[3] is CharacterDeadError
+
+def test_apply_rewards_batch_raise_errors_changes_nothing():
+    """Test that raise_errors stops before touching any character"""
+    pytest.importorskip("numpy")
+    chars = [character_manager.create_character(f"Batch{index}", "Warrior") for index in range(4)]
+    chars[2]['health'] = 0
+    before = [dict(char) for char in chars]
+
+    with pytest.raises(CharacterDeadError):
+        character_manager.apply_rewards_batch(chars, 500, 10, raise_errors=True)
+    assert [dict(char) for char in chars] == before
+
+    errors = character_manager.apply_rewards_batch(chars, 500, 10)
+    assert list(errors) == [2]
+    assert chars[0]['level'] == 3 and chars[0]['gold'] == 110
+    assert chars[2] == before[2]
+
+def test_apply_rewards_batch_near_int64_limit():
+    """Test values that fit in int64 but whose sums don't"""
+    pytest.importorskip("numpy")
+    cases = [
+        # (experience, xp, gold, gold change)
+        (2 ** 62, 2 ** 62, 100, 0),
+        (0, 50, 2 ** 63 - 10, 100),
+        (0, -(2 ** 63), 100, -(2 ** 63)),
+        (99, 1, 100, 5),
+    ]
+    chars = []
+    for experience, _, gold, _ in cases:
+        char = character_manager.create_character("Edge", "Mage")
+        char['experience'] = experience
+        char['gold'] = gold
+        chars.append(char)
+    chars[3]['max_health'] = 2 ** 63 - 5  # leveling pushes it past int64
+    xp_amounts = [case[1] for case in cases]
+    gold_amounts = [case[3] for case in cases]
+
+    expected = [dict(char) for char in chars]
+    expected_errors = reward_one_by_one(expected, xp_amounts, gold_amounts)
+    errors = character_manager.apply_rewards_batch(chars, xp_amounts, gold_amounts)
+    assert {row: type(e) for row, e in errors.items()} == expected_errors == {2: ValueError}
+    assert [dict(char) for char in chars] == expected
+    assert chars[0]['level'] == 429496730
+    assert chars[1]['gold'] == 2 ** 63 + 90
+
+def test_apply_rewards_batch_float_values():
+    """Test float awards and float stats give the same result as the single calls"""
+    pytest.importorskip("numpy")
+    rng = random.Random(7)
+    chars = [random_character(rng) for _ in range(50)]
+    chars[4]['experience'] = 12.5
+    chars[9]['max_health'] = 130.0
+    for xp_amount, gold_amount in ((150.0, 5), (250, 0.5), (320, 10)):
+        expected = [dict(char) for char in chars]
+        expected_errors = reward_one_by_one(expected, [xp_amount] * 50, [gold_amount] * 50)
+        errors = character_manager.apply_rewards_batch(chars, xp_amount, gold_amount)
+        assert {row: type(e) for row, e in errors.items()} == expected_errors
+        assert [dict(char) for char in chars] == expected
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,395 @@
+"""
+Test Data Loading
+Tests for the game_data loaders and their performance helpers
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game_data
+from custom_exceptions import *
+
+QUEST_TEXT = """QUEST_ID: first_steps
+TITLE: First Steps
+DESCRIPTION: Begin your adventure
+REWARD_XP: 50
+REWARD_GOLD: 25
+REQUIRED_LEVEL: 1
+PREREQUISITE: NONE
+
+QUEST_ID: goblin_hunter
+TITLE: Goblin Hunter
+DESCRIPTION: Defeat 3 goblins
+REWARD_XP: 100
+REWARD_GOLD: 75
+REQUIRED_LEVEL: 2
+PREREQUISITE: first_steps
+"""
+
+ITEM_TEXT = """ITEM_ID: health_potion
+NAME: Health Potion
+TYPE: consumable
+EFFECT: health:20
+COST: 25
+DESCRIPTION: Restores 20 health points
+
+ITEM_ID: iron_sword
+NAME: Iron Sword
+TYPE: weapon
+EFFECT: strength:5
+COST: 100
+DESCRIPTION: A sturdy iron sword
+"""
+
+def write_file(path, text):
+    """Write text to path and return it as a string"""
+    with open(path, "w") as f:
+        f.write(text)
+    return str(path)
+
+# ============================================================================
+# COMPILED CACHE TESTS
+# ============================================================================
+
+def test_cache_returns_same_data(tmp_path):
+    """Test that cached and uncached loads return identical dictionaries"""
+    quest_file = write_file(tmp_path / "quests.txt", QUEST_TEXT)
+    item_file = write_file(tmp_path / "items.txt", ITEM_TEXT)
+
+    expected_quests = game_data.load_quests(quest_file, use_cache=False)
+    expected_items = game_data.load_items(item_file, use_cache=False)
+
+    # First load builds the cache, second load reads it
+    assert game_data.load_quests(quest_file) == expected_quests
+    assert os.path.exists(game_data.get_cache_path(quest_file))
+    assert game_data.load_quests(quest_file) == expected_quests
+    assert game_data.load_items(item_file) == expected_items
+    assert game_data.load_items(item_file) == expected_items
+
+def test_cache_rebuilds_when_stale(tmp_path):
+    """Test that editing the data file invalidates the cache"""
+    quest_file = write_file(tmp_path / "quests.txt", QUEST_TEXT)
+    game_data.load_quests(quest_file)
+
+    write_file(quest_file, QUEST_TEXT.replace("REWARD_XP: 50", "REWARD_XP: 5000"))
+    os.utime(quest_file, ns=(1, 1))
+    quests = game_data.load_quests(quest_file)
+    assert quests["first_steps"]["reward_xp"] == 5000
+
+def test_cache_rebuilds_when_corrupted(tmp_path):
+    """Test that a garbage cache file is ignored and replaced"""
+    item_file = write_file(tmp_path / "items.txt", ITEM_TEXT)
+    write_file(game_data.get_cache_path(item_file), "not a pickle")
+
+    items = game_data.load_items(item_file)
+    assert items == game_data.load_items(item_file, use_cache=False)
+
+def test_cache_missing_file_still_raises(tmp_path):
+    """Test that MissingDataFileError is raised with caching enabled"""
+    with pytest.raises(MissingDataFileError):
+        game_data.load_items(str(tmp_path / "missing.txt"))
+
+# ============================================================================
+# STREAMING LOADER TESTS
+# ============================================================================
+
+def test_iter_quests_matches_load_quests(tmp_path):
+    """Test that iter_quests yields the same quests load_quests returns"""
+    quest_file = write_file(tmp_path / "quests.txt", QUEST_TEXT)
+
+    streamed = list(game_data.iter_quests(quest_file))
+    assert [q["quest_id"] for q in streamed] == ["first_steps", "goblin_hunter"]
+    assert {q["quest_id"]: q for q in streamed} == game_data.load_quests(quest_file, use_cache=False)
+
+def test_iter_items_validates_each_block(tmp_path):
+    """Test that iter_items stops with InvalidDataFormatError on a bad block"""
+    item_file = write_file(tmp_path / "items.txt", ITEM_TEXT.replace("TYPE: weapon", "TYPE: shield"))
+
+    items = game_data.iter_items(item_file)
+    assert next(items)["item_id"] == "health_potion"
+    with pytest.raises(InvalidDataFormatError):
+        next(items)
+
+def test_iter_items_missing_file(tmp_path):
+    """Test that iterating a missing file raises MissingDataFileError"""
+    with pytest.raises(MissingDataFileError):
+        list(game_data.iter_items(str(tmp_path / "missing.txt")))
+
+# ============================================================================
+# INDEXED ITEM CATALOG TESTS
+# ============================================================================
+
+def test_indexed_catalog_matches_load_items(tmp_path):
+    """Test that IndexedItemCatalog behaves like the load_items dictionary"""
+    item_file = write_file(tmp_path / "items.txt", "\n\n" + ITEM_TEXT)
+    expected = game_data.load_items(item_file, use_cache=False)
+
+    with game_data.IndexedItemCatalog(item_file) as catalog:
+        assert len(catalog) == len(expected)
+        assert "iron_sword" in catalog
+        assert catalog["iron_sword"] == expected["iron_sword"]
+        assert dict(catalog) == expected
+
+    # Reopening reuses the persisted index
+    assert os.path.exists(item_file + game_data.INDEX_SUFFIX)
+    with game_data.IndexedItemCatalog(item_file) as catalog:
+        assert catalog["health_potion"] == expected["health_potion"]
+
+def test_indexed_catalog_parses_lazily(tmp_path):
+    """Test that a bad block only raises when that item is accessed"""
+    item_file = write_file(tmp_path / "items.txt", ITEM_TEXT.replace("COST: 100", "COST: lots"))
+
+    with game_data.IndexedItemCatalog(item_file) as catalog:
+        assert catalog["health_potion"]["cost"] == 25
+        with pytest.raises(InvalidDataFormatError):
+            catalog["iron_sword"]
+        with pytest.raises(KeyError):
+            catalog["missing_item"]
+
+# ============================================================================
+# MULTI-FILE CATALOG TESTS
+# ============================================================================
+
+def test_load_catalog_dir_merges_files(tmp_path):
+    """Test that every *.txt file in the directory is merged"""
+    first, second = QUEST_TEXT.split("\n\n")
+    write_file(tmp_path / "a.txt", first)
+    write_file(tmp_path / "b.txt", second)
+    write_file(tmp_path / "notes.md", "ignored")
+
+    expected = game_data.load_quests(write_file(tmp_path / "all.dat", QUEST_TEXT), use_cache=False)
+    assert game_data.load_catalog_dir(str(tmp_path), "quests", workers=1) == expected
+    assert game_data.load_catalog_dir(str(tmp_path), "quests", workers=2) == expected
+
+def test_load_catalog_dir_reports_duplicates(tmp_path):
+    """Test that ids defined in more than one file are rejected"""
+    write_file(tmp_path / "a.txt", ITEM_TEXT)
+    write_file(tmp_path / "b.txt", ITEM_TEXT)
+
+    with pytest.raises(InvalidDataFormatError) as error:
+        game_data.load_catalog_dir(str(tmp_path), "items", workers=1)
+    assert "health_potion" in str(error.value)
+    assert str(error.value).index("health_potion") < str(error.value).index("iron_sword")
+
+# ============================================================================
+# HOT RELOAD TESTS
+# ============================================================================
+
+def test_catalog_watcher_applies_diff(tmp_path):
+    """Test that only added, removed and changed entries are touched"""
+    item_file = write_file(tmp_path / "items.txt", ITEM_TEXT)
+    items = game_data.load_items(item_file, use_cache=False)
+    potion = items["health_potion"]
+
+    watcher = game_data.CatalogWatcher()
+    watcher.watch(item_file, "items", items)
+    assert watcher.poll() == []
+
+    new_text = ITEM_TEXT.replace("COST: 100", "COST: 120")
+    new_text += "\nITEM_ID: leather_armor\nNAME: Leather Armor\nTYPE: armor\nEFFECT: max_health:10\nCOST: 50\nDESCRIPTION: Light armor\n"
+    write_file(item_file, new_text)
+    os.utime(item_file, ns=(1, 1))
+
+    diffs = watcher.poll()
+    assert len(diffs) == 1
+    assert diffs[0].added == ["leather_armor"]
+    assert diffs[0].changed == ["iron_sword"]
+    assert diffs[0].removed == []
+    assert items == game_data.load_items(item_file, use_cache=False)
+    # Unchanged entries keep the same object
+    assert items["health_potion"] is potion
+
+def test_catalog_watcher_removes_entries(tmp_path):
+    """Test that deleted blocks are removed from the live dictionary"""
+    quest_file = write_file(tmp_path / "quests.txt", QUEST_TEXT)
+    quests = game_data.load_quests(quest_file, use_cache=False)
+
+    watcher = game_data.CatalogWatcher()
+    watcher.watch(quest_file, "quests", quests)
+    write_file(quest_file, QUEST_TEXT.split("\n\n")[0])
+
+    diff = watcher.reload(quest_file)
+    assert diff.removed == ["goblin_hunter"]
+    assert list(quests) == ["first_steps"]
+
+def test_catalog_watcher_keeps_data_on_bad_edit(tmp_path):
+    """Test that an invalid edit raises and leaves the catalog alone"""
+    item_file = write_file(tmp_path / "items.txt", ITEM_TEXT)
+    items = game_data.load_items(item_file, use_cache=False)
+    before = dict(items)
+
+    watcher = game_data.CatalogWatcher()
+    watcher.watch(item_file, "items", items)
+    write_file(item_file, ITEM_TEXT.replace("TYPE: weapon", "TYPE: banana"))
+
+    with pytest.raises(InvalidDataFormatError):
+        watcher.reload(item_file, force=True)
+    assert items == before
+
+# ============================================================================
+# TOKENIZER / ERROR COLLECTION TESTS
+# ============================================================================
+
+def test_parse_errors_include_line_number(tmp_path):
+    """Test that a bad block reports the file and line it starts on"""
+    item_file = write_file(tmp_path / "items.txt", ITEM_TEXT.replace("COST: 100", "COST: lots"))
+
+    with pytest.raises(InvalidDataFormatError) as error:
+        game_data.load_items(item_file, use_cache=False)
+    assert "line 8" in str(error.value)
+
+def test_collect_errors_reports_every_bad_block(tmp_path):
+    """Test that collect_errors returns good entries and all bad blocks"""
+    bad_text = ITEM_TEXT.replace("COST: 25", "COST: cheap").replace("TYPE: weapon", "TYPE: spoon")
+    bad_text += "\nITEM_ID: mystery\nthis line has no colon\n"
+    item_file = write_file(tmp_path / "items.txt", bad_text)
+
+    items, errors = game_data.parse_data_file(item_file, "items", collect_errors=True)
+    assert items == {}
+    assert [error["line"] for error in errors] == [1, 8, 15]
+    assert [error["id"] for error in errors] == ["health_potion", "iron_sword", "mystery"]
+
+    quests, errors = game_data.parse_data_file(write_file(tmp_path / "quests.txt", QUEST_TEXT),
+                                               "quests", collect_errors=True)
+    assert errors == []
+    assert quests == game_data.load_quests(str(tmp_path / "quests.txt"), use_cache=False)
+
+# ============================================================================
+# COLUMNAR ITEM VIEW TESTS
+# ============================================================================
+
+def test_item_columns_queries(tmp_path):
+    """Test vectorized filters and aggregations against plain Python loops"""
+    pytest.importorskip("numpy")
+    items = game_data.load_items("data/items.txt", use_cache=False)
+    columns = game_data.ItemColumns(items)
+    assert len(columns) == len(items)
+
+    rows = columns.select(item_type="weapon", stat="strength", min_value=5, max_value=10, max_cost=300)
+    expected = [item_id for item_id, item in items.items()
+                if item["type"] == "weapon" and "strength" in item["effect"]
+                and 5 <= item["effect"]["strength"] <= 10 and item["cost"] <= 300]
+    assert columns.ids_for(rows) == expected
+    assert columns.ids_for(columns.select(stat="no_such_stat")) == []
+
+    counts, edges = columns.price_histogram(bins=4)
+    assert counts.sum() == len(items)
+
+    ratios = columns.stat_per_gold(rows)
+    for item_id, ratio in zip(expected, ratios):
+        assert ratio == pytest.approx(items[item_id]["effect"]["strength"] / items[item_id]["cost"])
+
+# ============================================================================
+# SQLITE CATALOG TESTS
+# ============================================================================
+
+def test_sqlite_catalog_round_trip(tmp_path):
+    """Test that SqliteCatalog returns the same records as the text loaders"""
+    import quest_handler
+
+    quests = game_data.load_quests("data/quests.txt", use_cache=False)
+    items = game_data.load_items("data/items.txt", use_cache=False)
+
+    with game_data.SqliteCatalog(str(tmp_path / "catalog.db")) as catalog:
+        assert catalog.import_quests("data/quests.txt") == len(quests)
+        assert catalog.import_items("data/items.txt") == len(items)
+
+        assert dict(catalog.quests) == quests
+        assert dict(catalog.items) == items
+        assert list(catalog.quests) == list(quests)
+        assert "first_steps" in catalog.quests
+        with pytest.raises(KeyError):
+            catalog.items["missing_item"]
+
+        expected = [q for q in quests.values() if 2 <= q["required_level"] <= 4]
+        assert quest_handler.get_quests_by_level(catalog.quests, 2, 4) == expected
+        assert catalog.get_items_by_type("weapon", max_cost=300) == [
+            item for item in items.values() if item["type"] == "weapon" and item["cost"] <= 300]
+
+def test_sqlite_catalog_failed_import_keeps_old_data(tmp_path):
+    """Test that a bad file is rolled back and the old quests stay"""
+    bad_file = write_file(tmp_path / "bad.txt", QUEST_TEXT.replace("REWARD_XP: 100", "REWARD_XP: many"))
+
+    with game_data.SqliteCatalog(str(tmp_path / "catalog.db")) as catalog:
+        catalog.import_quests("data/quests.txt")
+        before = len(catalog.quests)
+        with pytest.raises(InvalidDataFormatError):
+            catalog.import_quests(bad_file)
+        assert len(catalog.quests) == before
+
+def test_sqlite_table_needs_row_to_dict():
+    """Test that a catalog table must say how to turn rows into records"""
+    class Incomplete(game_data._SqliteTable):
+        table = "quests"
+        key_column = "quest_id"
+    with pytest.raises(TypeError):
+        Incomplete(None)
+
+# ============================================================================
+# SYNTHETIC CONTENT TESTS
+# ============================================================================
+
+def test_generated_content_loads(tmp_path):
+    """Test that generated files parse and have valid prerequisite chains"""
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+    import generate_content
+
+    quest_file = str(tmp_path / "quests.txt")
+    item_file = str(tmp_path / "items.txt")
+    generate_content.write_quests(quest_file, 300)
+    generate_content.write_items(item_file, 300)
+
+    quests = game_data.load_quests(quest_file, use_cache=False)
+    items = game_data.load_items(item_file, use_cache=False)
+    assert len(quests) == 300
+    assert len(items) == 300
+    for quest in quests.values():
+        if quest["prerequisite"] != "NONE":
+            parent = quests[quest["prerequisite"]]
+            assert parent["required_level"] <= quest["required_level"]
+    assert {item["type"] for item in items.values()} == set(game_data.VALID_ITEM_TYPES)
+
+# ============================================================================
+# QUEST GRAPH TESTS
+# ============================================================================
+
+def test_quest_graph_chains_match_handler():
+    """Test that QuestGraph chains match the plain dictionary walk"""
+    import quest_handler
+
+    quests = game_data.load_quests("data/quests.txt", use_cache=False)
+    graph = game_data.load_quests("data/quests.txt", use_cache=False, as_graph=True)
+
+    assert dict(graph) == quests
+    assert len(graph.order) == len(quests)
+    position = {quest_id: i for i, quest_id in enumerate(graph.order)}
+    for quest_id in quests:
+        chain = quest_handler.get_quest_prerequisite_chain(quest_id, quests)
+        assert quest_handler.get_quest_prerequisite_chain(quest_id, graph) == chain
+        assert graph.depth[quest_id] == len(chain) - 1
+        if graph.parent[quest_id] is not None:
+            assert position[graph.parent[quest_id]] < position[quest_id]
+            assert quest_id in graph.dependents(graph.parent[quest_id])
+
+    with pytest.raises(QuestNotFoundError):
+        quest_handler.get_quest_prerequisite_chain("missing_quest", graph)
+
+def test_quest_graph_detects_cycles(tmp_path):
+    """Test that cyclic prerequisites raise instead of looping forever"""
+    import quest_handler
+
+    cyclic_text = QUEST_TEXT.replace("PREREQUISITE: NONE", "PREREQUISITE: goblin_hunter")
+    quest_file = write_file(tmp_path / "quests.txt", cyclic_text)
+
+    with pytest.raises(InvalidDataFormatError):
+        game_data.load_quests(quest_file, as_graph=True)
+
+    quests = game_data.load_quests(quest_file, use_cache=False)
+    with pytest.raises(InvalidDataFormatError):
+        quest_handler.get_quest_prerequisite_chain("goblin_hunter", quests)
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,204 @@
+"""
+Test Leaderboard
+Tests for ranking characters and keeping the rankings up to date
+"""
+
+import pytest
+import sys
+import os
+import random
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+import quest_handler
+import leaderboard
+from leaderboard import Leaderboard, SortedKeys
+from custom_exceptions import *
+
+@pytest.fixture
+def board():
+    board = Leaderboard()
+    yield board
+    board.close()
+
+def make_character(name, level=1, experience=0, gold=100, quests=0):
+    char = character_manager.create_character(name, "Warrior")
+    char['level'] = level
+    char['experience'] = experience
+    char['gold'] = gold
+    char['completed_quests'] = [f"quest_{index}" for index in range(quests)]
+    return char
+
+# ============================================================================
+# RANKING TESTS
+# ============================================================================
+
+def test_top_and_rank_of(board):
+    """Test ordering by each metric, with level ties broken by experience then name"""
+    board.update(make_character("Ana", level=3, experience=50, gold=10, quests=2))
+    board.update(make_character("Bo", level=3, experience=90, gold=500))
+    board.update(make_character("Cy", level=7, gold=10, quests=1))
+
+    assert board.top(2) == [("Cy", 7), ("Bo", 3)]
+    assert board.top(10, "gold") == [("Bo", 500), ("Ana", 10), ("Cy", 10)]
+    assert board.top(1, "quests") == [("Ana", 2)]
+    assert board.rank_of("Ana") == 3
+    assert board.rank_of("Cy", "gold") == 3
+    assert len(board) == 3
+
+    with pytest.raises(CharacterNotFoundError):
+        board.rank_of("Nobody")
+    with pytest.raises(ValueError):
+        board.top(3, "strength")
+
+    board.remove("Cy")
+    assert board.rank_of("Bo") == 1
+    assert "Cy" not in board
+
+def test_matches_sorting_after_random_updates(board):
+    """Test that repeated updates leave the same order as sorting from scratch"""
+    rng = random.Random(23)
+    chars = {}
+    for _ in range(2000):
+        name = f"Hero{rng.randint(0, 150)}"
+        chars[name] = make_character(name, rng.randint(1, 20), rng.randint(0, 99), rng.randint(0, 50))
+        board.update(chars[name])
+
+    expected = sorted(chars.values(), key=lambda c: (-c['gold'], c['name']))
+    assert board.top(len(chars), "gold") == [(c['name'], c['gold']) for c in expected]
+    for rank, char in enumerate(expected, 1):
+        assert board.rank_of(char['name'], "gold") == rank
+
+def test_sorted_keys_matches_list(monkeypatch):
+    """Test block splits and removals against a plain sorted list"""
+    monkeypatch.setattr(leaderboard, "BLOCK_SIZE", 4)
+    rng = random.Random(5)
+    keys = SortedKeys(rng.sample(range(1000), 30))
+    expected = sorted(keys)
+    for _ in range(3000):
+        if expected and rng.random() < 0.45:
+            key = rng.choice(expected)
+            keys.remove(key)
+            expected.remove(key)
+        else:
+            key = rng.randint(0, 10 ** 6)
+            keys.add(key)
+            expected.append(key)
+            expected.sort()
+        if expected:
+            key = rng.choice(expected)
+            assert keys.index(key) == expected.index(key)
+            assert keys._keys_before(len(keys._blocks)) == len(expected)
+    assert list(keys) == expected and len(keys) == len(expected)
+    assert keys.first(7) == expected[:7]
+
+# ============================================================================
+# HOOK TESTS
+# ============================================================================
+
+def test_game_actions_update_leaderboard(board):
+    """Test that gain_experience, add_gold and complete_quest move characters"""
+    slow = make_character("Slow")
+    fast = make_character("Fast")
+    board.update(slow)
+    board.update(fast)
+
+    character_manager.gain_experience(slow, 1000)
+    assert board.rank_of("Slow") == 1
+    character_manager.add_gold(fast, 50)
+    assert board.top(1, "gold") == [("Fast", 150)]
+
+    quests = {'q1': {'quest_id': 'q1', 'reward_xp': 10, 'reward_gold': 500}}
+    fast['active_quests'].append('q1')
+    quest_handler.complete_quest(fast, 'q1', quests)
+    assert board.top(1, "quests") == [("Fast", 1)]
+    assert board.top(1, "gold") == [("Fast", 650)]
+
+    # a partial update of a character the board hasn't seen ranks it fully
+    new = make_character("New", level=9, gold=1)
+    board.update(new, ["gold"])
+    assert board.rank_of("New") == 1
+
+    board.close()
+    character_manager.add_gold(slow, 10000)
+    assert board.rank_of("Slow", "gold") == 2
+
+def test_batch_rewards_update_leaderboard(board):
+    """Test that apply_rewards_batch re-ranks both level and gold"""
+    pytest.importorskip("numpy")
+    rich = make_character("Rich", gold=500)
+    poor = make_character("Poor", gold=100)
+    board.update(rich)
+    board.update(poor)
+
+    character_manager.apply_rewards_batch([poor], 1000, 1000)
+    assert board.top(2, "gold") == [("Poor", 1100), ("Rich", 500)]
+    assert board.rank_of("Poor") == 1
+
+    # no gold for a row whose gold would go negative, but still the XP
+    character_manager.apply_rewards_batch([rich], 5000, -1000)
+    assert board.rank_of("Rich") == 1
+    assert board.top(2, "gold") == [("Poor", 1100), ("Rich", 500)]
+
+def test_concurrent_updates(board):
+    """Test that threads updating different characters leave a consistent board"""
+    chars = [make_character(f"Thread{index}") for index in range(8)]
+
+    def play(char):
+        for _ in range(300):
+            character_manager.add_gold(char, 1)
+            character_manager.gain_experience(char, 7)
+
+    threads = [threading.Thread(target=play, args=(char,)) for char in chars]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(board) == 8
+    assert board.top(8, "gold") == sorted((c['name'], 400) for c in chars)
+    assert [board.rank_of(c['name']) for c in sorted(chars, key=lambda c: c['name'])] == list(range(1, 9))
+
+# ============================================================================
+# PERSISTENCE TESTS
+# ============================================================================
+
+def test_save_and_load(tmp_path, board):
+    """Test that a saved leaderboard loads back with the same rankings"""
+    filename = str(tmp_path / "leaderboard.json")
+    for index in range(20):
+        board.update(make_character(f"Saved{index}", index % 5 + 1, index, index * 3, index % 4))
+    board.save(filename)
+
+    loaded = Leaderboard(filename, listen=False)
+    for metric in ("level", "gold", "quests"):
+        assert loaded.top(20, metric) == board.top(20, metric)
+    assert loaded.rank_of("Saved7") == board.rank_of("Saved7")
+
+    with open(filename, "w") as file:
+        file.write("not a leaderboard")
+    with pytest.raises(InvalidSaveDataError):
+        loaded.load(filename)
+
+def test_rebuild_from_saves(tmp_path, board):
+    """Test rebuilding from flat and sharded save directories"""
+    flat = str(tmp_path / "flat")
+    sharded = str(tmp_path / "sharded")
+    for index in range(30):
+        char = make_character(f"Rebuilt{index}", index % 7 + 1, index, index * 11)
+        character_manager.save_character(char, flat, binary=index % 2 == 0)
+    character_manager.save_character(make_character("Other"), sharded)
+    character_manager.migrate_to_sharded(sharded)
+    for index in range(30):
+        character_manager.save_character(character_manager.load_character(f"Rebuilt{index}", flat), sharded)
+
+    assert board.rebuild(flat) == 30
+    assert board.top(1, "gold") == [("Rebuilt29", 319)]
+    expected = board.top(30)
+    assert board.rebuild(sharded) == 31
+    assert [entry for entry in board.top(31) if entry[0] != "Other"] == expected
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,900 @@
+"""
+Test Save System
+Tests for character saving, loading and the save helpers
+"""
+
+import pytest
+import sys
+import os
+import json
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+from custom_exceptions import *
+
+# ============================================================================
+# WRITE-BEHIND SAVE TESTS
+# ============================================================================
+
+class FakeClock:
+    """Clock the tests can move forward by hand"""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_save_character_is_atomic(tmp_path):
+    """Test that saving leaves no temp file and loads back the same data"""
+    char = character_manager.create_character("AtomicTest", "Mage")
+    char['inventory'] = ["health_potion", "iron_sword"]
+    character_manager.save_character(char, str(tmp_path))
+
+    assert os.listdir(tmp_path) == ["AtomicTest_save.txt"]
+    assert character_manager.load_character("AtomicTest", str(tmp_path)) == char
+
+def test_save_manager_coalesces_saves(tmp_path):
+    """Test that saves wait for the operation budget"""
+    clock = FakeClock()
+    manager = character_manager.SaveManager(str(tmp_path), max_pending=3, max_delay=60, clock=clock)
+    char = character_manager.create_character("BatchTest", "Rogue")
+
+    for gold in (10, 20):
+        char['gold'] = gold
+        manager.mark_dirty(char)
+        assert manager.maybe_flush() == False
+    assert os.listdir(tmp_path) == []
+
+    char['gold'] = 30
+    manager.mark_dirty(char)
+    assert manager.maybe_flush() == True
+    assert manager.writes == 1
+    assert character_manager.load_character("BatchTest", str(tmp_path))['gold'] == 30
+    manager.close()
+
+def test_save_manager_time_budget_and_unchanged_data(tmp_path):
+    """Test the time budget and that unchanged characters aren't rewritten"""
+    clock = FakeClock()
+    manager = character_manager.SaveManager(str(tmp_path), max_pending=100, max_delay=5, clock=clock)
+    char = character_manager.create_character("TimerTest", "Cleric")
+
+    manager.mark_dirty(char)
+    clock.now = 4
+    assert manager.maybe_flush() == False
+    clock.now = 5
+    assert manager.maybe_flush() == True
+
+    manager.mark_dirty(char)
+    assert manager.flush() == 0
+    assert manager.writes == 1
+    manager.close()
+
+# ============================================================================
+# JOURNALED SAVE TESTS
+# ============================================================================
+
+def test_journal_appends_only_changed_fields(tmp_path):
+    """Test that a journaled save writes just the fields that changed"""
+    save_dir = str(tmp_path)
+    char = character_manager.create_character("JournalTest", "Warrior")
+    char['completed_quests'] = [f"quest_{i}" for i in range(500)]
+    character_manager.save_character(char, save_dir, journal=True)
+    snapshot_size = os.path.getsize(os.path.join(save_dir, "JournalTest_save.txt"))
+
+    char['gold'] = 555
+    character_manager.save_character(char, save_dir, journal=True)
+    char['level'] = 2
+    char['gold'] = 600
+    character_manager.save_character(char, save_dir, journal=True)
+
+    with open(os.path.join(save_dir, "JournalTest_save.journal")) as f:
+        records = f.read().splitlines()
+    assert len(records) == 2
+    assert "COMPLETED_QUESTS" not in records[1]
+    assert os.path.getsize(os.path.join(save_dir, "JournalTest_save.txt")) == snapshot_size
+    assert character_manager.load_character("JournalTest", save_dir) == char
+
+    # lists edited in place and values that only change type are noticed
+    char['completed_quests'].append("quest_new")
+    char['gold'] = 600.0
+    character_manager.save_character(char, save_dir, journal=True)
+    with open(os.path.join(save_dir, "JournalTest_save.journal")) as f:
+        last = json.loads(f.read().splitlines()[-1])
+    assert sorted(last) == ["COMPLETED_QUESTS", "GOLD"] and last["GOLD"] == "600.0"
+
+def test_journal_state_is_bounded(tmp_path, monkeypatch):
+    """Test that only recently saved characters keep their values in memory"""
+    monkeypatch.setattr(character_manager, "JOURNAL_STATE_ENTRIES", 2)
+    save_dir = str(tmp_path)
+    chars = [character_manager.create_character(f"Bounded{index}", "Rogue") for index in range(4)]
+    for char in chars:
+        character_manager.save_character(char, save_dir, journal=True)
+    assert len(character_manager._journal_state) <= 2
+
+    # a dropped character's next save compares against its save file
+    chars[0]['inventory'].append("rope")
+    character_manager.save_character(chars[0], save_dir, journal=True)
+    with open(os.path.join(save_dir, "Bounded0_save.journal")) as f:
+        assert json.loads(f.read()) == {"INVENTORY": "rope"}
+    assert character_manager.load_character("Bounded0", save_dir) == chars[0]
+
+def test_journal_compacts_past_threshold(tmp_path):
+    """Test that a big journal is folded back into the save file"""
+    save_dir = str(tmp_path)
+    char = character_manager.create_character("CompactTest", "Mage")
+    character_manager.save_character(char, save_dir, journal=True)
+
+    for gold in range(1, 40):
+        char['gold'] = gold
+        character_manager.save_character(char, save_dir, journal=True, compact_bytes=200)
+    journal = os.path.join(save_dir, "CompactTest_save.journal")
+    assert not os.path.exists(journal) or os.path.getsize(journal) < 200
+    assert character_manager.load_character("CompactTest", save_dir) == char
+
+    char['gold'] = 7
+    character_manager.save_character(char, save_dir, journal=True)
+    assert character_manager.compact_journal("CompactTest", save_dir) == True
+    assert not os.path.exists(journal)
+    assert character_manager.load_character("CompactTest", save_dir)['gold'] == 7
+
+def test_journal_ignores_torn_last_record(tmp_path):
+    """Test that a half-written final journal record is skipped"""
+    save_dir = str(tmp_path)
+    char = character_manager.create_character("TornTest", "Rogue")
+    character_manager.save_character(char, save_dir, journal=True)
+    char['gold'] = 321
+    character_manager.save_character(char, save_dir, journal=True)
+
+    with open(os.path.join(save_dir, "TornTest_save.journal"), "a") as f:
+        f.write('{"GOLD": "99')
+    assert character_manager.load_character("TornTest", save_dir)['gold'] == 321
+
+    character_manager.delete_character("TornTest", save_dir)
+    assert os.listdir(save_dir) == []
+
+# ============================================================================
+# CHARACTER CLASS TESTS
+# ============================================================================
+
+def test_character_behaves_like_dict():
+    """Test that the slotted Character supports the dict operations modules use"""
+    import pickle
+    import inventory_system
+
+    char = character_manager.create_character("SlotTest", "Warrior")
+    assert isinstance(char, character_manager.Character)
+    assert not hasattr(char, "__dict__")
+    assert len(char) == 12
+    assert char == dict(char)
+
+    inventory_system.add_item_to_inventory(char, "iron_sword")
+    inventory_system.equip_weapon(char, "iron_sword", {'type': 'weapon', 'effect': 'strength:5'})
+    assert "equipped_weapon" in char and char['strength'] == 20
+    assert inventory_system.unequip_weapon(char) == "iron_sword"
+    assert "equipped_weapon" not in char
+
+    char['nickname'] = "Slots"
+    assert char.get('nickname') == "Slots" and list(char)[-1] == 'nickname'
+    del char['nickname']
+    with pytest.raises(KeyError):
+        char['nickname']
+    assert pickle.loads(pickle.dumps(char)) == char
+
+# ============================================================================
+# SAVE INDEX TESTS
+# ============================================================================
+
+def test_save_index_tracks_saves_and_deletes(tmp_path):
+    """Test that listing reads the index kept up to date by save and delete"""
+    save_dir = str(tmp_path / "saves")
+    for name, char_class in (("IndexA", "Mage"), ("IndexB", "Rogue"), ("IndexC", "Cleric")):
+        character_manager.save_character(character_manager.create_character(name, char_class), save_dir)
+    char = character_manager.create_character("IndexB", "Rogue")
+    char['level'] = 7
+    character_manager.save_character(char, save_dir, binary=True)
+    character_manager.delete_character("IndexA", save_dir)
+
+    # A save file the index doesn't know about stays hidden until a rebuild
+    with open(os.path.join(save_dir, "Stray_save.txt"), "w") as f:
+        f.write("NAME: Stray\n")
+
+    assert character_manager.list_saved_characters(save_dir) == ["IndexB", "IndexC"]
+    summary = character_manager.list_saved_characters(save_dir, summary=True)
+    assert [(r['name'], r['class'], r['level']) for r in summary] == [
+        ("IndexB", "Rogue", 7), ("IndexC", "Cleric", 1)]
+
+    index = character_manager.rebuild_index(save_dir)
+    assert sorted(index) == ["IndexB", "IndexC", "Stray"]
+    assert index["Stray"]['level'] is None
+
+def test_save_index_rebuilt_when_missing_or_torn(tmp_path):
+    """Test that a missing index is rebuilt and a torn last record ignored"""
+    save_dir = str(tmp_path)
+    character_manager.save_character(character_manager.create_character("Rebuild", "Warrior"), save_dir)
+    index_file = os.path.join(save_dir, character_manager.SAVE_INDEX_FILENAME)
+    assert not os.path.exists(index_file)
+
+    assert character_manager.list_saved_characters(save_dir) == ["Rebuild"]
+    assert os.path.exists(index_file)
+
+    with open(index_file, "a") as f:
+        f.write('{"name": "Rebuild", "dele')
+    assert character_manager.list_saved_characters(save_dir) == ["Rebuild"]
+
+def test_save_index_compacts(tmp_path):
+    """Test that superseded index records are dropped"""
+    save_dir = str(tmp_path / "saves")
+    char = character_manager.create_character("Churn", "Mage")
+    for gold in range(200):
+        char['gold'] = gold
+        character_manager.save_character(char, save_dir)
+
+    assert character_manager.list_saved_characters(save_dir) == ["Churn"]
+    with open(os.path.join(save_dir, character_manager.SAVE_INDEX_FILENAME)) as f:
+        assert len(f.readlines()) == 1
+
+def test_save_index_compacts_without_reads(tmp_path):
+    """Test that saves alone keep the index from growing without bound"""
+    save_dir = str(tmp_path)
+    char = character_manager.create_character("Busy", "Mage")
+    character_manager.save_character(char, save_dir)
+    character_manager.list_saved_characters(save_dir)
+    for gold in range(2000):
+        char['gold'] = gold
+        character_manager.save_character(char, save_dir, journal=True)
+
+    size = os.path.getsize(os.path.join(save_dir, character_manager.SAVE_INDEX_FILENAME))
+    assert size <= character_manager.INDEX_COMPACT_BYTES + 200
+    assert character_manager.list_saved_characters(save_dir) == ["Busy"]
+
+def test_save_index_compaction_keeps_concurrent_appends(tmp_path, monkeypatch):
+    """Test that records appended while the index is compacted aren't lost"""
+    save_dir = str(tmp_path)
+    char = character_manager.create_character("Churn", "Mage")
+    character_manager.save_character(char, save_dir)
+    character_manager.rebuild_index(save_dir)
+    for gold in range(200):
+        char['gold'] = gold
+        character_manager.save_character(char, save_dir)
+
+    write_file_atomic = character_manager.write_file_atomic
+    def slow_write(filename, text):
+        # a save from elsewhere arrives mid-compaction
+        late = threading.Thread(target=character_manager.save_character,
+                                args=(character_manager.create_character("Late", "Rogue"), save_dir))
+        late.start()
+        time.sleep(0.1)
+        write_file_atomic(filename, text)
+        threads.append(late)
+    threads = []
+    monkeypatch.setattr(character_manager, "write_file_atomic", slow_write)
+    assert character_manager.read_save_index(save_dir) is not None
+    monkeypatch.setattr(character_manager, "write_file_atomic", write_file_atomic)
+    threads[0].join()
+
+    assert sorted(character_manager.list_saved_characters(save_dir)) == ["Churn", "Late"]
+
+# ============================================================================
+# SHARDED LAYOUT TESTS
+# ============================================================================
+
+def test_migrate_flat_directory_to_shards(tmp_path):
+    """Test migrating saves into shards and reading both layouts"""
+    save_dir = str(tmp_path)
+    names = [f"Shard{index}" for index in range(5)]
+    for name in names:
+        character_manager.save_character(character_manager.create_character(name, "Mage"), save_dir)
+    journaled = character_manager.load_character("Shard0", save_dir)
+    journaled['gold'] = 555
+    character_manager.save_character(journaled, save_dir, journal=True)
+
+    # A migration that stopped after writing the marker: flat saves still
+    # load and new saves already go into shards
+    with open(os.path.join(save_dir, character_manager.SHARD_MARKER_FILENAME), "w") as f:
+        f.write(character_manager.SHARD_MIGRATING)
+    character_manager._sharded_directories.clear()  # as a fresh process would
+    assert character_manager.load_character("Shard0", save_dir)['gold'] == 555
+    character_manager.save_character(character_manager.create_character("Shard4", "Mage"), save_dir)
+    assert character_manager.migrate_to_sharded(save_dir) == 5
+
+    assert character_manager.is_sharded(save_dir)
+    prefix = character_manager.shard_prefix("Shard1")
+    assert os.path.exists(os.path.join(save_dir, prefix, "Shard1_save.txt"))
+    assert character_manager.load_character("Shard0", save_dir)['gold'] == 555
+    assert character_manager.load_character("Shard4", save_dir)['name'] == "Shard4"
+    assert sorted(os.listdir(save_dir)) == sorted(
+        set(character_manager.shard_prefix(name).split(os.sep)[0] for name in names)
+        | {character_manager.SHARD_MARKER_FILENAME})
+    assert sorted(character_manager.rebuild_index(save_dir)) == names
+
+    character_manager.save_character(character_manager.create_character("Fresh", "Rogue"), save_dir)
+    assert os.path.exists(character_manager.get_save_path("Fresh", save_dir))
+    for name in names + ["Fresh"]:
+        character_manager.delete_character(name, save_dir)
+    assert character_manager.list_saved_characters(save_dir) == []
+
+def test_migration_by_another_process_is_noticed(tmp_path):
+    """Test that a process that saw a flat directory follows a later migration"""
+    import subprocess
+    save_dir = str(tmp_path)
+    character_manager.save_character(character_manager.create_character("Early", "Mage"), save_dir)
+    assert not character_manager.is_sharded(save_dir)
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c",
+                    f"import character_manager; character_manager.migrate_to_sharded({save_dir!r})"],
+                   cwd=root, check=True)
+
+    assert character_manager.is_sharded(save_dir)
+    character_manager.save_character(character_manager.create_character("Late", "Mage"), save_dir)
+    assert os.path.exists(os.path.join(save_dir, character_manager.shard_prefix("Late"), "Late_save.txt"))
+    character_manager._sharded_directories.clear()  # as a fresh process would
+    assert character_manager.load_character("Late", save_dir)['name'] == "Late"
+
+    # a stray flat save can't be loaded any more, so it isn't listed
+    with open(os.path.join(save_dir, "Stray_save.txt"), "w") as f:
+        f.write(character_manager.format_save_data(character_manager.create_character("Stray", "Rogue")))
+    assert not os.path.exists(os.path.join(save_dir, character_manager.SAVE_INDEX_FILENAME))
+    assert sorted(character_manager.list_saved_characters(save_dir)) == ["Early", "Late"]
+
+# ============================================================================
+# CHARACTER CACHE TESTS
+# ============================================================================
+
+def test_character_cache_hits_and_write_back(tmp_path):
+    """Test LRU hits, eviction and write-back of dirty characters"""
+    save_dir = str(tmp_path)
+    for name in ("CacheA", "CacheB", "CacheC"):
+        character_manager.save_character(character_manager.create_character(name, "Warrior"), save_dir)
+    cache = character_manager.CharacterCache(save_dir, max_entries=2)
+
+    a = cache.get("CacheA")
+    assert cache.get("CacheA") is a
+    a['gold'] = 999
+    cache.mark_dirty(a)
+    cache.get("CacheB")
+    cache.get("CacheC")  # evicts CacheA, writing it back
+
+    assert "CacheA" not in cache and len(cache) == 2
+    assert (cache.hits, cache.misses, cache.writebacks) == (1, 3, 1)
+    assert character_manager.load_character("CacheA", save_dir)['gold'] == 999
+
+    # a session changing A after it was evicted puts it back
+    a['gold'] = 1000
+    cache.mark_dirty(a)
+    assert cache.get("CacheA") is a
+    cache.flush()
+    assert character_manager.load_character("CacheA", save_dir)['gold'] == 1000
+
+    # ...unless another copy was loaded meanwhile
+    b = cache.get("CacheB")
+    cache.get("CacheC")
+    cache.get("CacheA")
+    assert cache.get("CacheB") is not b
+    with pytest.raises(ValueError):
+        cache.mark_dirty(b)
+
+    with pytest.raises(CharacterNotFoundError):
+        cache.get("Nobody")
+    fresh = character_manager.create_character("CacheNew", "Mage")
+    cache.put(fresh)
+    cache.close()
+    assert len(cache) == 0
+    assert character_manager.load_character("CacheNew", save_dir) == fresh
+
+def test_character_cache_byte_budget(tmp_path):
+    """Test that max_bytes limits how many characters stay cached"""
+    save_dir = str(tmp_path)
+    char = character_manager.create_character("Sized9", "Rogue")
+    size = character_manager.estimate_character_size(char)
+    cache = character_manager.CharacterCache(save_dir, max_bytes=size * 2)
+    for index in range(5):
+        cache.put(character_manager.create_character(f"Sized{index}", "Rogue"))
+
+    assert len(cache) == 2 and cache.bytes <= size * 2
+    assert cache.writebacks == 3
+    assert character_manager.list_saved_characters(save_dir) != []
+
+def test_character_cache_shares_one_object_between_threads(tmp_path):
+    """Test that concurrent gets for the same name load it once"""
+
+    save_dir = str(tmp_path)
+    character_manager.save_character(character_manager.create_character("Shared", "Cleric"), save_dir)
+    cache = character_manager.CharacterCache(save_dir)
+    start = threading.Barrier(8)
+    results = []
+
+    def session():
+        start.wait()
+        results.append(cache.get("Shared"))
+
+    threads = [threading.Thread(target=session) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 8 and all(result is results[0] for result in results)
+    assert cache.misses == 1 and cache.hits == 7
+
+def test_character_cache_failed_write_back(tmp_path, monkeypatch):
+    """Test that a failed write-back wakes waiting threads and keeps the change"""
+    save_dir = str(tmp_path)
+    for name in ("FailA", "FailB"):
+        character_manager.save_character(character_manager.create_character(name, "Mage"), save_dir)
+    cache = character_manager.CharacterCache(save_dir, max_entries=1)
+    fail_a = cache.get("FailA")
+    fail_a['gold'] = 321
+    cache.mark_dirty(fail_a)
+
+    real_load = character_manager.load_character
+    def slow_load(*args, **kwargs):
+        time.sleep(0.2)
+        return real_load(*args, **kwargs)
+    def failing_save(*args, **kwargs):
+        raise OSError("disk full")
+    monkeypatch.setattr(character_manager, "load_character", slow_load)
+    monkeypatch.setattr(character_manager, "save_character", failing_save)
+
+    results = []
+    def session():
+        try:
+            results.append(cache.get("FailB")['name'])
+        except OSError:
+            results.append("OSError")
+
+    threads = [threading.Thread(target=session) for _ in range(2)]
+    threads[0].start()
+    time.sleep(0.05)
+    threads[1].start()
+    for thread in threads:
+        thread.join(timeout=3)
+    assert not any(thread.is_alive() for thread in threads)
+    assert sorted(results) == ["FailB", "OSError"]
+
+    # the unsaved change is still cached and is written once saving works
+    assert "FailA" in cache
+    monkeypatch.undo()
+    assert cache.flush() == 1
+    assert character_manager.load_character("FailA", save_dir)['gold'] == 321
+
+# ============================================================================
+# SAVE LOCKING TESTS
+# ============================================================================
+
+def add_gold_repeatedly(save_dir, times):
+    """Worker for the locking stress test (module level so it can be pickled)"""
+    for _ in range(times):
+        with character_manager.locked("Contended", save_dir) as char:
+            char['gold'] += 1
+
+def test_locked_updates_from_many_processes(tmp_path):
+    """Stress test: N processes incrementing gold never lose an update"""
+    import multiprocessing
+
+    save_dir = str(tmp_path)
+    character_manager.save_character(character_manager.create_character("Contended", "Rogue"), save_dir)
+    workers, increments = 4, 25
+    processes = [multiprocessing.Process(target=add_gold_repeatedly, args=(save_dir, increments))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+    loaded = character_manager.load_character("Contended", save_dir, lock=True)
+    assert loaded['gold'] == 100 + workers * increments
+
+def test_lock_survives_migration(tmp_path):
+    """Test that a lock taken before migrating still excludes lockers after"""
+    save_dir = str(tmp_path)
+    character_manager.save_character(character_manager.create_character("Moving", "Rogue"), save_dir)
+    (tmp_path / "Moving_save.lock").write_text("")  # left by an older version
+
+    with character_manager.character_lock("Moving", save_dir):
+        character_manager.migrate_to_sharded(save_dir)
+        with pytest.raises(SaveLockTimeoutError):
+            with character_manager.character_lock("Moving", save_dir, timeout=0.1):
+                pass
+    assert not any(name.endswith("_save.lock") for name in os.listdir(save_dir))
+    with character_manager.character_lock("Moving", save_dir, timeout=0.1):
+        assert character_manager.load_character("Moving", save_dir)['name'] == "Moving"
+
+def test_lock_timeout_and_shared_readers(tmp_path):
+    """Test that readers share the lock and a writer times out behind them"""
+
+    save_dir = str(tmp_path)
+    char = character_manager.create_character("Timeout", "Mage")
+    character_manager.save_character(char, save_dir, lock=True)
+
+    with character_manager.character_lock("Timeout", save_dir, exclusive=False):
+        assert character_manager.load_character("Timeout", save_dir, lock=True) == char
+        with pytest.raises(SaveLockTimeoutError):
+            with character_manager.character_lock("Timeout", save_dir, timeout=0.05):
+                pass
+
+    with pytest.raises(ValueError):
+        with character_manager.locked("Timeout", save_dir) as locked_char:
+            locked_char['gold'] = 1
+            raise ValueError("abandon the change")
+    assert character_manager.load_character("Timeout", save_dir)['gold'] == 100
+
+# ============================================================================
+# BULK MIGRATION TESTS
+# ============================================================================
+
+def rename_iron_sword(char):
+    """Migration used by the bulk tests: rename an item id everywhere"""
+    if char['name'] == "BulkBroken":
+        raise KeyError("no such stat")
+    char['inventory'] = ["steel_sword" if item == "iron_sword" else item for item in char['inventory']]
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_bulk_transform_rewrites_changed_saves(tmp_path, workers):
+    """Test bulk_transform in dry run and real mode, with failures reported per file"""
+    save_dir = str(tmp_path)
+    for index in range(10):
+        char = character_manager.create_character(f"Bulk{index}", "Warrior")
+        if index % 2 == 0:
+            char['inventory'] = ["iron_sword", "health_potion"]
+        character_manager.save_character(char, save_dir, binary=(index == 4))
+    character_manager.save_character(character_manager.create_character("BulkBroken", "Mage"), save_dir)
+    with open(os.path.join(save_dir, "BulkBad_save.txt"), "w") as f:
+        f.write("NAME: BulkBad\nLEVEL: lots\n")
+
+    summary = character_manager.bulk_transform(save_dir, rename_iron_sword, workers=workers,
+                                               dry_run=True, chunk_size=3)
+    assert (summary['total'], summary['changed'], summary['unchanged']) == (12, 5, 5)
+    assert character_manager.load_character("Bulk0", save_dir)['inventory'][0] == "iron_sword"
+
+    summary = character_manager.bulk_transform(save_dir, rename_iron_sword, workers=workers, chunk_size=3)
+    assert summary['changed'] == 5
+    failures = {os.path.basename(name): type(error) for name, error in summary['failures'].items()}
+    assert failures == {"BulkBad_save.txt": InvalidSaveDataError, "BulkBroken_save.txt": KeyError}
+    for index in (0, 4):
+        assert character_manager.load_character(f"Bulk{index}", save_dir)['inventory'] == [
+            "steel_sword", "health_potion"]
+    assert character_manager.bulk_transform(save_dir, rename_iron_sword, workers=workers)['changed'] == 0
+
+# ============================================================================
+# SAVE SUMMARY TESTS
+# ============================================================================
+
+def test_peek_character_reads_summary_fields(tmp_path):
+    """Test peek_character on text, journaled and binary saves"""
+    save_dir = str(tmp_path)
+    char = character_manager.create_character("PeekText", "Rogue")
+    char['completed_quests'] = [f"quest_{index}" for index in range(5000)]
+    character_manager.save_character(char, save_dir)
+    char['gold'] = 42
+    character_manager.save_character(char, save_dir, journal=True)
+    binary = character_manager.create_character("PeekBin" * 30, "Cleric")
+    character_manager.save_character(binary, save_dir, binary=True)
+
+    assert character_manager.peek_character("PeekText", save_dir) == {
+        "name": "PeekText", "class": "Rogue", "level": 1, "health": 90, "gold": 42}
+    assert character_manager.peek_character("PeekBin" * 30, save_dir)['class'] == "Cleric"
+    with pytest.raises(CharacterNotFoundError):
+        character_manager.peek_character("Nobody", save_dir)
+
+def test_iter_character_summaries_collects_errors(tmp_path):
+    """Test streaming summaries with a broken save reported, not raised"""
+    save_dir = str(tmp_path)
+    character_manager.migrate_to_sharded(save_dir)
+    for name in ("SumA", "SumB"):
+        character_manager.save_character(character_manager.create_character(name, "Mage"), save_dir)
+    bad_path = character_manager.get_save_path("SumBad", save_dir)
+    os.makedirs(os.path.dirname(bad_path), exist_ok=True)
+    with open(bad_path, "w") as f:
+        f.write("NAME: SumBad\nCLASS: Mage\nLEVEL: high\n")
+
+    errors = []
+    summaries = character_manager.iter_character_summaries(save_dir, errors=errors)
+    assert sorted(summary['name'] for summary in summaries) == ["SumA", "SumB"]
+    assert [type(error) for _, error in errors] == [InvalidSaveDataError]
+    with pytest.raises(InvalidSaveDataError):
+        list(character_manager.iter_character_summaries(save_dir))
+
+# ============================================================================
+# STORAGE BACKEND TESTS
+# ============================================================================
+
+def make_backend(kind, tmp_path, **options):
+    if kind == "file":
+        return character_manager.FileBackend(str(tmp_path / "saves"))
+    return character_manager.SQLiteBackend(str(tmp_path / "saves.sqlite3"), **options)
+
+@pytest.mark.parametrize("kind", ["file", "sqlite"])
+def test_backend_round_trip(tmp_path, kind):
+    """Test that every backend saves, loads, lists and deletes like the save files"""
+    backend = make_backend(kind, tmp_path)
+    char = character_manager.create_character("BackendTest", "Mage")
+    char['inventory'] = ["health_potion", "iron_sword", "health_potion"]
+    char['completed_quests'] = [f"quest_{index}" for index in range(50)]
+    other = character_manager.create_character("Other", "Rogue")
+
+    assert character_manager.save_character(char, backend=backend)
+    backend.save_many([other])
+    assert character_manager.load_character("BackendTest", backend=backend) == char
+    assert sorted(character_manager.list_saved_characters(backend=backend)) == ["BackendTest", "Other"]
+    summary = character_manager.list_saved_characters(summary=True, backend=backend)
+    assert sorted((record["name"], record["class"], record["level"]) for record in summary) == \
+        [("BackendTest", "Mage", 1), ("Other", "Rogue", 1)]
+
+    assert character_manager.delete_character("BackendTest", backend=backend)
+    with pytest.raises(CharacterNotFoundError):
+        character_manager.load_character("BackendTest", backend=backend)
+    with pytest.raises(CharacterNotFoundError):
+        character_manager.delete_character("BackendTest", backend=backend)
+    backend.close()
+
+def test_sqlite_group_commit(tmp_path):
+    """Test that saves are staged until the batch fills, yet stay loadable"""
+    backend = make_backend("sqlite", tmp_path, batch_size=3)
+    char = character_manager.create_character("Grouped", "Warrior")
+    backend.save(char)
+    char['gold'] = 999
+    backend.save(char)
+    assert backend.commits == 0
+    assert backend.load("Grouped")['gold'] == 999
+
+    for index in range(2):
+        backend.save(character_manager.create_character(f"Grouped{index}", "Cleric"))
+    assert backend.commits == 1
+    backend.save(character_manager.create_character("Late", "Mage"))
+    backend.close()
+
+    reopened = make_backend("sqlite", tmp_path)
+    assert reopened.load("Grouped")['gold'] == 999
+    assert reopened.list_names() == ["Grouped", "Grouped0", "Grouped1", "Late"]
+    reopened.close()
+
+def test_sqlite_load_during_flush(tmp_path):
+    """Test that a character being committed can still be loaded"""
+    backend = make_backend("sqlite", tmp_path, batch_size=100)
+    char = character_manager.create_character("InFlight", "Mage")
+    char['gold'] = 77
+    backend.save(char)
+
+    seen = []
+    real_write = backend._write
+    def write_and_load(snapshots):
+        # runs between taking the staged saves and committing them
+        seen.append(backend.load("InFlight")['gold'])
+        real_write(snapshots)
+    backend._write = write_and_load
+    assert backend.flush() == 1
+    assert seen == [77]
+    assert backend.load("InFlight")['gold'] == 77
+    backend.close()
+
+def test_sqlite_bad_character_doesnt_block_others(tmp_path):
+    """Test that a character SQLite can't store is refused on its own"""
+    backend = make_backend("sqlite", tmp_path, batch_size=4)
+    bad = character_manager.create_character("Bad", "Mage")
+    bad['gold'] = 2 ** 63
+    with pytest.raises(InvalidSaveDataError):
+        backend.save(bad)
+    bad['gold'] = 1.5
+    with pytest.raises(InvalidSaveDataError):
+        backend.save_many([character_manager.create_character("Fine", "Mage"), bad])
+
+    for index in range(9):
+        backend.save(character_manager.create_character(f"Good{index}", "Rogue"))
+    backend.close()
+    reopened = make_backend("sqlite", tmp_path)
+    assert sorted(reopened.list_names()) == [f"Good{index}" for index in range(9)]
+    reopened.close()
+
+def test_save_backend_is_abstract():
+    """Test that a backend must implement the storage methods"""
+    class Incomplete(character_manager.SaveBackend):
+        def save(self, character):
+            return True
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_sqlite_concurrent_saves(tmp_path):
+    """Test threads sharing a small connection pool"""
+    backend = make_backend("sqlite", tmp_path, pool_size=2, batch_size=16)
+
+    def play(index):
+        char = character_manager.create_character(f"Pooled{index}", "Rogue")
+        for gold in range(40):
+            char['gold'] = gold
+            char['inventory'].append(f"item_{gold}")
+            backend.save(char)
+            assert backend.load(char['name'])['gold'] == gold
+
+    threads = [threading.Thread(target=play, args=(index,)) for index in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    backend.close()
+
+    reopened = make_backend("sqlite", tmp_path)
+    for index in range(6):
+        char = reopened.load(f"Pooled{index}")
+        assert char['gold'] == 39 and len(char['inventory']) == 40
+    reopened.close()
+
+def test_sqlite_bad_data_and_corruption(tmp_path):
+    """Test that the existing save exceptions keep their meaning"""
+    import sqlite3
+    backend = make_backend("sqlite", tmp_path, batch_size=1)
+    backend.save(character_manager.create_character("Broken", "Mage"))
+    backend.close()
+    with sqlite3.connect(str(tmp_path / "saves.sqlite3")) as connection:
+        connection.execute("UPDATE characters SET gold = 'lots' WHERE name = 'Broken'")
+    backend = make_backend("sqlite", tmp_path)
+    with pytest.raises(InvalidSaveDataError):
+        backend.load("Broken")
+    backend.close()
+
+    garbage = tmp_path / "garbage.sqlite3"
+    garbage.write_bytes(b"definitely not a database" * 100)
+    with pytest.raises(SaveFileCorruptedError):
+        character_manager.SQLiteBackend(str(garbage))
+
+# ============================================================================
+# SAVE CHECKSUM TESTS
+# ============================================================================
+
+def flip_byte(filename, offset):
+    with open(filename, "rb") as f:
+        data = bytearray(f.read())
+    data[offset] ^= 0x01
+    with open(filename, "wb") as f:
+        f.write(bytes(data))
+
+def test_text_save_checksum_catches_corruption(tmp_path):
+    """Test that flipped bits and truncation raise SaveFileCorruptedError"""
+    save_dir = str(tmp_path)
+    char = character_manager.create_character("CrcTest", "Mage")
+    char['completed_quests'] = ["first_steps", "goblin_hunt"]
+    character_manager.save_character(char, save_dir)
+    filename = os.path.join(save_dir, "CrcTest_save.txt")
+    with open(filename) as f:
+        text = f.read()
+    assert text.splitlines()[-1].startswith("CRC32: ")
+    assert character_manager.load_character("CrcTest", save_dir) == char
+
+    # GOLD: 100 -> GOLD: 101 still parses, only the checksum notices
+    flip_byte(filename, text.index("GOLD: 100") + 8)
+    with pytest.raises(SaveFileCorruptedError):
+        character_manager.load_character("CrcTest", save_dir)
+
+    for cut in (len(text) - 3, text.index("CRC32") + 2, text.index("goblin")):
+        with open(filename, "w") as f:
+            f.write(text[:cut])
+        with pytest.raises(SaveFileCorruptedError):
+            character_manager.load_character("CrcTest", save_dir)
+
+def test_text_save_bytes_match_checksum(tmp_path):
+    """Test that a text save is written as UTF-8 with \\n line endings"""
+    save_dir = str(tmp_path)
+    char = character_manager.create_character("Zoë", "Cleric")
+    char['inventory'] = ["épée"]
+    character_manager.save_character(char, save_dir)
+    with open(os.path.join(save_dir, "Zoë_save.txt"), "rb") as f:
+        data = f.read()
+    assert data == character_manager.format_save_data(char).encode("utf-8")
+    assert b"\r" not in data
+    assert character_manager.load_character("Zoë", save_dir) == char
+
+def test_saves_without_checksum_still_load(tmp_path):
+    """Test that saves written before checksums load, but not if incomplete"""
+    save_dir = str(tmp_path)
+    char = character_manager.create_character("OldSave", "Rogue")
+    text = character_manager.format_save_data(char)
+    with open(os.path.join(save_dir, "OldSave_save.txt"), "w") as f:
+        f.write(text[:text.index("CRC32")])
+    assert character_manager.load_character("OldSave", save_dir) == char
+
+    with open(os.path.join(save_dir, "OldSave_save.txt"), "w") as f:
+        f.write(text[:text.index("COMPLETED_QUESTS")])
+    with pytest.raises(InvalidSaveDataError):
+        character_manager.load_character("OldSave", save_dir)
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_verify_all_saves(tmp_path, workers):
+    """Test that verify_all_saves sorts saves into ok, unchecked and failures"""
+    save_dir = str(tmp_path / "saves")
+    for index in range(20):
+        char = character_manager.create_character(f"Verify{index}", "Cleric")
+        character_manager.save_character(char, save_dir, binary=index % 2 == 1)
+    legacy = character_manager.format_save_data(character_manager.create_character("Legacy", "Mage"))
+    with open(os.path.join(save_dir, "Legacy_save.txt"), "w") as f:
+        f.write(legacy[:legacy.index("CRC32")])
+    flip_byte(os.path.join(save_dir, "Verify2_save.txt"), 10)
+    flip_byte(os.path.join(save_dir, "Verify3_save.bin"), 12)
+
+    summary = character_manager.verify_all_saves(save_dir, workers=workers, chunk_size=4)
+    assert summary["total"] == 21
+    assert summary["ok"] == 18
+    assert [os.path.basename(f) for f in summary["unchecked"]] == ["Legacy_save.txt"]
+    failures = {os.path.basename(f): type(e) for f, e in summary["failures"].items()}
+    assert failures == {"Verify2_save.txt": SaveFileCorruptedError,
+                        "Verify3_save.bin": SaveFileCorruptedError}
+    assert character_manager.verify_all_saves(str(tmp_path / "missing"))["total"] == 0
+
+# ============================================================================
+# BINARY SAVE FORMAT TESTS
+# ============================================================================
+
+def test_binary_save_round_trip(tmp_path):
+    """Test that binary saves load back the same character"""
+    save_dir = str(tmp_path)
+    char = character_manager.create_character("BinaryTest", "Cleric")
+    char['gold'] = 10 ** 12
+    char['inventory'] = ["health_potion", "iron_sword", "health_potion"]
+    char['completed_quests'] = [f"quest_{index}" for index in range(300)]
+    character_manager.save_character(char, save_dir, binary=True)
+
+    assert os.listdir(save_dir) == ["BinaryTest_save.bin"]
+    assert character_manager.load_character("BinaryTest", save_dir) == char
+    assert character_manager.list_saved_characters(save_dir) == ["BinaryTest"]
+
+def test_convert_save_between_formats(tmp_path):
+    """Test converting a save to binary and back to text"""
+    save_dir = str(tmp_path)
+    char = character_manager.create_character("ConvertTest", "Rogue")
+    char['active_quests'] = ["first_steps"]
+    character_manager.save_character(char, save_dir)
+
+    path = character_manager.convert_save("ConvertTest", save_dir, binary=True)
+    assert os.listdir(save_dir) == ["ConvertTest_save.bin"]
+    with open(path, "rb") as f:
+        assert f.read(4) == character_manager.BINARY_SAVE_MAGIC
+
+    character_manager.convert_save("ConvertTest", save_dir, binary=False)
+    assert os.listdir(save_dir) == ["ConvertTest_save.txt"]
+    assert character_manager.load_character("ConvertTest", save_dir) == char
+
+    character_manager.convert_save("ConvertTest", save_dir, binary=True)
+    character_manager.delete_character("ConvertTest", save_dir)
+    assert os.listdir(save_dir) == []
+
+def test_binary_save_of_huge_stats_falls_back_to_text(tmp_path):
+    """Test that stats past 64 bits are refused by the binary format only"""
+    save_dir = str(tmp_path)
+    char = character_manager.create_character("HugeTest", "Mage")
+    character_manager.gain_experience(char, 10 ** 40)
+    with pytest.raises(InvalidSaveDataError):
+        character_manager.encode_binary_save(char)
+
+    character_manager.save_character(char, save_dir, binary=True)
+    assert os.listdir(save_dir) == ["HugeTest_save.txt"]
+    assert character_manager.load_character("HugeTest", save_dir) == char
+    assert character_manager.convert_save("HugeTest", save_dir).endswith("HugeTest_save.txt")
+
+def test_binary_save_detected_by_magic_number(tmp_path):
+    """Test that a binary save under the .txt name still loads"""
+    save_dir = str(tmp_path)
+    char = character_manager.create_character("MagicTest", "Warrior")
+    with open(os.path.join(save_dir, "MagicTest_save.txt"), "wb") as f:
+        f.write(character_manager.encode_binary_save(char))
+
+    assert character_manager.load_character("MagicTest", save_dir) == char
+
+def test_truncated_binary_save_is_corrupted(tmp_path):
+    """Test that a cut off binary save fails its checksum"""
+    save_dir = str(tmp_path)
+    char = character_manager.create_character("TruncTest", "Mage")
+    char['inventory'] = ["health_potion"]
+    data = character_manager.encode_binary_save(char)
+    with open(os.path.join(save_dir, "TruncTest_save.bin"), "wb") as f:
+        f.write(data[:-3])
+
+    with pytest.raises(SaveFileCorruptedError):
+        character_manager.load_character("TruncTest", save_dir)
+    with pytest.raises(ValueError):
+        character_manager.save_character(char, save_dir, journal=True, binary=True)
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])